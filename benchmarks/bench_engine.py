@@ -0,0 +1,74 @@
+"""Benchmark the alternation engine against stock TextFSM.
+
+A template has many literal-heavy rules in one state like a show interface
+template, and most input lines match a rule deep in the state.
+
+Usage: python -m benchmarks.bench_engine [rules_count] [blocks_count]
+"""
+
+import sys
+from io import StringIO
+from timeit import timeit
+
+from textfsm import TextFSM
+
+from templateapp.engine import AlternationTextFSM
+
+
+def create_template(rules_count):
+    lines = [
+        'Value Required name (\\S+)',
+        'Value state (\\S+)',
+        'Value input (\\d+)',
+        'Value output (\\d+)',
+        '',
+        'Start',
+        '  ^interface ${name} is ${state}',
+    ]
+    for i in range(rules_count):
+        lines.append('  ^ +counter{} +: +\\d+ +packets'.format(i))
+    lines.append('  ^ +input +: +${input} +packets')
+    lines.append('  ^ +output +: +${output} +packets -> Record')
+    return '\n'.join(lines)
+
+
+def create_test_data(rules_count, blocks_count):
+    lines = []
+    for i in range(blocks_count):
+        lines.append('interface eth{} is up'.format(i))
+        for j in range(rules_count):
+            lines.append('  counter{} : {} packets'.format(j, i + j))
+        lines.append('  input : {} packets'.format(i * 3))
+        lines.append('  output : {} packets'.format(i * 5))
+    return '\n'.join(lines)
+
+
+def parse(parser, text):
+    parser.Reset()
+    return parser.ParseText(text)
+
+
+def main():
+    rules_count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    blocks_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    template = create_template(rules_count)
+    test_data = create_test_data(rules_count, blocks_count)
+    lines_count = test_data.count('\n') + 1
+
+    parser = TextFSM(StringIO(template))
+    alternation_parser = AlternationTextFSM(StringIO(template))
+    assert parse(parser, test_data) == parse(alternation_parser, test_data)
+
+    baseline = timeit(lambda: parse(parser, test_data), number=3)
+    result = timeit(lambda: parse(alternation_parser, test_data), number=3)
+
+    print('rules               : {}'.format(rules_count))
+    print('lines               : {}'.format(lines_count))
+    fmt = '{:<20}: {:.1f} lines/s'
+    print(fmt.format('textfsm', 3 * lines_count / baseline))
+    print(fmt.format('alternation', 3 * lines_count / result))
+    print('speedup             : {:.2f}x'.format(baseline / result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark the single-pass lexer against the regex cascade.
+
+Usage: python -m benchmarks.bench_lexer [lines_count]
+"""
+
+import re
+import sys
+from timeit import timeit
+
+from templateapp.lexer import tokenize
+from templateapp.lexer import tokenize_by_regex
+from templateapp.lexer import is_a_word
+from templateapp.lexer import is_not_containing_letter
+
+
+def classify_by_regex(text):
+    token = tokenize_by_regex(text)
+    re.match(r'[a-z]\w+$', text.rstrip(), re.I)
+    re.match(r'[^a-z0-9]+$', token.line, re.I)
+    return token
+
+
+def classify(text):
+    token = tokenize(text)
+    is_a_word(text)
+    is_not_containing_letter(token.line)
+    return token
+
+
+def create_user_data(lines_count):
+    shapes = [
+        'Title                   Price       Genre',
+        'mixed_words(var_title)   number(var_price)   '
+        'words(var_genre) -> Record',
+        'comment__ Genre column is a group of words',
+        'keep__ =+ +=+ +=+',
+        'ignore_case__ interface word(var_iface) -> Next.Record',
+        'Start',
+        '==== ======= ===',
+    ]
+    return [shapes[i % len(shapes)] for i in range(lines_count)]
+
+
+def main():
+    lines_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    lines = create_user_data(lines_count)
+
+    baseline = timeit(lambda: [classify_by_regex(x) for x in lines], number=3)
+    result = timeit(lambda: [classify(x) for x in lines], number=3)
+
+    print('lines               : {}'.format(lines_count))
+    fmt = '{:<20}: {:.1f} lines/s'
+    print(fmt.format('regex cascade', 3 * lines_count / baseline))
+    print(fmt.format('single-pass lexer', 3 * lines_count / result))
+    print('speedup             : {:.2f}x'.format(baseline / result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark the literal prefilter against stock TextFSM on sparse output.
+
+Usage: python -m benchmarks.bench_prefilter [blocks_count] [noise_per_block]
+"""
+
+import sys
+from io import StringIO
+from timeit import timeit
+
+from textfsm import TextFSM
+
+from templateapp.prefilter import PrefilterTextFSM
+
+template = r"""Value Required iface (\S+)
+Value desc (.+)
+Value addr (\S+)
+
+Start
+  ^interface ${iface}
+  ^ description ${desc}
+  ^ ip address ${addr} -> Record
+"""
+
+
+def create_running_config(blocks_count, noise_count):
+    lines = []
+    for i in range(blocks_count):
+        lines.append('interface GigabitEthernet0/{}'.format(i))
+        lines.append(' description link {}'.format(i))
+        lines.append(' ip address 10.0.{}.{} 255.255.255.0'.format(
+            i // 250, i % 250))
+        for j in range(noise_count):
+            fmt = ' switchport trunk allowed vlan add {},{}'
+            lines.append(fmt.format(i, j))
+    return '\n'.join(lines)
+
+
+def parse(parser, text):
+    parser.Reset()
+    return parser.ParseText(text)
+
+
+def main():
+    blocks_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    noise_count = int(sys.argv[2]) if len(sys.argv) > 2 else 57
+    text = create_running_config(blocks_count, noise_count)
+    lines_count = text.count('\n') + 1
+
+    parser = TextFSM(StringIO(template))
+    prefilter_parser = PrefilterTextFSM(StringIO(template))
+    assert parse(parser, text) == parse(prefilter_parser, text)
+
+    baseline = timeit(lambda: parse(parser, text), number=3)
+    result = timeit(lambda: parse(prefilter_parser, text), number=3)
+
+    print('lines               : {}'.format(lines_count))
+    print('relevant lines      : {:.1%}'.format(3 / (3 + noise_count)))
+    fmt = '{:<20}: {:.1f} lines/s'
+    print(fmt.format('textfsm', 3 * lines_count / baseline))
+    print(fmt.format('prefilter', 3 * lines_count / result))
+    print('speedup             : {:.2f}x'.format(baseline / result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Benchmark suite for templateapp.
+
+It times ParsedLine construction, TemplateBuilder.build, reformat, verify,
+and create_unittest/create_pytest/create_python_test on synthetic corpora
+and reports throughput and peak memory.
+
+Usage:
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --sizes 10 100 1000 --output result.json
+    python -m benchmarks.bench_suite --compare baseline.json
+"""
+
+import sys
+import json
+import argparse
+import platform
+import tracemalloc
+from time import perf_counter
+from datetime import datetime
+
+from templateapp import ParsedLine
+from templateapp import TemplateBuilder
+from templateapp import version
+from templateapp.core import line_pattern_cache
+
+
+SHAPES = [
+    'comment__ section {i}',
+    'Item{i}: mixed_words(var_title) number(var_price) -> Record',
+    'name{i} word(var_name) digits(var_count)',
+    'keep__ ^-+ +-+ +-+',
+    'record{i} letters(var_kind) mac_address(var_mac) -> Next.Record',
+    'interface{i} word(var_iface) ipv4_address(var_addr)',
+    'Title{i}   Price   Genre',
+]
+
+
+def create_user_data(lines_count):
+    """return synthetic user data having lines_count lines"""
+    lines = [SHAPES[i % len(SHAPES)].format(i=i) for i in range(lines_count)]
+    return '\n'.join(lines)
+
+
+def create_table_data(rows_count):
+    """return synthetic user data, test data for a table of rows_count rows"""
+    user_data = ('Title   Price   Genre\n'
+                 'mixed_words(var_title)   number(var_price)   '
+                 'words(var_genre) -> Record')
+    lines = ['Title                   Price       Genre']
+    for i in range(rows_count):
+        fmt = 'Book Title {:<12} {:<11} Genre{}'
+        lines.append(fmt.format(i, i % 100, i % 7))
+    return user_data, '\n'.join(lines)
+
+
+def measure(func, repeat=3):
+    """return best wall time in seconds and peak memory in bytes of func"""
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def cold(func):
+    """return a callable that clears LinePattern memo before calling func"""
+    def wrapper():
+        line_pattern_cache.clear()
+        return func()
+    return wrapper
+
+
+def run_size(size, repeat=3):
+    """return benchmark results for a corpus size"""
+    results = []
+
+    def add(name, func, unit, count):
+        elapsed, peak = measure(func, repeat=repeat)
+        results.append(dict(
+            name=name, size=size, seconds=elapsed, peak_memory=peak,
+            unit=unit, throughput=count / elapsed if elapsed else 0.0
+        ))
+
+    user_data = create_user_data(size)
+    lines = user_data.splitlines()
+    add('ParsedLine',
+        cold(lambda: [ParsedLine(x).get_statement() for x in lines]),
+        'lines/s', size)
+    add('TemplateBuilder.build',
+        cold(lambda: TemplateBuilder(user_data=user_data)),
+        'lines/s', size)
+
+    factory = TemplateBuilder(user_data=user_data)
+    template = factory.template
+
+    def reformat():
+        factory.template = template
+        factory.reformat()
+
+    add('TemplateBuilder.reformat', reformat, 'lines/s', size)
+
+    table_user_data, test_data = create_table_data(size)
+    factory = TemplateBuilder(user_data=table_user_data, test_data=test_data)
+    add('TemplateBuilder.verify', factory.verify, 'rows/s', size)
+    add('TemplateBuilder.create_unittest', factory.create_unittest,
+        'rows/s', size)
+    add('TemplateBuilder.create_pytest', factory.create_pytest, 'rows/s', size)
+    add('TemplateBuilder.create_python_test', factory.create_python_test,
+        'rows/s', size)
+    return results
+
+
+def compare(results, baseline):
+    """print throughput ratio of results against baseline"""
+    tbl = {(item['name'], item['size']): item for item in baseline['results']}
+    print('\nComparison against baseline ({}):'.format(baseline['created']))
+    for item in results:
+        other = tbl.get((item['name'], item['size']))
+        if other and other['throughput']:
+            ratio = item['throughput'] / other['throughput']
+            print('  {:<36} {:>7} {:>8.2f}x'.format(item['name'], item['size'],
+                                                    ratio))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='bench_suite')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', type=str, default='')
+    parser.add_argument('--compare', type=str, default='')
+    options = parser.parse_args(argv)
+
+    results = []
+    fmt = '{:<36} {:>7} {:>10.4f}s {:>14.1f} {:<8} {:>10.1f} KiB'
+    for size in options.sizes:
+        for item in run_size(size, repeat=options.repeat):
+            results.append(item)
+            print(fmt.format(item['name'], item['size'], item['seconds'],
+                             item['throughput'], item['unit'],
+                             item['peak_memory'] / 1024))
+            sys.stdout.flush()
+
+    report = dict(
+        created=format(datetime.now(), '%Y-%m-%d %H:%M:%S'),
+        templateapp=version, python=platform.python_version(),
+        platform=platform.platform(), results=results
+    )
+
+    if options.output:
+        with open(options.output, 'w') as stream:
+            json.dump(report, stream, indent=2)
+
+    if options.compare:
+        with open(options.compare) as stream:
+            compare(results, json.load(stream))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,9 @@
 - allow end-user to create template or test script on GUI application.
 """
 
-from templateapp.core import ParsedLine
-from templateapp.core import TemplateBuilder
+import sys
+
+from templateapp.cache import TemplateCache
 from templateapp.config import version
 from templateapp.config import edition
 
@@ -14,6 +15,34 @@ __edition__ = edition
 __all__ = [
     'ParsedLine',
     'TemplateBuilder',
+    'TemplateCache',
     'version',
     'edition',
 ]
+
+# templateapp.core pulls regexapp, dlapp, and textfsm, so that it is
+# imported on first access to keep a headless startup fast.
+lazy_attributes = dict(
+    ParsedLine='templateapp.core',
+    TemplateBuilder='templateapp.core',
+)
+
+
+def __getattr__(name):
+    if name in lazy_attributes:
+        from importlib import import_module
+        value = getattr(import_module(lazy_attributes[name]), name)
+        globals()[name] = value
+        return value
+    fmt = 'module {!r} has no attribute {!r}'
+    raise AttributeError(fmt.format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(lazy_attributes))
+
+
+# a module __getattr__ requires Python 3.7+ (PEP 562)
+if sys.version_info < (3, 7):   # pragma: no cover
+    from templateapp.core import ParsedLine     # noqa: E402
+    from templateapp.core import TemplateBuilder    # noqa: E402
@@ -28,8 +28,6 @@ import platform
 from pathlib import Path
 from pathlib import PurePath
 import yaml
-from io import StringIO
-from textfsm import TextFSM
 
 from pprint import pformat
 from dlapp.collection import Tabular
@@ -37,6 +35,8 @@ from dlapp.collection import Tabular
 from templateapp import TemplateBuilder
 from templateapp.exceptions import TemplateBuilderInvalidFormat
 from templateapp.core import save_file
+from templateapp.supervisor import ParseBudget
+from templateapp.supervisor import parse_within_budget
 from templateapp.config import Data
 
 from templateapp import version
@@ -46,6 +46,8 @@ from templateapp import edition
 __version__ = version
 __edition__ = edition
 
+RESULT_PARSE_BUDGET = ParseBudget(seconds=30, rss=1024 * 1024 * 1024)
+
 
 def get_relative_center_location(parent, width, height):
     """get relative a center location of parent window.
@@ -1439,9 +1441,15 @@ class Application:
                     create_msgbox(title='RegexBuilder Error', error=error)
                     return
 
-            stream = StringIO(template)
-            parser = TextFSM(stream)
-            rows = parser.ParseTextToDicts(self.snapshot.test_data)  # noqa
+            try:
+                rows = parse_within_budget(
+                    template, self.snapshot.test_data,  # noqa
+                    RESULT_PARSE_BUDGET
+                )
+            except Exception as ex:
+                error = '{}: {}'.format(type(ex).__name__, ex)
+                create_msgbox(title='Parsing Error', error=error)
+                return
 
             result = ''
             test_data = self.snapshot.test_data  # noqa
@@ -0,0 +1,488 @@
+"""Module containing the logic for building and verifying in batch."""
+
+import os
+import yaml
+from io import StringIO
+from pathlib import Path
+from time import perf_counter
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+from templateapp.core import TemplateBuilder
+from templateapp.engine import get_parser_class
+from templateapp.parser import get_parser
+from templateapp.parser import iter_rows
+from templateapp.runner import expand_paths
+from templateapp.supervisor import ParseSupervisor
+
+
+class BuildResult:
+    """Result of building a template in batch
+
+    Attributes
+    ----------
+    index (int): a position of spec in batch.
+    spec (dict): keyword arguments of TemplateBuilder.
+    template (str): a generated template.  Empty if building is failed.
+    script (str): a generated test script.  Empty if it is not requested.
+    error (str): an error message.  Empty if building is succeeded.
+    elapsed (float): building time in seconds.
+
+    Properties
+    ----------
+    is_success (bool): True if template is generated, otherwise False.
+    """
+    def __init__(self, index, spec, template='', error='', elapsed=0.0,
+                 script=''):
+        self.index = index
+        self.spec = spec
+        self.template = template
+        self.script = script
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        fmt = '{}(index={}, is_success={})'
+        return fmt.format(type(self).__name__, self.index, self.is_success)
+
+    @property
+    def is_success(self):
+        """return True if template is generated"""
+        return not self.error
+
+
+def to_spec(spec):
+    """return a spec as keyword arguments of TemplateBuilder
+
+    Parameters
+    ----------
+    spec (str, dict): a user data or keyword arguments of TemplateBuilder.
+
+    Returns
+    -------
+    dict: keyword arguments of TemplateBuilder.
+    """
+    if isinstance(spec, dict):
+        return dict(spec)
+    return dict(user_data=spec)
+
+
+SCRIPT_METHODS = dict(unittest='create_unittest', pytest='create_pytest',
+                      snippet='create_python_test')
+
+
+def build_one(index, spec, platform=''):
+    """build a template from spec and capture its error
+
+    Parameters
+    ----------
+    index (int): a position of spec in batch.
+    spec (dict): keyword arguments of TemplateBuilder.
+    platform (str): unittest, pytest, or snippet to also create a test
+            script if spec has test_data.  Default is empty.
+
+    Returns
+    -------
+    BuildResult: a build result.
+    """
+    start = perf_counter()
+    try:
+        factory = TemplateBuilder(**spec)
+        script = ''
+        if platform and factory.test_data:
+            script = getattr(factory, SCRIPT_METHODS[platform])()
+        return BuildResult(index, spec, template=factory.template,
+                           script=script, elapsed=perf_counter() - start)
+    except Exception as ex:
+        error = '{}: {}'.format(type(ex).__name__, ex)
+        return BuildResult(index, spec, error=error,
+                           elapsed=perf_counter() - start)
+
+
+def build_batch(specs, workers=None, ordered=True, platform=''):
+    """build many templates over a process pool
+
+    Parameters
+    ----------
+    specs (iterable): a list of user data or keyword arguments of
+            TemplateBuilder.
+    workers (int): a number of worker processes.  Default is None which
+            uses a number of CPUs.  0 or 1 builds in current process.
+    ordered (bool): yield results in input order.  False will yield
+            results as they are completed.  Default is True.
+    platform (str): unittest, pytest, or snippet to also create test
+            scripts of specs which have test_data.  Default is empty.
+
+    Returns
+    -------
+    generator: a generator of BuildResult.
+    """
+    specs = [to_spec(spec) for spec in specs]
+
+    if workers is not None and workers <= 1:
+        for index, spec in enumerate(specs):
+            yield build_one(index, spec, platform=platform)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(build_one, index, spec, platform)
+                   for index, spec in enumerate(specs)]
+        iterable = futures if ordered else as_completed(futures)
+        for future in iterable:
+            yield future.result()
+
+
+class FileResult:
+    """Result of verifying a test data file
+
+    Attributes
+    ----------
+    path (str): a file path.
+    rows_count (int): total number of parsed rows.
+    error (str): an error message.  Empty if parsing is succeeded.
+    elapsed (float): verifying time in seconds.
+
+    Properties
+    ----------
+    is_passed (bool): True if file is parsed with record(s), otherwise False.
+    """
+    def __init__(self, path, rows_count=0, error='', elapsed=0.0):
+        self.path = path
+        self.rows_count = rows_count
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        fmt = '{}(path={!r}, is_passed={}, rows_count={})'
+        return fmt.format(type(self).__name__, self.path, self.is_passed,
+                          self.rows_count)
+
+    @property
+    def is_passed(self):
+        """return True if file is parsed with record(s)"""
+        return not self.error and self.rows_count > 0
+
+
+class CorpusReport:
+    """Summary of verifying a corpus of test data files
+
+    Attributes
+    ----------
+    results (list): a list of FileResult.
+    elapsed (float): total wall time in seconds.
+
+    Properties
+    ----------
+    is_passed (bool): True if all files are passed.
+    passed_count (int): total number of passed files.
+    failed (list): a list of failed FileResult.
+    rows_count (int): total number of parsed rows.
+
+    Methods
+    -------
+    report() -> str
+    """
+    def __init__(self, results, elapsed=0.0):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def is_passed(self):
+        """return True if all files are passed"""
+        return bool(self.results) and not self.failed
+
+    @property
+    def passed_count(self):
+        """return total number of passed files"""
+        return len(self.results) - len(self.failed)
+
+    @property
+    def failed(self):
+        """return a list of failed FileResult"""
+        return [result for result in self.results if not result.is_passed]
+
+    @property
+    def rows_count(self):
+        """return total number of parsed rows"""
+        return sum(result.rows_count for result in self.results)
+
+    def report(self):
+        """return a summary in text format"""
+        lst = []
+        for result in self.failed:
+            reason = result.error or 'There is no record after parsed.'
+            lst.append('FAILED {} - {}'.format(result.path, reason))
+        fmt = ('Files: {}, passed: {}, failed: {}, rows: {}, '
+               'elapsed: {:.3f}s, throughput: {:.1f} files/s')
+        rate = len(self.results) / self.elapsed if self.elapsed else 0.0
+        lst.append(fmt.format(len(self.results), self.passed_count,
+                              len(self.failed), self.rows_count,
+                              self.elapsed, rate))
+        return '\n'.join(lst)
+
+
+SPEC_SUFFIXES = ('.yaml', '.yml')
+
+
+def read_spec(path):
+    """return keyword arguments of TemplateBuilder of a user data file
+
+    A YAML file is a mapping of TemplateBuilder keyword arguments, i.e.
+    user_data, test_data, and author.  Other files are user data.
+
+    Parameters
+    ----------
+    path (str): a file path.
+
+    Returns
+    -------
+    dict: keyword arguments of TemplateBuilder.
+
+    Raises
+    ------
+    ValueError: raise exception if a YAML file is not a mapping.
+    """
+    with open(path) as stream:
+        content = stream.read()
+    if not path.lower().endswith(SPEC_SUFFIXES):
+        return dict(user_data=content)
+
+    spec = yaml.safe_load(content)
+    if not isinstance(spec, dict) or 'user_data' not in spec:
+        raise ValueError('{} is not a mapping with user_data.'.format(path))
+    return spec
+
+
+class DirectoryReport:
+    """Summary of building templates of a directory
+
+    Attributes
+    ----------
+    results (list): a list of BuildResult in order of input file.
+    paths (list): a list of input file paths in order of results.
+    outputs (list): a list of written file paths.
+    elapsed (float): total time in seconds.
+
+    Properties
+    ----------
+    is_success (bool): True if every template is built.
+    failed (list): a list of (path, BuildResult) of failed files.
+
+    Methods
+    -------
+    report() -> str
+    """
+    def __init__(self, results, paths, outputs, elapsed=0.0):
+        self.results = results
+        self.paths = paths
+        self.outputs = outputs
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        fmt = '{}(files_count={}, failed_count={})'
+        return fmt.format(type(self).__name__, len(self.results),
+                          len(self.failed))
+
+    @property
+    def is_success(self):
+        """return True if every template is built"""
+        return not self.failed
+
+    @property
+    def failed(self):
+        """return a list of (path, BuildResult) of failed files"""
+        pairs = zip(self.paths, self.results)
+        return [(path, result) for path, result in pairs
+                if not result.is_success]
+
+    def report(self):
+        """return a summary in text format"""
+        lst = ['FAILED {} - {}'.format(path, result.error)
+               for path, result in self.failed]
+        fmt = ('Files: {}, built: {}, failed: {}, written: {}, '
+               'elapsed: {:.3f}s, throughput: {:.1f} files/s')
+        rate = len(self.results) / self.elapsed if self.elapsed else 0.0
+        built = len(self.results) - len(self.failed)
+        lst.append(fmt.format(len(self.results), built, len(self.failed),
+                              len(self.outputs), self.elapsed, rate))
+        return '\n'.join(lst)
+
+
+def get_output_paths(path, input_dir, output_dir, platform=''):
+    """return a template path and a test script path of an input file
+
+    i.e. snippets/show/version.txt is written to templates/show/version.textfsm
+    and templates/show/test_version.py or templates/show/version_snippet.py.
+    """
+    relpath = os.path.relpath(path, input_dir)
+    dirname, basename = os.path.split(os.path.splitext(relpath)[0])
+    dirname = os.path.join(output_dir, dirname)
+    template_path = os.path.join(dirname, basename + '.textfsm')
+    if platform == 'snippet':
+        script_path = os.path.join(dirname, basename + '_snippet.py')
+    else:
+        script_path = os.path.join(dirname, 'test_' + basename + '.py')
+    return template_path, script_path
+
+
+def build_directory(input_dir, output_dir, workers=None, platform='',
+                    options=None):
+    """build templates of every user data file of a directory
+
+    Every file under input_dir is built in one process pool, and a template
+    and an optional test script are written side by side under output_dir
+    with a same relative path.
+
+    Parameters
+    ----------
+    input_dir (str): a directory of user data files or YAML spec files.
+    output_dir (str): a directory to write templates and test scripts.
+    workers (int): a number of worker processes.  Default is None which
+            uses a number of CPUs.  0 or 1 builds in current process.
+    platform (str): unittest, pytest, or snippet to also create test
+            scripts of specs which have test_data.  Default is empty.
+    options (dict): common keyword arguments of TemplateBuilder which are
+            overridden by a spec file.  Default is None.
+
+    Returns
+    -------
+    DirectoryReport: a summary of per-file results.
+    """
+    start = perf_counter()
+    paths = expand_paths(input_dir)
+    specs, results = [], [None] * len(paths)
+    positions = []
+    for index, path in enumerate(paths):
+        try:
+            spec = dict(options or dict())
+            spec.update(read_spec(path))
+            specs.append(spec)
+            positions.append(index)
+        except Exception as ex:
+            error = '{}: {}'.format(type(ex).__name__, ex)
+            results[index] = BuildResult(index, dict(), error=error)
+
+    outputs = []
+    batch = build_batch(specs, workers=workers, ordered=False,
+                        platform=platform)
+    for result in batch:
+        index = positions[result.index]
+        result.index = index
+        results[index] = result
+        if not result.is_success:
+            continue
+
+        template_path, script_path = get_output_paths(
+            paths[index], input_dir, output_dir, platform=platform
+        )
+        items = [(template_path, result.template)]
+        if result.script:
+            items.append((script_path, result.script))
+        for filename, content in items:
+            os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+            with open(filename, 'w') as stream:
+                stream.write(content)
+            outputs.append(filename)
+
+    return DirectoryReport(results, paths, outputs,
+                           elapsed=perf_counter() - start)
+
+
+def compile_template(template, engine='textfsm', prefilter=False):
+    """return a new parser of template
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+    engine (str): textfsm or alternation.  Default is textfsm.
+    prefilter (bool): skip lines which no rule of current state can match.
+            Default is False.
+    """
+    cls = get_parser_class(engine=engine, prefilter=prefilter)
+    return cls(StringIO(template))
+
+
+def verify_file(path, parser=None, template='', engine='textfsm',
+                prefilter=False):
+    """parse a test data file via a compiled template
+
+    Parameters
+    ----------
+    path (str): a file path.
+    parser (TextFSM): a compiled parser.  Default is None which uses
+            a process-wide parser of template, so that a worker process
+            compiles template once.
+    template (str): a TextFSM template.  Default is empty.
+    engine (str): textfsm or alternation.  Default is textfsm.
+    prefilter (bool): skip lines which no rule of current state can match.
+            Default is False.
+
+    Returns
+    -------
+    FileResult: a verified result.
+    """
+    start = perf_counter()
+    rows_count = 0
+    try:
+        if parser is None:
+            parser = get_parser(template, engine=engine,
+                                prefilter=prefilter).parser
+        for _ in iter_rows(parser, Path(path)):
+            rows_count += 1
+        return FileResult(path, rows_count=rows_count,
+                          elapsed=perf_counter() - start)
+    except Exception as ex:
+        error = '{}: {}'.format(type(ex).__name__, ex)
+        return FileResult(path, rows_count=rows_count, error=error,
+                          elapsed=perf_counter() - start)
+
+
+def verify_corpus(template, paths, workers=None, engine='textfsm',
+                  budget=None, prefilter=False):
+    """verify many test data files against template over a process pool
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+    paths (str, list): a file path, a directory, a glob pattern, or a list
+            of them.
+    workers (int): a number of worker processes.  Default is None which
+            uses a number of CPUs.  0 or 1 verifies in current process.
+    engine (str): textfsm or alternation.  Default is textfsm.
+    budget (ParseBudget): a budget per file.  A file is parsed by a
+            supervised worker which is killed and reported as failed if it
+            exceeds budget.  Default is None.
+    prefilter (bool): skip lines which no rule of current state can match.
+            Default is False.
+
+    Returns
+    -------
+    CorpusReport: a summary of per-file results in order of file path.
+    """
+    start = perf_counter()
+    paths = expand_paths(paths)
+
+    if budget:
+        size = max(workers or os.cpu_count() or 1, 1)
+        with ParseSupervisor(size=size, budget=budget) as supervisor:
+            items = supervisor.parse_many(template, map(Path, paths),
+                                          engine=engine, prefilter=prefilter,
+                                          count_only=True)
+        results = [FileResult(path, rows_count=item.rows_count,
+                              error=item.error, elapsed=item.elapsed)
+                   for path, item in zip(paths, items)]
+    elif workers is not None and workers <= 1:
+        parser = compile_template(template, engine=engine, prefilter=prefilter)
+        results = [verify_file(path, parser=parser) for path in paths]
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(paths) // (workers * 4))
+        # template is sent with every task instead of a pool initializer
+        # which requires Python 3.7+
+        func = partial(verify_file, template=template, engine=engine,
+                       prefilter=prefilter)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(func, paths, chunksize=chunksize))
+
+    return CorpusReport(results, elapsed=perf_counter() - start)
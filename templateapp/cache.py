@@ -0,0 +1,251 @@
+"""Module containing the caching logic for templateapp."""
+
+import os
+import copy
+import json
+import hashlib
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from pathlib import Path
+from pathlib import PurePath
+
+from templateapp.config import Data
+
+import logging
+logger = logging.getLogger(__file__)
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache
+
+    Attributes
+    ----------
+    maxsize (int): maximum number of entries.  Default is 128.
+    hits (int): total number of cache hits.
+    misses (int): total number of cache misses.
+
+    Properties
+    ----------
+    stats (dict): hits, misses, size, and maxsize of cache.
+
+    Methods
+    -------
+    get(key, default=None) -> object
+    set(key, value) -> None
+    clear() -> None
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = max(int(maxsize), 1)
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    @property
+    def stats(self):
+        """return hits, misses, size, and maxsize of cache"""
+        return dict(hits=self.hits, misses=self.misses,
+                    size=len(self._data), maxsize=self.maxsize)
+
+    def get(self, key, default=None):
+        """return a cached value and mark it as recently used
+
+        Parameters
+        ----------
+        key (hashable): a cache key.
+        default (object): a returned value if key is not cached.
+
+        Returns
+        -------
+        object: a cached value or default.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """store value and evict the least recently used entry if cache is full
+
+        Parameters
+        ----------
+        key (hashable): a cache key.
+        value (object): a value.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """remove all entries and reset hits and misses counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class TemplateCache:
+    """Content-addressed cache for generated templates
+
+    A memory tier keeps a generated template together with its compiled
+    TextFSM parser.  A parser keeps parsing state, so that every get returns
+    a private copy of a cached parser.  An optional disk tier keeps only
+    template text under /home_dir/.geekstrident/templateapp/cache so that
+    it survives between processes.
+
+    Attributes
+    ----------
+    memory (LRUCache): a memory tier.
+    directory (str): a directory of disk tier.  Empty string disables
+            disk tier.
+    hits (int): total number of cache hits.
+    misses (int): total number of cache misses.
+    disk_hits (int): total number of cache hits served by disk tier.
+
+    Properties
+    ----------
+    stats (dict): hits, misses, and size of cache.
+
+    Methods
+    -------
+    TemplateCache.make_key(user_data, **options) -> str
+    get(key) -> dict or None
+    set(key, template, parser=None) -> None
+    clear(disk=False) -> None
+    """
+    logger = logger
+
+    def __init__(self, maxsize=256, disk=False, directory=''):
+        self.memory = LRUCache(maxsize=maxsize)
+        if disk:
+            self.directory = str(directory or Data.template_cache_dirname)
+        else:
+            self.directory = ''
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hits=0, misses=0, disk_hits=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.disk_hits += disk_hits
+
+    @property
+    def stats(self):
+        """return hits, misses, and size of cache"""
+        return dict(hits=self.hits, misses=self.misses,
+                    disk_hits=self.disk_hits, size=len(self.memory),
+                    maxsize=self.memory.maxsize)
+
+    @classmethod
+    def make_key(cls, user_data, **options):
+        """return a content hash of user_data and builder options
+
+        Created date is a part of template comment so that a current date
+        is a part of key, too.
+
+        Parameters
+        ----------
+        user_data (str): a user data.
+        options (dict): builder options i.e. author, email, company, ...
+
+        Returns
+        -------
+        str: a sha256 hex digest.
+        """
+        node = dict(
+            user_data=user_data, options=options,
+            created_date=format(datetime.now(), '%Y-%m-%d')
+        )
+        data = json.dumps(node, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _get_filename(self, key):
+        return str(PurePath(self.directory, '{}.textfsm'.format(key)))
+
+    def get(self, key):
+        """return a cached entry
+
+        Parameters
+        ----------
+        key (str): a cache key.
+
+        Returns
+        -------
+        dict: an entry with template and a private copy of its parser if
+                found, otherwise None.  parser is None if an entry is served
+                from disk tier.
+        """
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._count(hits=1)
+            return dict(template=entry['template'],
+                        parser=copy.deepcopy(entry['parser']))
+
+        if self.directory:
+            node = Path(self._get_filename(key))
+            try:
+                if node.exists():
+                    entry = dict(template=node.read_text(), parser=None)
+                    self._count(hits=1, disk_hits=1)
+                    return entry
+            except Exception as ex:
+                self.logger.warning('{}: {}'.format(type(ex).__name__, ex))
+
+        self._count(misses=1)
+        return None
+
+    def set(self, key, template, parser=None):
+        """store template and its parser
+
+        Parameters
+        ----------
+        key (str): a cache key.
+        template (str): a generated template.
+        parser (TextFSM): a compiled parser of template.  A copy is cached
+                so that a later use of parser does not change cached one.
+                Default is None.
+        """
+        self.memory.set(key, dict(template=template,
+                                  parser=copy.deepcopy(parser)))
+
+        if self.directory:
+            filename = self._get_filename(key)
+            tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+            try:
+                Path(self.directory).mkdir(parents=True, exist_ok=True)
+                with open(tmp_filename, 'w') as stream:
+                    stream.write(template)
+                os.replace(tmp_filename, filename)
+            except Exception as ex:
+                self.logger.warning('{}: {}'.format(type(ex).__name__, ex))
+
+    def clear(self, disk=False):
+        """remove all entries of memory tier and reset counters
+
+        Parameters
+        ----------
+        disk (bool): also remove all entries of disk tier.  Default is False.
+        """
+        self.memory.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.disk_hits = 0
+        if disk and self.directory and Path(self.directory).is_dir():
+            for node in Path(self.directory).glob('*.textfsm'):
+                node.unlink()
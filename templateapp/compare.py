@@ -0,0 +1,194 @@
+"""Module containing the logic for comparing parsed rows with expected rows."""
+
+import os
+import json
+from itertools import zip_longest
+
+# a number of reported mismatches of a verification of a whole result
+MAX_MISMATCHES = 20
+
+
+def iter_jsonl(source):
+    """yield records of a JSON Lines source one by one
+
+    Parameters
+    ----------
+    source (str, os.PathLike, file object): a file path or a file object
+            in text mode.  Blank lines are skipped.
+
+    Returns
+    -------
+    generator: a generator of dict.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as stream:
+            yield from iter_jsonl(stream)
+        return
+
+    for line in source:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_expected(expected_result):
+    """yield expected records from a list, a Columns, or a JSON Lines file
+
+    Parameters
+    ----------
+    expected_result (list, Columns, str, os.PathLike, file object): a list
+            of dictionary, a columnar result, or a JSON Lines source.
+
+    Returns
+    -------
+    generator: a generator of dict.
+    """
+    if isinstance(expected_result, (str, os.PathLike)):
+        yield from iter_jsonl(expected_result)
+    elif hasattr(expected_result, 'read'):
+        yield from iter_jsonl(expected_result)
+    else:
+        yield from expected_result
+
+
+class Mismatch:
+    """A differing row of parsed result and expected result
+
+    Attributes
+    ----------
+    index (int): a row position.
+    fields (list): a list of differing field names.  Empty if a row is missing.
+    actual (dict): a parsed row.  None if parsed result has no row at index.
+    expected (dict): an expected row.  None if expected result has no row
+            at index.
+    """
+    def __init__(self, index, fields, actual, expected):
+        self.index = index
+        self.fields = fields
+        self.actual = actual
+        self.expected = expected
+
+    def __repr__(self):
+        fmt = '{}(index={}, fields={!r})'
+        return fmt.format(type(self).__name__, self.index, self.fields)
+
+    def to_dict(self):
+        """return mismatch as dictionary"""
+        return dict(index=self.index, fields=self.fields)
+
+    def describe(self):
+        """return a one-line description of mismatch"""
+        if self.actual is None:
+            return 'Row {}: missing parsed row'.format(self.index)
+        if self.expected is None:
+            return 'Row {}: unexpected parsed row'.format(self.index)
+
+        lst = []
+        for name in self.fields:
+            fmt = '{}: {!r} != {!r}'
+            lst.append(fmt.format(name, self.actual.get(name, '<missing>'),
+                                  self.expected.get(name, '<missing>')))
+        return 'Row {}: {}'.format(self.index, ', '.join(lst))
+
+
+class Comparison:
+    """Result of comparing parsed rows with expected rows
+
+    Attributes
+    ----------
+    mismatches (list): a list of Mismatch in order of row.
+    rows_count (int): total number of compared parsed rows.
+    expected_rows_count (int): total number of compared expected rows.
+    is_stopped (bool): True if comparison stopped at max_mismatches
+            before consuming both results.
+
+    Properties
+    ----------
+    is_matched (bool): True if there is no mismatch.
+
+    Methods
+    -------
+    to_index() -> dict
+    report() -> str
+    """
+    def __init__(self):
+        self.mismatches = []
+        self.rows_count = 0
+        self.expected_rows_count = 0
+        self.is_stopped = False
+
+    def __repr__(self):
+        fmt = '{}(is_matched={}, mismatches_count={})'
+        return fmt.format(type(self).__name__, self.is_matched,
+                          len(self.mismatches))
+
+    @property
+    def is_matched(self):
+        """return True if there is no mismatch"""
+        return not self.mismatches
+
+    def to_index(self):
+        """return a compact index of differing rows and fields
+
+        Returns
+        -------
+        dict: a mapping of row position to a list of differing field names.
+                An empty list means a missing or an unexpected row.
+        """
+        return dict((item.index, item.fields) for item in self.mismatches)
+
+    def report(self):
+        """return a summary in text format"""
+        lst = [item.describe() for item in self.mismatches]
+        if self.is_stopped:
+            fmt = 'Comparison stopped after {} mismatch(es) at row {}.'
+            lst.append(fmt.format(len(self.mismatches),
+                                  self.mismatches[-1].index))
+        return '\n'.join(lst)
+
+
+def compare_rows(rows, expected_result, max_mismatches=None):
+    """compare parsed rows with expected rows one by one
+
+    Both sides are consumed lazily so that neither result is held in
+    memory, and comparison stops as soon as max_mismatches is reached.
+
+    Parameters
+    ----------
+    rows (iterable): an iterable of parsed dictionary.
+    expected_result (list, Columns, str, os.PathLike, file object): a list
+            of dictionary, a columnar result, or a JSON Lines source.
+    max_mismatches (int): a number of mismatches to stop comparing.
+            Default is None which compares all rows.
+
+    Returns
+    -------
+    Comparison: a comparison result.
+    """
+    comparison = Comparison()
+    pairs = zip_longest(rows, iter_expected(expected_result))
+    for index, (actual, expected) in enumerate(pairs):
+        if actual is not None:
+            comparison.rows_count += 1
+        if expected is not None:
+            comparison.expected_rows_count += 1
+
+        if actual is None or expected is None:
+            fields = []
+        elif actual == expected:
+            continue
+        else:
+            names = list(actual)
+            names.extend(name for name in expected if name not in actual)
+            fields = [name for name in names
+                      if name not in actual or name not in expected
+                      or actual[name] != expected[name]]
+
+        comparison.mismatches.append(
+            Mismatch(index, fields, actual and dict(actual),
+                     expected and dict(expected))
+        )
+        if max_mismatches and len(comparison.mismatches) >= max_mismatches:
+            comparison.is_stopped = True
+            break
+    return comparison
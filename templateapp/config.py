@@ -2,15 +2,11 @@
 
 from os import path
 from textwrap import dedent
+from importlib import import_module
 
 from pathlib import Path
 from pathlib import PurePath
 
-import regexapp
-import dlapp
-import textfsm
-import yaml
-
 __version__ = '0.1.9'
 version = __version__
 __edition__ = 'Community'
@@ -23,6 +19,62 @@ __all__ = [
 ]
 
 
+def get_package_version(distribution, module_name=''):
+    """return an installed version of a package without importing it
+
+    Parameters
+    ----------
+    distribution (str): a distribution name, i.e. PyYAML.
+    module_name (str): a module name to read __version__ if distribution
+            metadata is not found.  Default is empty.
+
+    Returns
+    -------
+    str: a version.  Empty if package is not found.
+    """
+    try:
+        from importlib import metadata
+    except ImportError:     # pragma: no cover - Python < 3.8
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            metadata = None
+
+    if metadata is not None:
+        try:
+            return metadata.version(distribution)
+        except metadata.PackageNotFoundError:
+            pass
+    try:
+        module = import_module(module_name or distribution)
+        version = getattr(module, 'version', '')
+        return str(getattr(module, '__version__', version))
+    except ImportError:
+        return ''
+
+
+class PackageText:
+    """Class attribute which formats a package version on first access
+
+    Attributes
+    ----------
+    name (str): a package name to show.
+    distribution (str): a distribution name.  Default is name.
+    module_name (str): a module name.  Default is name.
+    """
+    def __init__(self, name, distribution='', module_name=''):
+        self.name = name
+        self.distribution = distribution or name
+        self.module_name = module_name or name
+        self.text = ''
+
+    def __get__(self, instance, owner):
+        if not self.text:
+            version_ = get_package_version(self.distribution, self.module_name)
+            self.text = '{} v{}'.format(self.name, version_)
+        return self.text
+
+
 class Data:
     # app yaml files
     user_template_filename = str(
@@ -33,20 +85,29 @@ class Data:
             'user_templates.yaml')
     )
 
+    # app cache directory
+    template_cache_dirname = str(
+        PurePath(
+            Path.home(),
+            '.geekstrident',
+            'templateapp',
+            'cache')
+    )
+
     # main app
     main_app_text = 'TemplateApp {} ({} Edition)'.format(version, edition)
 
     # packages
-    regexapp_text = 'regexapp v{}'.format(regexapp.version)
+    regexapp_text = PackageText('regexapp')
     regexapp_link = 'https://pypi.org/project/regexapp/'
 
-    dlapp_text = 'dlapp v{}'.format(dlapp.version)
+    dlapp_text = PackageText('dlapp')
     dlapp_link = 'https://pypi.org/project/dlapp/'
 
-    textfsm_text = 'textfsm v{}'.format(textfsm.__version__)
+    textfsm_text = PackageText('textfsm')
     textfsm_link = 'https://pypi.org/project/textfsm/'
 
-    pyyaml_text = 'pyyaml v{}'.format(yaml.__version__)
+    pyyaml_text = PackageText('pyyaml', 'PyYAML', 'yaml')
     pyyaml_link = 'https://pypi.org/project/PyYAML/'
 
     # company
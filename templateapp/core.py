@@ -1,9 +1,10 @@
 """Module containing the logic for template builder."""
 
 import re
+import copy
+from difflib import SequenceMatcher
 from datetime import datetime
 from textwrap import indent
-from textfsm import TextFSM
 from io import StringIO
 from pprint import pformat
 from textwrap import dedent
@@ -14,14 +15,34 @@ from regexapp.core import enclose_string
 from dlapp.collection import Tabular
 from dlapp.utils import Printer
 
-from templateapp.exceptions import TemplateParsedLineError
 from templateapp.exceptions import TemplateBuilderError
 from templateapp.exceptions import TemplateBuilderInvalidFormat
+from templateapp.exceptions import TemplateParseBudgetError
 from templateapp.config import edition
+from templateapp.cache import LRUCache
+from templateapp.parser import iter_records
+from templateapp.parser import iter_rows
+from templateapp.parser import get_parser
+from templateapp.parser import iter_columns
+from templateapp.parser import Columns
+from templateapp.lexer import tokenize
+from templateapp.lexer import is_a_word
+from templateapp.lexer import is_not_containing_letter
+from templateapp.validator import validate_template
+from templateapp.stats import PhaseStats
+from templateapp.engine import get_parser_class
+from templateapp.compare import compare_rows
+from templateapp.compare import MAX_MISMATCHES
+from templateapp.redos import analyze_template
+from templateapp.profiler import ProfilingTextFSM
 
 import logging
 logger = logging.getLogger(__file__)
 
+# statement and variables of LinePattern are shared by all ParsedLine
+# instances in process, keyed by (line, ignore_case)
+line_pattern_cache = LRUCache(maxsize=4096)
+
 
 def save_file(filename, content):
     """Save data to file
@@ -62,11 +83,8 @@ class ParsedLine:
     Methods
     -------
     build() -> None
+    build_line_pattern() -> tuple
     get_statement() -> str
-
-    Raises
-    -------
-    TemplateParsedLineError: raise exception if there is invalid format for parsing.
     """
     def __init__(self, text):
         self.text = str(text)
@@ -88,7 +106,7 @@ class ParsedLine:
     @property
     def is_a_word(self):
         """return True if text is a single word"""
-        return bool(re.match(r'[a-z]\w+$', self.text.rstrip(), re.I))
+        return is_a_word(self.text)
 
     @property
     def is_not_containing_letter(self):
@@ -96,7 +114,7 @@ class ParsedLine:
         if self.is_empty:
             return False
 
-        return bool(re.match(r'[^a-z0-9]+$', self.line, re.I))
+        return is_not_containing_letter(self.line)
 
     def get_statement(self):
         """return a statement for building template
@@ -117,23 +135,13 @@ class ParsedLine:
         if self.is_a_word:
             return self.text
 
-        pat_obj = LinePattern(self.line, ignore_case=self.ignore_case)
-
-        if pat_obj.variables:
-            self.variables = pat_obj.variables[:]
-            statement = pat_obj.statement
-        else:
-            try:
-                re.compile(self.line)
-                if re.search(r'\s', self.line):
-                    statement = pat_obj
-                else:
-                    if '(' in self.line and self.line.endswith(')'):
-                        statement = pat_obj if not pat_obj.endswith(')') else self.line
-                    else:
-                        statement = self.line
-            except Exception as ex:     # noqa
-                statement = pat_obj
+        key = (self.line, self.ignore_case)
+        cached = line_pattern_cache.get(key)
+        if cached is None:
+            cached = self.build_line_pattern()
+            line_pattern_cache.set(key, cached)
+        statement, variables = cached
+        self.variables = list(variables)
 
         statement = statement.replace('(?i)^', '^(?i)')
         spacer = '  ' if statement.startswith('^') else '  ^'
@@ -144,60 +152,119 @@ class ParsedLine:
             statement = '{} -> {}'.format(statement, self.template_op)
         return statement
 
-    def build(self):
-        """parse line to reapply for building template"""
-        lst = self.text.rsplit(' -> ', 1)
-        if len(lst) == 2:
-            tmpl_op = lst[-1].strip()
-            first, *remaining = tmpl_op.split(' ', 1)
-
-            tbl = {'norecord': 'NoRecord', 'clearall': 'ClearAll'}
-            if '.' in first:
-                pat = r'(?P<lop>next|continue|error)\.' \
-                      r'(?P<rop>norecord|record|clearall|clear)$'
-                match = re.match(pat, first, re.I)
-                if match:
-                    lop = match.group('lop').title()
-                    rop = match.group('rop').title()
-                    rop = tbl.get(rop.lower(), rop)
-                    op = '{}.{}'.format(lop, rop)
-                else:
-                    op = first
-                tmpl_op = '{} {}'.format(op, ''.join(remaining))
+    def build_line_pattern(self):
+        """return a pattern statement and variables of line via LinePattern
+
+        Returns
+        -------
+        tuple: a pattern statement and a tuple of variables.
+        """
+        pat_obj = LinePattern(self.line, ignore_case=self.ignore_case)
+
+        if pat_obj.variables:
+            return str(pat_obj.statement), tuple(pat_obj.variables)
+
+        try:
+            re.compile(self.line)
+            if re.search(r'\s', self.line):
+                statement = pat_obj
             else:
-                pat = r'(next|continue|error|norecord|record|clearall|clear)$'
-                if re.match(pat, first, re.I):
-                    op = first.title()
-                    op = tbl.get(op.lower(), op)
+                if '(' in self.line and self.line.endswith(')'):
+                    if pat_obj.endswith(')'):
+                        statement = self.line
+                    else:
+                        statement = pat_obj
                 else:
-                    op = first
-                tmpl_op = '{} {}'.format(op, ''.join(remaining))
+                    statement = self.line
+        except Exception as ex:     # noqa
+            statement = pat_obj
+        return str(statement), tuple()
 
-            self.template_op = tmpl_op.strip()
-            text = lst[0].rstrip()
-        else:
-            text = self.text
+    def build(self):
+        """parse line to reapply for building template"""
+        token = tokenize(self.text)
+        self.template_op = token.template_op
+        self.ignore_case = token.flag == 'ignore_case'
+        self.is_comment = token.flag == 'comment'
+        self.is_kept = token.flag == 'keep'
+        self.line = token.line
 
-        pat = r'^(?P<flag>(ignore_case|comment|keep)__+ )?(?P<line>.*)'
-        match = re.match(pat, text, re.I)
-        if match:
-            value = match.group('flag') or ''
-            flag = value.lower().strip().rstrip('_')
-            self.ignore_case = flag == 'ignore_case'
-            self.is_comment = flag == 'comment'
-            self.is_kept = flag == 'keep'
-            self.line = match.group('line') or ''
+        if self.is_comment:
+            prefix = '  ' if token.flag_text.count('_') == 2 else ''
+            self.comment_text = '{}# {}'.format(prefix, self.line)
+
+        if self.is_kept:
+            self.kept_text = '  ^{}'.format(self.line.strip().lstrip('^'))
 
-            if self.is_comment:
-                prefix = '  ' if value.count('_') == 2 else ''
-                self.comment_text = '{}# {}'.format(prefix, self.line)
 
-            if self.is_kept:
-                self.kept_text = '  ^{}'.format(self.line.strip().lstrip('^'))
+class VariableRegistry:
+    """Insertion-ordered registry of template variables
 
-        else:
-            error = 'Invalid format - {!r}'.format(self.text)
-            raise TemplateParsedLineError(error)
+    Attributes
+    ----------
+    variables (list): a list of unique variables in insertion order.
+    conflicts (list): a list of same-name but different-pattern messages.
+
+    Methods
+    -------
+    add(variable) -> bool
+    check() -> None
+    clear() -> None
+
+    Raises
+    ------
+    TemplateBuilderError: raise exception if there is a variable conflict.
+    """
+    def __init__(self):
+        self.variables = []
+        self.conflicts = []
+        self._index = dict()
+        self._patterns = dict()
+
+    def __len__(self):
+        return len(self.variables)
+
+    def __iter__(self):
+        return iter(self.variables)
+
+    def add(self, variable):
+        """register variable if it is not registered
+
+        Parameters
+        ----------
+        variable (regexapp.core.VarCls): a variable.
+
+        Returns
+        -------
+        bool: True if variable is newly registered, otherwise False.
+        """
+        key = (variable.name, variable.pattern)
+        if key in self._index:
+            return False
+
+        pattern = self._patterns.get(variable.name)
+        if pattern is not None:
+            fmt = 'variable {!r} has conflicting patterns {!r} and {!r}'
+            self.conflicts.append(fmt.format(variable.name, pattern,
+                                             variable.pattern))
+            return False
+
+        self._index[key] = variable
+        self._patterns[variable.name] = variable.pattern
+        self.variables.append(variable)
+        return True
+
+    def check(self):
+        """raise TemplateBuilderError if there is a variable conflict"""
+        if self.conflicts:
+            raise TemplateBuilderError('; '.join(self.conflicts))
+
+    def clear(self):
+        """remove all registered variables and conflicts"""
+        self.variables.clear()
+        self.conflicts.clear()
+        self._index.clear()
+        self._patterns.clear()
 
 
 class TemplateBuilder:
@@ -215,22 +282,64 @@ class TemplateBuilder:
     filename (str): a saving file name for a generated test script to file name.
     other_options (dict): other options for Pro or Enterprise edition.
     variables (list): a list of variable.
+    registry (VariableRegistry): an index of variables.
     statements (list): a list of template statement.
+    line_entries (list): a list of line, statement, and variables of user data.
+            A cache hit skips prepare, so that line_entries, statements,
+            and variables are prepared on their first use.
     template (str): a generated template.
     template_parser (TextFSM): instance of TextFSM.
+    parser (TemplateParser): a reusable parser of template which is
+            shared by process and is safe to use from many threads.
     verified_message (str): a verified message.
+    comparison (Comparison): a row-level diff index of the last verification
+            against expected result.  None if it is not compared.
     debug (bool): a flag to check bad template.
     bad_template (str): a bad generated template.
+    cache (TemplateCache): a cache for generated template.  Default is None.
+    cache_key (str): a content hash of user_data and options if cache is used.
+    lazy (bool): create TextFSM parser on first use of template_parser.
+            Template is checked by a structural validator.  Default is False.
+    prefilter (bool): skip input lines which no rule of current state can
+            match by a combined scan of required rule literals before any
+            rule regex runs.  Default is False.
+    engine (str): a parse engine, textfsm or alternation which matches all
+            rules of a state in one regex call.  Default is textfsm.
+    stats (PhaseStats): wall time and call counts of prepare, parse_line,
+            build_template_comment, reformat, textfsm_compile, and
+            verify_parse.  It is only recorded if profile is True or
+            a PhaseStats instance.
+    check_redos (bool): flag Value patterns and rules of a built template
+            which can backtrack catastrophically.  Default is False.
+    redos_findings (list): a list of Finding of the last ReDoS check.
+    rule_profile (RuleProfile): per-rule hit counters and regex time of
+            the last profiling parse.  None if it is not profiled.
 
     Methods
     -------
     TemplateBuilder.convert_to_string(data) -> str
+    TemplateBuilder.build_many(specs, workers=None, ordered=True) -> generator
+    parse_line(line) -> tuple
+    collect() -> None
     prepare() -> None
     build_template_comment() -> None
     reformat() -> None
     build() -> None
+    assemble() -> None
+    rebuild(user_data) -> None
+    analyze_redos(fuzzing=False, budget=0.2) -> list
+    apply_edit(line_no, new_text) -> None
     show_debug_info(test_result=None, expected_result=None) -> None
-    verify(expected_rows_count=None, expected_result=None, debug=False) -> bool
+    verify(expected_rows_count=None, expected_result=None, debug=False,
+            columnar=False, profile_rules=False, budget=None,
+            max_mismatches=20) -> bool
+    parse(source=None, columnar=False, budget=None) -> list or Columns
+    profile_rules(source=None) -> RuleProfile
+    iter_parse(source=None) -> generator
+    verify_stream(source=None, expected_rows_count=None,
+            expected_result=None, max_mismatches=None) -> bool
+    verify_corpus(paths, workers=None, budget=None) -> CorpusReport
+    optimize(paths=None, check_corpus=True, repeat=3) -> OptimizationResult
     create_unittest() -> str
     create_pytest() -> str
     create_python_test() -> str
@@ -240,13 +349,16 @@ class TemplateBuilder:
     TemplateBuilderError: will raise exception if a created template is invalid.
     TemplateBuilderInvalidFormat: will raise exception if
             user_data has invalid format.
+    TemplateParseBudgetError: will raise exception if a budgeted parse
+            exceeds its budget.
     """
     logger = logger
 
     def __init__(self, test_data='', user_data='', namespace='',
                  author='', email='', company='', description='',
-                 filename='', debug=False,
-                 **other_options):
+                 filename='', debug=False, cache=None, lazy=False,
+                 profile=False, prefilter=False, engine='textfsm',
+                 check_redos=False, **other_options):
         self.test_data = TemplateBuilder.convert_to_string(test_data)
         self.user_data = TemplateBuilder.convert_to_string(user_data)
         self.namespace = str(namespace)
@@ -256,16 +368,97 @@ class TemplateBuilder:
         self.description = TemplateBuilder.convert_to_string(description)
         self.filename = str(filename)
         self.other_options = other_options
-        self.variables = []
-        self.statements = []
+        self.registry = VariableRegistry()
+        self._statements = []
+        self._line_entries = []
+        self._is_prepared = False
         self.template = ''
-        self.template_parser = None
+        self._template_parser = None
         self.verified_message = ''
+        self.comparison = None
         self.debug = debug
         self.bad_template = ''
+        self.cache = cache
+        self.cache_key = ''
+        self.lazy = lazy
+        self.prefilter = bool(prefilter)
+        self.engine = engine
+        self.check_redos = check_redos
+        self.redos_findings = []
+        self.rule_profile = None
+        if isinstance(profile, PhaseStats):
+            self.stats = profile
+        else:
+            self.stats = PhaseStats(enabled=bool(profile))
 
         self.build()
 
+    @property
+    def template_parser(self):
+        """return TextFSM parser of template, create it if it is not created
+
+        Raises
+        ------
+        TemplateBuilderError: will raise exception if a created template
+                is invalid.
+        """
+        if self._template_parser is None and self.template:
+            try:
+                with self.stats.timer('textfsm_compile'):
+                    stream = StringIO(self.template)
+                    cls = get_parser_class(self.engine, self.prefilter)
+                    self._template_parser = cls(stream)
+            except Exception as ex:
+                error = '{}: {}'.format(type(ex).__name__, ex)
+                raise TemplateBuilderError(error)
+        return self._template_parser
+
+    @template_parser.setter
+    def template_parser(self, parser):
+        self._template_parser = parser
+
+    @property
+    def parser(self):
+        """return a reusable TemplateParser of template
+
+        A compiled parser is shared by every TemplateBuilder having the same
+        template, and it is safe to use from many threads.
+
+        Raises
+        ------
+        TemplateBuilderError: will raise exception if a created template
+                is invalid.
+        """
+        # verify resets and parses on template_parser, so that a shared
+        # parser gets its own copy instead of a compile
+        return get_parser(
+            self.template, engine=self.engine, prefilter=self.prefilter,
+            parser_factory=lambda: copy.deepcopy(self.template_parser)
+        )
+
+    @property
+    def line_entries(self):
+        """return line entries of user data, prepare them on first use"""
+        self._is_prepared or self.prepare()
+        return self._line_entries
+
+    @line_entries.setter
+    def line_entries(self, entries):
+        self._line_entries = entries
+        self._is_prepared = True
+
+    @property
+    def statements(self):
+        """return template statements, prepare them on first use"""
+        self._is_prepared or self.prepare()
+        return self._statements
+
+    @property
+    def variables(self):
+        """return variables, prepare them on first use"""
+        self._is_prepared or self.prepare()
+        return self.registry.variables
+
     @classmethod
     def convert_to_string(cls, data):
         """convert data to string
@@ -283,32 +476,66 @@ class TemplateBuilder:
         else:
             return str(data)
 
-    def prepare(self):
-        """prepare data to build template"""
-        for line in self.user_data.splitlines():
-            line = line.rstrip()
+    @classmethod
+    def build_many(cls, specs, workers=None, ordered=True):
+        """build many templates over a process pool
 
-            parsed_line = ParsedLine(line)
-            statement = parsed_line.get_statement()
-            if statement.endswith(r'\$$'):
-                statement = '{}$$'.format(statement[:-3])
-            elif r'\$$ -> ' in statement:
-                statement = statement.replace(r'\$$ -> ', '$$ -> ')
-            statement = statement.replace(r'\$', r'\x24')
+        Parameters
+        ----------
+        specs (iterable): a list of user data or keyword arguments of
+                TemplateBuilder.
+        workers (int): a number of worker processes.  Default is None which
+                uses a number of CPUs.  0 or 1 builds in current process.
+        ordered (bool): yield results in input order.  False will yield
+                results as they are completed.  Default is True.
 
+        Returns
+        -------
+        generator: a generator of templateapp.batch.BuildResult.
+        """
+        from templateapp.batch import build_batch
+        return build_batch(specs, workers=workers, ordered=ordered)
+
+    def parse_line(self, line):
+        """return a line entry of user data line
+
+        Parameters
+        ----------
+        line (str): a line of user data.
+
+        Returns
+        -------
+        tuple: a line, a template statement, and a tuple of variables.
+        """
+        with self.stats.timer('parse_line'):
+            parsed_line = ParsedLine(line.rstrip())
+            statement = parsed_line.get_statement()
+        if statement.endswith(r'\$$'):
+            statement = '{}$$'.format(statement[:-3])
+        elif r'\$$ -> ' in statement:
+            statement = statement.replace(r'\$$ -> ', '$$ -> ')
+        statement = statement.replace(r'\$', r'\x24')
+        return line, statement, tuple(parsed_line.variables)
+
+    def collect(self):
+        """collect statements and variables from line entries"""
+        self.statements.clear()
+        self.registry.clear()
+        for _, statement, variables in self.line_entries:
             if statement:
                 self.statements.append(statement)
             else:
                 self.statements and self.statements.append(statement)
 
-            if parsed_line.variables:
-                for v in parsed_line.variables:
-                    is_identical = False
-                    for item in self.variables:
-                        if v.name == item.name and v.pattern == item.pattern:
-                            is_identical = True
-                            break
-                    not is_identical and self.variables.append(v)
+            for v in variables:
+                self.registry.add(v)
+
+    def prepare(self):
+        """prepare data to build template"""
+        with self.stats.timer('prepare'):
+            self.line_entries = [self.parse_line(line)
+                                 for line in self.user_data.splitlines()]
+            self.collect()
 
     def build_template_comment(self):
         """return a template comment including created by, email, company,
@@ -371,21 +598,80 @@ class TemplateBuilder:
                 user_data has invalid format.
         """
         self.template = ''
+        if self.cache is not None:
+            self.cache_key = self.cache.make_key(
+                self.user_data, namespace=self.namespace,
+                author=self.author, email=self.email, company=self.company,
+                description=self.description, other_options=self.other_options
+            )
+            entry = self.cache.get(self.cache_key)
+            if entry:
+                # a hit does not parse user data, line entries, statements,
+                # and variables are prepared on their first use
+                self._is_prepared = False
+                self.template = entry.get('template')
+                parser = entry.get('parser')
+                cls = get_parser_class(self.engine, self.prefilter)
+                if parser is not None and type(parser) is not cls:
+                    parser = None
+                self.template_parser = parser
+                if self._template_parser is None and not self.lazy:
+                    self.cache.set(self.cache_key, self.template,
+                                   self.template_parser)
+                self.check_redos and self.analyze_redos()
+                return
+
         self.prepare()
+        self.assemble()
+        if self.cache is not None and self.template:
+            self.cache.set(self.cache_key, self.template,
+                           self._template_parser)
+        self.check_redos and self.analyze_redos()
+
+    def assemble(self):
+        """assemble template from statements and variables then compile it
+
+        TextFSM parser is only recompiled if assembled template is changed.
+
+        Raises
+        ------
+        TemplateBuilderError: will raise exception if a created template
+                is invalid.
+        TemplateBuilderInvalidFormat: will raise exception if
+                user_data has invalid format.
+        """
+        previous_template = self.template
+        self.template = ''
         if self.variables:
-            comment = self.build_template_comment()
+            with self.stats.timer('build_template_comment'):
+                comment = self.build_template_comment()
             variables = '\n'.join(v.value for v in self.variables)
             template_definition = '\n'.join(self.statements)
             if not template_definition.strip().startswith('Start'):
                 template_definition = 'Start\n{}'.format(template_definition)
             fmt = '{}\n{}\n\n{}'
             self.template = fmt.format(comment, variables, template_definition)
-            self.reformat()
+            with self.stats.timer('reformat'):
+                self.reformat()
+
+            if self.template == previous_template and self._template_parser:
+                return
 
             try:
-                stream = StringIO(self.template)
-                self.template_parser = TextFSM(stream)
+                self.registry.check()
+                self.template_parser = None
+                if self.lazy:
+                    with self.stats.timer('validate_template'):
+                        errors = validate_template(self.template)
+                    if errors:
+                        raise TemplateBuilderError('; '.join(errors))
+                else:
+                    with self.stats.timer('textfsm_compile'):
+                        stream = StringIO(self.template)
+                        cls = get_parser_class(self.engine, self.prefilter)
+                        self.template_parser = cls(stream)
             except Exception as ex:
+                self.template_parser = None
                 error = '{}: {}'.format(type(ex).__name__, ex)
                 if not self.debug:
                     raise TemplateBuilderError(error)
@@ -397,16 +683,124 @@ class TemplateBuilder:
             msg = 'user_data does not have any assigned variable for template.'
             raise TemplateBuilderInvalidFormat(msg)
 
+    def analyze_redos(self, fuzzing=False, budget=0.2):
+        """flag Value patterns and rules which can backtrack catastrophically
+
+        A pattern is flagged statically, and if fuzzing is True, its risk
+        is confirmed by a time-budgeted fuzzer which measures a growth
+        curve of matching time against worst-case inputs.
+
+        Parameters
+        ----------
+        fuzzing (bool): confirm findings by a fuzzer.  Default is False.
+        budget (float): a fuzzing time budget in seconds per finding.
+                Default is 0.2.
+
+        Returns
+        -------
+        list: a list of Finding.
+        """
+        self.redos_findings = []
+        if not self.template:
+            return self.redos_findings
+
+        self.redos_findings = analyze_template(self.template, fuzzing=fuzzing,
+                                               budget=budget)
+        for finding in self.redos_findings:
+            self.logger.warning('ReDoS risk - {}'.format(finding.describe()))
+        return self.redos_findings
+
+    def rebuild(self, user_data):
+        """rebuild template from edited user data
+
+        Only changed lines of user data are parsed again.  Unchanged lines
+        reuse their statements and variables.
+
+        Parameters
+        ----------
+        user_data (str, list): an edited user data.
+
+        Raises
+        ------
+        TemplateBuilderError: will raise exception if a created template
+                is invalid.
+        TemplateBuilderInvalidFormat: will raise exception if
+                user_data has invalid format.
+        """
+        user_data = TemplateBuilder.convert_to_string(user_data)
+        old_entries = self.line_entries
+        old_lines = [entry[0] for entry in old_entries]
+        new_lines = user_data.splitlines()
+
+        start = 0
+        stop = min(len(old_lines), len(new_lines))
+        while start < stop and old_lines[start] == new_lines[start]:
+            start += 1
+        tail = 0
+        while (tail < stop - start
+               and old_lines[-1 - tail] == new_lines[-1 - tail]):
+            tail += 1
+
+        entries = old_entries[:start]
+        old_middle = old_lines[start:len(old_lines) - tail]
+        new_middle = new_lines[start:len(new_lines) - tail]
+        matcher = SequenceMatcher(a=old_middle, b=new_middle, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                entries.extend(old_entries[start + i1:start + i2])
+            else:
+                entries.extend(self.parse_line(line)
+                               for line in new_middle[j1:j2])
+        entries.extend(old_entries[len(old_entries) - tail:])
+
+        self.user_data = user_data
+        self.line_entries = entries
+        self.collect()
+        self.assemble()
+
+    def apply_edit(self, line_no, new_text):
+        """replace a line of user data and rebuild template
+
+        Parameters
+        ----------
+        line_no (int): a line number of user data, starting from 1.
+        new_text (str): a new text.  It can be multiple lines.
+
+        Raises
+        ------
+        TemplateBuilderError: will raise exception if line_no is out of range
+                or a created template is invalid.
+        TemplateBuilderInvalidFormat: will raise exception if
+                user_data has invalid format.
+        """
+        if not 1 <= line_no <= len(self.line_entries):
+            error = 'line_no {} is out of range.'.format(line_no)
+            raise TemplateBuilderError(error)
+
+        lines = str(new_text).splitlines() or ['']
+        index = line_no - 1
+        self.line_entries[index:index + 1] = [self.parse_line(line)
+                                              for line in lines]
+        self.user_data = '\n'.join(entry[0] for entry in self.line_entries)
+        self.collect()
+        self.assemble()
+
     def show_debug_info(self, test_result=None, expected_result=None,
                         tabular=False):
         """show debug information
         
         Parameters
         ----------
-        test_result (list): a list of dictionary.
-        expected_result (list): a list of dictionary.
+        test_result (list, Columns): a list of dictionary or a columnar result.
+        expected_result (list, Columns): a list of dictionary or a columnar
+                result.
         tabular (bool): show result in tabular format.  Default is False.
         """
+        if isinstance(test_result, Columns):
+            test_result = test_result.to_records()
+        if isinstance(expected_result, Columns):
+            expected_result = expected_result.to_records()
+
         if self.verified_message:
             width = 76
             printer = Printer()
@@ -426,15 +820,31 @@ class TemplateBuilder:
             printer.print(verified_msg.ljust(width))
 
     def verify(self, expected_rows_count=None, expected_result=None,
-               tabular=False, debug=False):
+               tabular=False, debug=False, columnar=False,
+               profile_rules=False, budget=None,
+               max_mismatches=MAX_MISMATCHES):
         """verify test_data via template
         
         Parameters
         ----------
         expected_rows_count (int): total number of rows.
-        expected_result (list): a list of dictionary.
+        expected_result (list, Columns): a list of dictionary or a columnar
+                result.
         tabular (bool): show result in tabular format.  Default is False.
         debug (bool): True will show debug info.  Default is False.
+        columnar (bool): keep parsed result in columnar format which stores
+                one list per Value instead of one dictionary per row.
+                Default is False.
+        profile_rules (bool): parse with a profiling parser which records
+                hit counters and regex time of every rule to rule_profile.
+                Default is False.
+        budget (ParseBudget): parse in a supervised worker process which is
+                killed if it exceeds budget.  Default is None which parses
+                in current process.  It is ignored if profile_rules is True.
+        max_mismatches (int): stop comparing with expected_result once
+                a number of mismatched rows is reached, so that
+                verified_message stays short.  Default is 20.  None
+                compares all rows.
 
         Returns
         -------
@@ -443,7 +853,9 @@ class TemplateBuilder:
         Raises
         ------
         TemplateBuilderError: show exception if there is error during parsing text.
+        TemplateParseBudgetError: show exception if parse exceeds budget.
         """
+        self.comparison = None
         if not self.test_data:
             self.verified_message = 'test_data is empty.'
             debug and self.show_debug_info()
@@ -451,7 +863,24 @@ class TemplateBuilder:
 
         is_verified = True
         try:
-            rows = self.template_parser.ParseTextToDicts(self.test_data)
+            if profile_rules:
+                parser = ProfilingTextFSM(StringIO(self.template))
+                self.rule_profile = parser.profile
+            else:
+                parser = self.template_parser
+            with self.stats.timer('verify_parse'):
+                if budget and not profile_rules:
+                    from templateapp.supervisor import parse_within_budget
+                    rows = parse_within_budget(self.template, self.test_data,
+                                               budget, engine=self.engine,
+                                               prefilter=self.prefilter)
+                    if columnar:
+                        rows = Columns.from_records(rows, header=parser.header)
+                elif columnar:
+                    rows = iter_columns(parser, self.test_data)
+                else:
+                    parser.Reset()
+                    rows = parser.ParseTextToDicts(self.test_data)
             if not rows:
                 self.verified_message = 'There is no record after parsed.'
                 debug and self.show_debug_info()
@@ -475,7 +904,12 @@ class TemplateBuilder:
                 if chk:
                     msg = 'Parsed result and expected result are matched.'
                 else:
-                    msg = 'Parsed result and expected result are different.'
+                    self.comparison = compare_rows(
+                        rows, expected_result, max_mismatches=max_mismatches
+                    )
+                    msg = ('{}\nParsed result and expected result are '
+                           'different.')
+                    msg = msg.format(self.comparison.report())
 
                 msg = '{}\n{}'.format(self.verified_message, msg,)
                 self.verified_message = msg.strip()
@@ -490,6 +924,245 @@ class TemplateBuilder:
 
             return is_verified
 
+        except TemplateParseBudgetError:
+            raise
+        except Exception as ex:
+            error = '{}: {}'.format(type(ex).__name__, ex)
+            raise TemplateBuilderError(error)
+
+    def parse(self, source=None, columnar=False, budget=None):
+        """return parsed records of source
+
+        Parameters
+        ----------
+        source (str, os.PathLike, file object): a text, a file path, or
+                a file object in text mode.  Default is None which uses
+                test_data.
+        columnar (bool): return a Columns result.  Default is False.
+        budget (ParseBudget): parse in a supervised worker process which is
+                killed if it exceeds budget.  Default is None which parses
+                in current process.
+
+        Returns
+        -------
+        list: a list of dictionary or Columns if columnar is True.
+
+        Raises
+        ------
+        TemplateBuilderError: show exception if there is error during
+                parsing text.
+        TemplateParseBudgetError: show exception if parse exceeds budget.
+        """
+        source = self.test_data if source is None else source
+        if budget:
+            from templateapp.supervisor import parse_within_budget
+            records = parse_within_budget(self.template, source, budget,
+                                          engine=self.engine,
+                                          prefilter=self.prefilter)
+            if columnar:
+                header = self.template_parser.header
+                return Columns.from_records(records, header=header)
+            return records
+
+        try:
+            if columnar:
+                return iter_columns(self.template_parser, source)
+            return list(iter_records(self.template_parser, source))
+        except Exception as ex:
+            error = '{}: {}'.format(type(ex).__name__, ex)
+            raise TemplateBuilderError(error)
+
+    def profile_rules(self, source=None):
+        """return per-rule hit counters and regex time of parsing source
+
+        Source is parsed line by line, so that a large source is profiled
+        without loading it to memory.
+
+        Parameters
+        ----------
+        source (str, os.PathLike, file object): a text, a file path, or
+                a file object in text mode.  Default is None which uses
+                test_data.
+
+        Returns
+        -------
+        RuleProfile: per-rule statistics which is also kept in rule_profile.
+
+        Raises
+        ------
+        TemplateBuilderError: show exception if there is error during
+                parsing text.
+        """
+        source = self.test_data if source is None else source
+        try:
+            parser = ProfilingTextFSM(StringIO(self.template))
+            for _ in iter_rows(parser, source):
+                pass
+            self.rule_profile = parser.profile
+            return self.rule_profile
+        except Exception as ex:
+            error = '{}: {}'.format(type(ex).__name__, ex)
+            raise TemplateBuilderError(error)
+
+    def iter_parse(self, source=None):
+        """yield parsed records one by one
+
+        Parameters
+        ----------
+        source (str, os.PathLike, file object): a text, a file path, or
+                a file object in text mode.  Default is None which uses
+                test_data.
+
+        Returns
+        -------
+        generator: a generator of dict.
+        """
+        source = self.test_data if source is None else source
+        yield from iter_records(self.template_parser, source)
+
+    def verify_stream(self, source=None, expected_rows_count=None,
+                      expected_result=None, max_mismatches=None):
+        """verify large test data via template without materializing all rows
+
+        Parsed rows are compared with expected rows one by one, and a row-level
+        diff index is kept in comparison attribute.
+
+        Parameters
+        ----------
+        source (str, os.PathLike, file object): a text, a file path, or
+                a file object in text mode.  Default is None which uses
+                test_data.
+        expected_rows_count (int): total number of rows.
+        expected_result (list, Columns, str, os.PathLike, file object): a list
+                of dictionary, a columnar result, or a JSON Lines file.
+        max_mismatches (int): stop parsing once a number of mismatched rows
+                is reached.  Default is None which compares all rows.
+
+        Returns
+        -------
+        bool: True if it is verified, otherwise False.
+
+        Raises
+        ------
+        TemplateBuilderError: show exception if there is error during
+                parsing text.
+        """
+        self.verified_message = ''
+        self.comparison = None
+        source = self.test_data if source is None else source
+        if isinstance(source, str) and not source:
+            self.verified_message = 'test_data is empty.'
+            return False
+
+        is_verified = True
+        rows_count = 0
+        try:
+            with self.stats.timer('verify_parse'):
+                if expected_result is None:
+                    for _ in self.iter_parse(source):
+                        rows_count += 1
+                else:
+                    self.comparison = compare_rows(
+                        self.iter_parse(source), expected_result,
+                        max_mismatches=max_mismatches
+                    )
+                    rows_count = self.comparison.rows_count
+        except Exception as ex:
+            error = '{}: {}'.format(type(ex).__name__, ex)
+            raise TemplateBuilderError(error)
+
+        if not rows_count:
+            self.verified_message = 'There is no record after parsed.'
+            return False
+
+        if self.comparison and self.comparison.is_stopped:
+            is_verified = False
+        elif expected_rows_count is not None:
+            chk = expected_rows_count == rows_count
+            is_verified &= chk
+            if not chk:
+                fmt = 'Parsed-row-count is {} while expected-row-count is {}.'
+                self.verified_message = fmt.format(rows_count,
+                                                   expected_rows_count)
+            else:
+                fmt = 'Parsed-row-count and expected-row-count are {}.'
+                self.verified_message = fmt.format(expected_rows_count)
+
+        if expected_result is not None:
+            chk = self.comparison.is_matched
+            is_verified &= chk
+
+            if chk:
+                msg = 'Parsed result and expected result are matched.'
+            else:
+                msg = '{}\nParsed result and expected result are different.'
+                msg = msg.format(self.comparison.report())
+
+            msg = '{}\n{}'.format(self.verified_message, msg,)
+            self.verified_message = msg.strip()
+
+        if is_verified and not self.verified_message:
+            self.verified_message = 'Parsed result has record(s).'
+
+        return is_verified
+
+    def verify_corpus(self, paths, workers=None, budget=None):
+        """verify many test data files via template over a process pool
+
+        Parameters
+        ----------
+        paths (str, list): a file path, a directory, a glob pattern, or
+                a list of them.
+        workers (int): a number of worker processes.  Default is None which
+                uses a number of CPUs.  0 or 1 verifies in current process.
+        budget (ParseBudget): a budget per file.  A file which exceeds
+                budget is reported as failed.  Default is None.
+
+        Returns
+        -------
+        templateapp.batch.CorpusReport: a summary of per-file results.
+        """
+        from templateapp.batch import verify_corpus
+        return verify_corpus(self.template, paths, workers=workers,
+                             engine=self.engine, budget=budget,
+                             prefilter=self.prefilter)
+
+    def optimize(self, paths=None, check_corpus=True, repeat=3):
+        """reorder rules of template by hit counts of a sample corpus
+
+        Rules are only reordered if they are provably disjoint, or if
+        check_corpus is True and parsing corpus with a reordered template
+        gives an identical result.  Template of builder is not changed.
+
+        Parameters
+        ----------
+        paths (str, list): a file path, a directory, a glob pattern, or a
+                list of them.  Default is None which uses test_data.
+        check_corpus (bool): allow reordering proven by an equivalence check
+                on corpus.  Default is True.
+        repeat (int): a number of throughput measurements.  Default is 3.
+
+        Returns
+        -------
+        templateapp.optimizer.OptimizationResult: an optimized template and
+                a before/after throughput report.
+
+        Raises
+        ------
+        TemplateBuilderError: raise exception if corpus cannot be optimized.
+        """
+        from templateapp.runner import expand_paths
+        from templateapp.optimizer import optimize_template
+        try:
+            if paths is None:
+                texts = [self.test_data]
+            else:
+                texts = []
+                for path in expand_paths(paths):
+                    with open(path) as stream:
+                        texts.append(stream.read())
+            return optimize_template(self.template, texts, engine=self.engine,
+                                     check_corpus=check_corpus, repeat=repeat)
         except Exception as ex:
             error = '{}: {}'.format(type(ex).__name__, ex)
             raise TemplateBuilderError(error)
@@ -519,10 +1192,15 @@ class TemplateBuilder:
             
             
             class TestTemplate(unittest.TestCase):
+                @classmethod
+                def setUpClass(cls):
+                    cls.parser = TextFSM(StringIO(template))
+
+                def setUp(self):
+                    self.parser.Reset()
+
                 def test_textfsm_template(self):
-                    stream = StringIO(template)
-                    parser = TextFSM(stream)
-                    rows = parser.ParseTextToDicts(test_data)
+                    rows = self.parser.ParseTextToDicts(test_data)
                     total_rows_count = len(rows)
                     self.assertGreaterEqual(total_rows_count, 0)
         """
@@ -554,6 +1232,7 @@ class TemplateBuilder:
         fmt = """
             {docstring}
 
+            import pytest
             from textfsm import TextFSM
             from io import StringIO
 
@@ -562,10 +1241,19 @@ class TemplateBuilder:
             test_data = {test_data}
 
 
+            @pytest.fixture(scope='module')
+            def compiled_parser():
+                return TextFSM(StringIO(template))
+
+
+            @pytest.fixture
+            def parser(compiled_parser):
+                compiled_parser.Reset()
+                return compiled_parser
+
+
             class TestTemplate:
-                def test_textfsm_template(self):
-                    stream = StringIO(template)
-                    parser = TextFSM(stream)
+                def test_textfsm_template(self, parser):
                     rows = parser.ParseTextToDicts(test_data)
                     total_rows_count = len(rows)
                     assert total_rows_count > 0
@@ -607,6 +1295,23 @@ class TemplateBuilder:
 
             test_data = {test_data}
 
+            # compiled parsers are reused by template
+            parsers = dict()
+
+
+            def get_parser(template_):
+                """return a compiled parser of template which is ready to parse
+
+                Parameters
+                ----------
+                template_ (str): a content of textfsm template.
+                """
+                if template_ not in parsers:
+                    parsers[template_] = TextFSM(StringIO(template_))
+                parser = parsers[template_]
+                parser.Reset()
+                return parser
+
 
             def test_textfsm_template(template_, test_data_):
                 """test textfsm template via test data
@@ -624,8 +1329,7 @@ class TemplateBuilder:
                 # show textfsm template
                 print("Template:\n---------\n%s" % template_)
                 
-                stream = StringIO(template_)
-                parser = TextFSM(stream)
+                parser = get_parser(template_)
                 rows = parser.ParseTextToDicts(test_data_)
                 total_rows_count = len(rows)
                 assert total_rows_count > 0
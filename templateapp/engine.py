@@ -0,0 +1,288 @@
+"""Module containing alternative parse engines for TextFSM template.
+
+The alternation engine compiles all rules of a state into one regex
+alternation, i.e. (?P<_rule0>rule0)|(?P<_rule1>rule1)|..., so that the
+first matching rule of a line is found in one re call.  Regex alternation
+is ordered, hence the first alternative which matches is the first rule
+which TextFSM would match, and its groups capture the same text.  After a
+Continue rule, matching resumes with an alternation of remaining rules.
+
+A state falls back to stock TextFSM matching if any of its rules uses a
+group reference or a global inline flag because those cannot be combined
+without changing their meaning.
+"""
+
+import re
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:     # pragma: no cover - Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from textfsm import TextFSM
+
+from templateapp.prefilter import PrefilterTextFSM
+
+GROUP_REFERENCE_OPS = (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS)
+DEFAULT_FLAGS = sre_parse.parse('').state.flags
+
+
+def has_group_reference(subpattern):
+    """return True if a parsed regex refers to a group
+
+    Parameters
+    ----------
+    subpattern (list): a parsed sequence of regular expression.
+
+    Returns
+    -------
+    bool: True if there is a group reference.
+    """
+    for op, av in subpattern:
+        if op in GROUP_REFERENCE_OPS:
+            return True
+        items = av if isinstance(av, (list, tuple)) else [av]
+        for item in items:
+            if isinstance(item, sre_parse.SubPattern):
+                if has_group_reference(item):
+                    return True
+            elif isinstance(item, (list, tuple)):
+                for sub in item:
+                    if (isinstance(sub, sre_parse.SubPattern)
+                            and has_group_reference(sub)):
+                        return True
+    return False
+
+
+def rename_groups(pattern, prefix):
+    """return pattern whose named groups are prefixed
+
+    Escapes and character sets are skipped as is.
+
+    Parameters
+    ----------
+    pattern (str): a regular expression pattern.
+    prefix (str): a prefix for group names.
+
+    Returns
+    -------
+    str: a pattern with renamed groups.
+    """
+    lst = []
+    index, total = 0, len(pattern)
+    while index < total:
+        char = pattern[index]
+        if char == '\\':
+            lst.append(pattern[index:index + 2])
+            index += 2
+        elif char == '[':
+            end = index + 1
+            if end < total and pattern[end] == '^':
+                end += 1
+            if end < total and pattern[end] == ']':
+                end += 1
+            while end < total and pattern[end] != ']':
+                end += 2 if pattern[end] == '\\' else 1
+            lst.append(pattern[index:end + 1])
+            index = end + 1
+        elif pattern.startswith('(?P<', index):
+            end = pattern.index('>', index)
+            lst.append('(?P<{}{}>'.format(prefix, pattern[index + 4:end]))
+            index = end + 1
+        else:
+            lst.append(char)
+            index += 1
+    return ''.join(lst)
+
+
+class RuleMatch:
+    """Match object of a rule which is taken from an alternation match
+
+    Attributes
+    ----------
+    match (re.Match): a match of state alternation.
+    prefix (str): a prefix of renamed groups of rule.
+    names (list): a list of group names of rule.
+    """
+    __slots__ = ('match', 'prefix', 'names')
+
+    def __init__(self, match, prefix, names):
+        self.match = match
+        self.prefix = prefix
+        self.names = names
+
+    def groupdict(self):
+        group, prefix = self.match.group, self.prefix
+        return dict((name, group(prefix + name)) for name in self.names)
+
+    def group(self, name):
+        return self.match.group(self.prefix + name)
+
+
+class StateMatcher:
+    """An alternation of rules of a state starting at a rule position
+
+    Attributes
+    ----------
+    pattern (re.Pattern): a compiled alternation.
+    positions (dict): a mapping of group index of alternative to a rule
+            position, a prefix of renamed groups, and group names of rule.
+
+    Raises
+    ------
+    ValueError: raise exception if groups of a rule cannot be renamed.
+    """
+    def __init__(self, rules, start):
+        lst = []
+        tbl = dict()
+        for position in range(start, len(rules)):
+            prefix = '_{}_'.format(position)
+            regex = rename_groups(rules[position].regex, prefix)
+            lst.append('(?P<_rule{}>{})'.format(position, regex))
+            names = list(re.compile(rules[position].regex).groupindex)
+            tbl[position] = (prefix, names)
+
+        self.pattern = re.compile('|'.join(lst))
+        self.positions = dict()
+        for position, (prefix, names) in tbl.items():
+            expected = set(prefix + name for name in names)
+            renamed = set(name for name in self.pattern.groupindex
+                          if name.startswith(prefix))
+            if expected != renamed:
+                raise ValueError('Cannot combine rule {}.'.format(position))
+            group_index = self.pattern.groupindex['_rule{}'.format(position)]
+            self.positions[group_index] = (position, prefix, names)
+
+    def match(self, line):
+        """return a rule position and a rule match of first matching rule
+
+        Parameters
+        ----------
+        line (str): an input line.
+
+        Returns
+        -------
+        tuple: a rule position and a RuleMatch.  (-1, None) if no rule matches.
+        """
+        matched = self.pattern.match(line)
+        if matched is None:
+            return -1, None
+        position, prefix, names = self.positions[matched.lastindex]
+        return position, RuleMatch(matched, prefix, names)
+
+
+def is_combinable(rule):
+    """return True if a rule regex can be a part of an alternation"""
+    try:
+        parsed = sre_parse.parse(rule.regex)
+    except Exception:
+        return False
+    if parsed.state.flags != DEFAULT_FLAGS:
+        return False
+    return not has_group_reference(parsed)
+
+
+def build_state_matchers(parser):
+    """return a mapping of state name to matchers keyed by start position
+
+    A state is not combined, i.e. value is None, if any of its rules is not
+    combinable.
+
+    Parameters
+    ----------
+    parser (TextFSM): a TextFSM instance.
+
+    Returns
+    -------
+    dict: a mapping of state name to a dictionary of StateMatcher or None.
+    """
+    matchers = dict()
+    for name, rules in parser.states.items():
+        if not rules or not all(is_combinable(rule) for rule in rules):
+            matchers[name] = None
+            continue
+
+        starts = [0]
+        starts.extend(position + 1 for position, rule in enumerate(rules)
+                      if rule.line_op == 'Continue'
+                      and position + 1 < len(rules))
+        try:
+            matchers[name] = dict((start, StateMatcher(rules, start))
+                                  for start in starts)
+        except Exception:
+            matchers[name] = None
+    return matchers
+
+
+class AlternationTextFSM(TextFSM):
+    """TextFSM parser which matches all rules of a state in one regex call
+
+    Attributes
+    ----------
+    matchers (dict): a mapping of state name to StateMatcher keyed by
+            start position, or None if a state uses stock matching.
+    """
+    def __init__(self, template):
+        super().__init__(template)
+        self.matchers = build_state_matchers(self)
+
+    def _CheckLine(self, line):
+        matchers = self.matchers.get(self._cur_state_name)
+        if matchers is None:
+            super()._CheckLine(line)
+            return
+
+        rules = self._cur_state
+        start = 0
+        while start in matchers:
+            position, matched = matchers[start].match(line)
+            if matched is None:
+                return
+
+            rule = rules[position]
+            for value in matched.groupdict():
+                self._AssignVar(matched, value)
+
+            if self._Operations(rule, line):
+                if rule.new_state:
+                    if rule.new_state not in ('End', 'EOF'):
+                        self._cur_state = self.states[rule.new_state]
+                    self._cur_state_name = rule.new_state
+                return
+            start = position + 1
+
+
+class PrefilterAlternationTextFSM(PrefilterTextFSM, AlternationTextFSM):
+    """Alternation engine with a literal prefilter."""
+
+
+ENGINES = ('textfsm', 'alternation')
+
+
+def get_parser_class(engine='textfsm', prefilter=False):
+    """return a TextFSM class of engine
+
+    Parameters
+    ----------
+    engine (str): textfsm or alternation.  Default is textfsm.
+    prefilter (bool): skip lines which no rule of current state can match.
+            Default is False.
+
+    Returns
+    -------
+    type: a TextFSM class.
+
+    Raises
+    ------
+    ValueError: raise exception if engine is unknown.
+    """
+    engine = str(engine or 'textfsm').lower()
+    if engine not in ENGINES:
+        fmt = 'Unknown engine {!r}, expected one of {}.'
+        raise ValueError(fmt.format(engine, ', '.join(ENGINES)))
+
+    if engine == 'alternation':
+        return PrefilterAlternationTextFSM if prefilter else AlternationTextFSM
+    return PrefilterTextFSM if prefilter else TextFSM
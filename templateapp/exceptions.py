@@ -15,3 +15,10 @@ class TemplateBuilderError(TemplateError):
 
 class TemplateBuilderInvalidFormat(TemplateError):
     """Use to capture error if user_data has invalid format."""
+
+
+class TemplateParseBudgetError(TemplateBuilderError):
+    """Use to capture a parse which exceeded its budget."""
+    def __init__(self, message='', reason=''):
+        super().__init__(message)
+        self.reason = reason
@@ -0,0 +1,225 @@
+"""Module containing the lexer for a line of user data."""
+
+import re
+from collections import namedtuple
+
+
+Token = namedtuple('Token', ['flag', 'flag_text', 'line', 'template_op'])
+Token.__doc__ = """Token of user data line
+
+Attributes
+----------
+flag (str): ignore_case, comment, keep, or empty string.
+flag_text (str): a flag AS-IS including underscores and trailing space.
+line (str): a line data without flag and template operator.
+template_op (str): a template operator.
+"""
+
+OPERATORS = {
+    'next': 'Next', 'continue': 'Continue', 'error': 'Error',
+    'norecord': 'NoRecord', 'record': 'Record',
+    'clearall': 'ClearAll', 'clear': 'Clear'
+}
+LINE_OPERATORS = {'next': 'Next', 'continue': 'Continue', 'error': 'Error'}
+RECORD_OPERATORS = {
+    'norecord': 'NoRecord', 'record': 'Record',
+    'clearall': 'ClearAll', 'clear': 'Clear'
+}
+FLAGS = ('ignore_case', 'comment', 'keep')
+ASCII_ALNUM = frozenset('abcdefghijklmnopqrstuvwxyz'
+                        'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+ASCII_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyz'
+                          'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+
+def is_ascii(text):
+    """return True if text only has ASCII characters"""
+    try:
+        text.encode('ascii')
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def tokenize_by_regex(text):
+    """return a token of text via a regex cascade
+
+    This is a reference implementation.  It is also used by tokenize for
+    a non-ASCII keyword because re.IGNORECASE applies Unicode case folding,
+    i.e. U+017F matches s.
+
+    Parameters
+    ----------
+    text (str): a line of user data.
+
+    Returns
+    -------
+    Token: a token of text.
+    """
+    template_op = ''
+    lst = text.rsplit(' -> ', 1)
+    if len(lst) == 2:
+        tmpl_op = lst[-1].strip()
+        first, *remaining = tmpl_op.split(' ', 1)
+        op = get_operator_by_regex(first)
+        tmpl_op = '{} {}'.format(op, ''.join(remaining))
+
+        template_op = tmpl_op.strip()
+        text = lst[0].rstrip()
+
+    flag, flag_text, line = split_flag_by_regex(text)
+    return Token(flag, flag_text, line, template_op)
+
+
+def split_flag_by_regex(text):
+    """return a flag, a flag text, and a line data of text via regex
+
+    Parameters
+    ----------
+    text (str): a line of user data without template operator.
+
+    Returns
+    -------
+    tuple: a flag, a flag text, and a line data.
+    """
+    pat = r'^(?P<flag>(ignore_case|comment|keep)__+ )?(?P<line>.*)'
+    match = re.match(pat, text, re.I)
+    flag_text = match.group('flag') or ''
+    flag = flag_text.lower().strip().rstrip('_')
+    line = match.group('line') or ''
+    return flag, flag_text, line
+
+
+def get_operator_by_regex(text):
+    """return a canonical template operator of text via regex
+
+    Parameters
+    ----------
+    text (str): a template operator i.e. record, next.record, or Next.
+
+    Returns
+    -------
+    str: a canonical operator or text AS-IS if it is not an operator.
+    """
+    tbl = {'norecord': 'NoRecord', 'clearall': 'ClearAll'}
+    if '.' in text:
+        pat = r'(?P<lop>next|continue|error)\.' \
+              r'(?P<rop>norecord|record|clearall|clear)$'
+        match = re.match(pat, text, re.I)
+        if match:
+            lop = match.group('lop').title()
+            rop = match.group('rop').title()
+            rop = tbl.get(rop.lower(), rop)
+            return '{}.{}'.format(lop, rop)
+        return text
+    else:
+        pat = r'(next|continue|error|norecord|record|clearall|clear)$'
+        if re.match(pat, text, re.I):
+            op = text.title()
+            return tbl.get(op.lower(), op)
+        return text
+
+
+def get_operator(text):
+    """return a canonical template operator of text
+
+    Parameters
+    ----------
+    text (str): a template operator i.e. record, next.record, or Next.
+
+    Returns
+    -------
+    str: a canonical operator or text AS-IS if it is not an operator.
+    """
+    if '\n' in text or not is_ascii(text):
+        return get_operator_by_regex(text)
+
+    lop, sep, rop = text.partition('.')
+    if sep:
+        lop, rop = lop.lower(), rop.lower()
+        if lop in LINE_OPERATORS and rop in RECORD_OPERATORS:
+            return '{}.{}'.format(LINE_OPERATORS[lop], RECORD_OPERATORS[rop])
+        return text
+    return OPERATORS.get(text.lower(), text)
+
+
+def tokenize(text):
+    """return a token of text in a single scan
+
+    It has identical semantics to tokenize_by_regex.
+
+    Parameters
+    ----------
+    text (str): a line of user data.
+
+    Returns
+    -------
+    Token: a token of text.
+    """
+    template_op = ''
+    index = text.rfind(' -> ')
+    if index >= 0:
+        tmpl_op = text[index + 4:].strip()
+        first, *remaining = tmpl_op.split(' ', 1)
+        op = get_operator(first)
+        template_op = '{} {}'.format(op, ''.join(remaining)).strip()
+        text = text[:index].rstrip()
+
+    flag, flag_text = '', ''
+    head = text[:12]
+    if not is_ascii(head):
+        flag, flag_text, line = split_flag_by_regex(text)
+        return Token(flag, flag_text, line, template_op)
+
+    if head[:1] in ('i', 'I', 'c', 'C', 'k', 'K'):
+        lowered = head.lower()
+        for name in FLAGS:
+            if lowered.startswith(name):
+                index = len(name)
+                end = index
+                while text[end:end + 1] == '_':
+                    end += 1
+                if end - index >= 2 and text[end:end + 1] == ' ':
+                    flag, flag_text = name, text[:end + 1]
+                    text = text[end + 1:]
+                break
+
+    line = text.partition('\n')[0]
+    return Token(flag, flag_text, line, template_op)
+
+
+def is_a_word(text):
+    """return True if text is a single word
+
+    Parameters
+    ----------
+    text (str): a text.
+
+    Returns
+    -------
+    bool: True if text is a single word, otherwise False.
+    """
+    text = text.rstrip()
+    if len(text) < 2:
+        return False
+    if not is_ascii(text[0]):
+        return bool(re.match(r'[a-z]\w+$', text, re.I))
+    return text[0] in ASCII_LETTERS and text[1:].replace('_', 'a').isalnum()
+
+
+def is_not_containing_letter(line):
+    """return True if a non-empty line doesn't contain any alphanum
+
+    Parameters
+    ----------
+    line (str): a line data.
+
+    Returns
+    -------
+    bool: True if line is not containing any letter or digit, otherwise False.
+    """
+    if not line:
+        return False
+    if not is_ascii(line):
+        return bool(re.match(r'[^a-z0-9]+$', line, re.I))
+    return ASCII_ALNUM.isdisjoint(line)
@@ -3,10 +3,9 @@
 import sys
 import argparse
 import re
-import yaml
 
-from templateapp.application import Application
-from templateapp import TemplateBuilder
+# GUI, template building, and parsing modules are imported on demand so that
+# a headless CLI call only pays for modules of its own path.
 
 
 def run_gui_application(options):
@@ -22,6 +21,7 @@ def run_gui_application(options):
     if end user requests `--gui`
     """
     if options.gui:
+        from templateapp.application import Application
         app = Application()
         app.run()
         sys.exit(0)
@@ -53,10 +53,14 @@ def show_dependency(options):
 class Cli:
     """templateapp console CLI application."""
 
-    def __init__(self):
+    def __init__(self, argv=None):
         parser = argparse.ArgumentParser(
             prog='templateapp',
-            usage='%(prog)s [options]',
+            usage=('%(prog)s [options]\n       %(prog)s build [options]\n'
+                   '       %(prog)s serve [options]\n'
+                   '       %(prog)s client --name NAME [options]\n'
+                   '       %(prog)s parse --template FILE|--name NAME '
+                   '[options] input [input ...]'),
             description='%(prog)s application',
         )
 
@@ -77,6 +81,14 @@ class Cli:
             help='User test data.'
         )
 
+        parser.add_argument(
+            '--format', type=str, choices=['jsonl', 'csv', 'tsv'],
+            default='',
+            help='Stream parsed records of test data in JSON Lines, CSV, or '
+                 'TSV format as soon as they are emitted.  Use -t - to read '
+                 'test data from stdin.'
+        )
+
         parser.add_argument(
             '-r', '--run-test', action='store_true', dest='test',
             help='To perform test between test data vs generated template.'
@@ -99,9 +111,290 @@ class Cli:
             help='Show TemplateApp dependent package(s).'
         )
 
+        parser.add_argument(
+            '--corpus', type=str, nargs='+', default=[],
+            help='Test data files, directories, or glob patterns to verify '
+                 'against generated template.'
+        )
+
+        parser.add_argument(
+            '-j', '--jobs', type=int, default=None,
+            help='A number of worker processes.  Default is number of CPUs.'
+        )
+
+        parser.add_argument(
+            '--engine', type=str, choices=['textfsm', 'alternation'],
+            default='textfsm',
+            help='A parse engine.  alternation matches all rules of a state '
+                 'in one regex call.  Default is textfsm.'
+        )
+
+        parser.add_argument(
+            '--max-seconds', type=float, default=None, dest='max_seconds',
+            help='A wall-clock budget of a test run or of a corpus file.  '
+                 'A parse over budget is killed and reported as failed.'
+        )
+
+        parser.add_argument(
+            '--max-rows', type=int, default=None, dest='max_rows',
+            help='A maximum number of parsed rows of a test run or of a '
+                 'corpus file.'
+        )
+
+        parser.add_argument(
+            '--max-rss', type=float, default=None, dest='max_rss',
+            help='A maximum resident memory in MB of a parse worker.'
+        )
+
+        parser.add_argument(
+            '--optimize', action='store_true',
+            help='Reorder rules of generated template by hit counts of '
+                 '--corpus or test data and show a throughput report to '
+                 'stderr.'
+        )
+
+        parser.add_argument(
+            '--check-redos', action='store_true', dest='check_redos',
+            help='Flag Value patterns and rules of generated template which '
+                 'can backtrack catastrophically and confirm them by a fuzzer.'
+        )
+
+        parser.add_argument(
+            '--fuzz-budget', type=float, default=0.2, dest='fuzz_budget',
+            help='A fuzzing time budget in seconds per finding of '
+                 '--check-redos.  Default is 0.2.'
+        )
+
+        parser.add_argument(
+            '--lazy', action='store_true',
+            help='Check generated template by a structural validator instead '
+                 'of compiling it.  A rule regex is not compiled, so that an '
+                 'invalid regex is not reported.'
+        )
+
+        parser.add_argument(
+            '--profile', action='store_true',
+            help='Show wall time of template building phases to stderr.'
+        )
+
+        parser.add_argument(
+            '--profile-rules', action='store_true', dest='profile_rules',
+            help='Show hit counters and regex time of every rule of a test '
+                 'run to stderr.'
+        )
+
+        parser.add_argument(
+            '--profile-json', type=str, default='', dest='profile_json',
+            help='Save rule profile of a test run to a JSON file.'
+        )
+
+        subparsers = parser.add_subparsers(dest='command', metavar='command')
+        build_parser = subparsers.add_parser(
+            'build',
+            help='build templates of every user data file of a directory'
+        )
+
+        build_parser.add_argument(
+            '--input-dir', type=str, required=True, dest='input_dir',
+            help='A directory of user data files or YAML spec files.'
+        )
+
+        build_parser.add_argument(
+            '--output-dir', type=str, required=True, dest='output_dir',
+            help='A directory to write templates and test scripts.'
+        )
+
+        build_parser.add_argument(
+            '-j', '--jobs', type=int, default=argparse.SUPPRESS,
+            help='A number of worker processes.  It is the same option as '
+                 '-j before subcommand.  Default is number of CPUs.'
+        )
+
+        build_parser.add_argument(
+            '-p', '--platform', type=str,
+            choices=['unittest', 'pytest', 'snippet'],
+            default=argparse.SUPPRESS,
+            help='Also write a test script of spec which has test_data.  It '
+                 'is the same option as -p before subcommand.'
+        )
+
+        build_parser.add_argument(
+            '--config', type=str, default=argparse.SUPPRESS,
+            help='Common config settings of every template.  It is the same '
+                 'option as --config before subcommand.'
+        )
+
+        serve_parser = subparsers.add_parser(
+            'serve', help='run a parse service which keeps templates compiled'
+        )
+
+        serve_parser.add_argument(
+            '--template', type=str, nargs='+', default=[], dest='templates',
+            help='Template files, directories, or glob patterns.  A template '
+                 'is named after its file name without extension.'
+        )
+
+        serve_parser.add_argument(
+            '--user-templates', action='store_true', dest='user_templates',
+            help='Also load templates which are stored by GUI application.'
+        )
+
+        self.add_address_arguments(serve_parser)
+
+        serve_parser.add_argument(
+            '-j', '--jobs', type=int, default=argparse.SUPPRESS,
+            help='A number of request threads.  It is the same option as '
+                 '-j before subcommand.  Default is 8.'
+        )
+
+        serve_parser.add_argument(
+            '--engine', type=str, choices=['textfsm', 'alternation'],
+            default=argparse.SUPPRESS,
+            help='A parse engine.  It is the same option as --engine before '
+                 'subcommand.  Default is textfsm.'
+        )
+
+        serve_parser.add_argument(
+            '--timeout', type=float, default=30,
+            help='A socket timeout of a connection in seconds.  Default is 30.'
+        )
+
+        serve_parser.add_argument(
+            '--max-body-size', type=float, default=64, dest='max_body_size',
+            help='A maximum request body in MB.  Default is 64.'
+        )
+
+        serve_parser.add_argument(
+            '--max-pending', type=int, default=32, dest='max_pending',
+            help='A maximum number of connections which wait for a request '
+                 'thread.  Default is 32.'
+        )
+
+        serve_parser.add_argument(
+            '-v', '--verbose', action='store_true',
+            help='Log every request to stderr.'
+        )
+
+        client_parser = subparsers.add_parser(
+            'client', help='parse stdin via a template of a parse service'
+        )
+
+        client_parser.add_argument(
+            '--name', type=str, required=True,
+            help='A template name of parse service.'
+        )
+
+        self.add_address_arguments(client_parser)
+
+        client_parser.add_argument(
+            '--format', type=str, choices=['jsonl', 'csv', 'tsv', 'json'],
+            default=argparse.SUPPRESS,
+            help='An output format of parsed records.  It is the same option '
+                 'as --format before subcommand.  Default is jsonl.'
+        )
+
+        client_parser.add_argument(
+            '--verify', action='store_true',
+            help='Verify stdin instead of parsing it and exit 1 if failed.'
+        )
+
+        client_parser.add_argument(
+            '--expected-rows-count', type=int, default=None,
+            dest='expected_rows_count',
+            help='An expected number of rows of --verify.'
+        )
+
+        parse_parser = subparsers.add_parser(
+            'parse', help='parse many inputs via a stored template'
+        )
+
+        parse_parser.add_argument(
+            'inputs', type=str, nargs='+',
+            help='Input files, directories, or glob patterns.'
+        )
+
+        group = parse_parser.add_mutually_exclusive_group(required=True)
+        group.add_argument(
+            '--template', type=str, default='', dest='template_file',
+            help='A template file.'
+        )
+
+        group.add_argument(
+            '--name', type=str, default='',
+            help='A template name which is stored by GUI application.'
+        )
+
+        parse_parser.add_argument(
+            '--format', type=str, choices=['jsonl', 'csv', 'tsv', 'sqlite'],
+            default=argparse.SUPPRESS,
+            help='An output format of parsed records.  It is the same option '
+                 'as --format before subcommand.  Default is jsonl.'
+        )
+
+        parse_parser.add_argument(
+            '-o', '--output', type=str, default='',
+            help='An output file.  Default is stdout.  It is required for '
+                 'sqlite format.'
+        )
+
+        parse_parser.add_argument(
+            '--table', type=str, default='records',
+            help='A table name of sqlite format.  Default is records.'
+        )
+
+        parse_parser.add_argument(
+            '--source-field', type=str, default='', dest='source_field',
+            help='Add an input file path of every record under this name.'
+        )
+
+        parse_parser.add_argument(
+            '-j', '--jobs', type=int, default=argparse.SUPPRESS,
+            help='A number of worker processes.  Workers send records in '
+                 'chunks of 1000 rows, so records of a file keep their order '
+                 'but files may interleave.  It is the same option as -j '
+                 'before subcommand.  Default is None which parses in '
+                 'current process in order of file path.'
+        )
+
+        parse_parser.add_argument(
+            '--engine', type=str, choices=['textfsm', 'alternation'],
+            default=argparse.SUPPRESS,
+            help='A parse engine.  It is the same option as --engine before '
+                 'subcommand.  Default is textfsm.'
+        )
+
+        parse_parser.add_argument(
+            '-q', '--quiet', action='store_true',
+            help='Do not show a throughput summary to stderr.'
+        )
+
         self.parser = parser
-        self.options = self.parser.parse_args()
+        self.options = self.parser.parse_args(argv)
+        # options of a subcommand are suppressed so that the same option
+        # before subcommand is kept, and a default of subcommand is applied
+        if self.options.command == 'serve' and self.options.jobs is None:
+            self.options.jobs = 8
         self.kwargs = dict()
+        self.test_source = None
+
+    @staticmethod
+    def add_address_arguments(parser):
+        """Add address flags of parse service to a subcommand parser"""
+        parser.add_argument(
+            '--socket', type=str, default='',
+            help='A Unix socket file of parse service.  It is preferred '
+                 'over --host and --port.'
+        )
+
+        parser.add_argument(
+            '--host', type=str, default='127.0.0.1',
+            help='A loopback host of parse service.  Default is 127.0.0.1.'
+        )
+
+        parser.add_argument(
+            '--port', type=int, default=8765,
+            help='A port of parse service.  Default is 8765.'
+        )
 
     def validate_cli_flags(self):
         """Validate argparse `options`.
@@ -127,9 +420,17 @@ class Cli:
                 print(failure)
                 sys.exit(1)
 
-        if self.options.test_data:
+        if self.options.test_data == '-':
+            if self.options.format:
+                self.test_source = sys.stdin
+            else:
+                self.options.test_data = sys.stdin.read()
+        elif self.options.test_data:
             m = re.match(pattern, self.options.test_data, re.I)
-            if m:
+            if m and self.options.format:
+                from pathlib import Path
+                self.test_source = Path(m.group('filename'))
+            elif m:
                 try:
                     with open(m.group('filename')) as stream:
                         self.options.test_data = stream.read()
@@ -138,49 +439,99 @@ class Cli:
                     print(failure)
                     sys.exit(1)
 
-        if self.options.config:
-            config = self.options.config
-            m = re.match(pattern, config, re.I)
-            if m:
-                try:
-                    with open(m.group('filename')) as stream:
-                        content = stream.read()
-                except Exception as ex:
-                    failure = '*** {}: {}'.format(type(ex).__name__, ex)
-                    print(failure)
-                    sys.exit(1)
-            else:
-                other_pat = r'''(?x)(
-                    author|email|company|filename|
-                    description|namespace|tabular): *'''
-                content = re.sub(r' *: *', r': ', config)
-                content = re.sub(other_pat, r'\n\1: ', content)
-                content = '\n'.join(line.strip(', ') for line in content.splitlines())
-
-            if content:
-                try:
-                    kwargs = yaml.load(content, Loader=yaml.SafeLoader)
-                    if isinstance(kwargs, dict):
-                        self.kwargs = kwargs
-                    else:
-                        failure = '*** INVALID-CONFIG: {}'.format(config)
-                        print(failure)
-                        sys.exit(1)
-                except Exception as ex:
-                    failure = '*** LOADING-CONFIG-ERROR - {}'.format(ex)
+        self.load_config()
+        return True
+
+    def load_config(self):
+        """Load --config settings to ``self.kwargs``.
+
+        It calls ``sys.exit(1)`` if config is invalid.
+        """
+        if not self.options.config:
+            return
+
+        pattern = r'file( *name)?:: *(?P<filename>\S*)'
+        config = self.options.config
+        m = re.match(pattern, config, re.I)
+        if m:
+            try:
+                with open(m.group('filename')) as stream:
+                    content = stream.read()
+            except Exception as ex:
+                failure = '*** {}: {}'.format(type(ex).__name__, ex)
+                print(failure)
+                sys.exit(1)
+        else:
+            other_pat = r'''(?x)(
+                author|email|company|filename|
+                description|namespace|tabular): *'''
+            content = re.sub(r' *: *', r': ', config)
+            content = re.sub(other_pat, r'\n\1: ', content)
+            lines = content.splitlines()
+            content = '\n'.join(line.strip(', ') for line in lines)
+
+        if content:
+            import yaml
+            try:
+                kwargs = yaml.load(content, Loader=yaml.SafeLoader)
+                if isinstance(kwargs, dict):
+                    self.kwargs = kwargs
+                else:
+                    failure = '*** INVALID-CONFIG: {}'.format(config)
                     print(failure)
                     sys.exit(1)
+            except Exception as ex:
+                failure = '*** LOADING-CONFIG-ERROR - {}'.format(ex)
+                print(failure)
+                sys.exit(1)
 
-        return True
+    def show_profile(self, factory):
+        """Show phase breakdown of factory to stderr if --profile is used.
+
+        Parameters
+        ----------
+        factory (TemplateBuilder): a template builder instance.
+        """
+        if self.options.profile:
+            print(factory.stats.report(), file=sys.stderr)
+
+    @property
+    def budget(self):
+        """return ParseBudget of CLI flags or None if no budget is used"""
+        from templateapp.supervisor import ParseBudget
+        rss = self.options.max_rss
+        budget = ParseBudget(
+            seconds=self.options.max_seconds, rows=self.options.max_rows,
+            rss=None if rss is None else int(rss * 1024 * 1024)
+        )
+        return budget or None
+
+    def show_rule_profile(self, factory):
+        """Show rule profile of factory to stderr and save it to JSON file.
+
+        Parameters
+        ----------
+        factory (TemplateBuilder): a template builder instance.
+        """
+        if factory.rule_profile is None:
+            return
+        if self.options.profile_rules:
+            print(factory.rule_profile.report(), file=sys.stderr)
+        if self.options.profile_json:
+            factory.rule_profile.dump(self.options.profile_json)
 
     def build_template(self):
         """Build template"""
+        from templateapp import TemplateBuilder
         try:
+            kwargs = dict(lazy=self.options.lazy, profile=self.options.profile)
+            kwargs.update(self.kwargs)
             factory = TemplateBuilder(
                 user_data=self.options.user_data,
-                **self.kwargs
+                **kwargs
             )
             print(factory.template)
+            self.show_profile(factory)
             sys.exit(0)
         except Exception as ex:
             fmt = '*** {}: {}\n*** Failed to generate template from\n{}'
@@ -189,6 +540,7 @@ class Cli:
 
     def build_test_script(self):
         """Build test script"""
+        from templateapp import TemplateBuilder
         platform = self.options.platform.lower()
         if platform:
             tbl = dict(unittest='create_unittest', pytest='create_pytest')
@@ -197,10 +549,12 @@ class Cli:
                 factory = TemplateBuilder(
                     user_data=self.options.user_data,
                     test_data=self.options.test_data,
+                    profile=self.options.profile,
                     **self.kwargs
                 )
                 test_script = getattr(factory, method_name)()
                 print('\n{}\n'.format(test_script))
+                self.show_profile(factory)
                 sys.exit(0)
             except Exception as ex:
                 fmt = '*** {}: {}\n*** Failed to test script from\n{}'
@@ -212,29 +566,297 @@ class Cli:
     def run_test(self):
         """Run test"""
         if self.options.test:
+            from templateapp import TemplateBuilder
             try:
+                kwargs = dict(profile=self.options.profile,
+                              engine=self.options.engine)
+                kwargs.update(self.kwargs)
                 factory = TemplateBuilder(
                     user_data=self.options.user_data,
                     test_data=self.options.test_data,
-                    **self.kwargs
+                    **kwargs
                 )
                 kwargs = dict(
                     expected_rows_count=self.kwargs.get('expected_rows_count', None),
                     expected_result=self.kwargs.get('expected_result', None),
                     tabular=self.kwargs.get('tabular', False),
-                    debug=True
+                    debug=True,
+                    profile_rules=self.options.profile_rules or bool(
+                        self.options.profile_json),
+                    budget=self.budget
                 )
                 factory.verify(**kwargs)
+                self.show_profile(factory)
+                self.show_rule_profile(factory)
                 sys.exit(0)
             except Exception as ex:
                 fmt = '*** {}: {}\n*** Failed to run template test from\n{}'
                 print(fmt.format(type(ex).__name__, ex, self.options.user_data))
                 sys.exit(1)
 
+    def verify_corpus(self):
+        """Verify test data files of corpus against generated template"""
+        if self.options.corpus:
+            from templateapp import TemplateBuilder
+            try:
+                kwargs = dict(engine=self.options.engine)
+                kwargs.update(self.kwargs)
+                factory = TemplateBuilder(
+                    user_data=self.options.user_data,
+                    **kwargs
+                )
+                report = factory.verify_corpus(self.options.corpus,
+                                               workers=self.options.jobs,
+                                               budget=self.budget)
+                print(report.report())
+                sys.exit(0 if report.is_passed else 1)
+            except Exception as ex:
+                fmt = '*** {}: {}\n*** Failed to verify corpus from\n{}'
+                print(fmt.format(type(ex).__name__, ex,
+                                 self.options.user_data))
+                sys.exit(1)
+
+    def check_redos(self):
+        """Report catastrophic-backtracking risks of generated template"""
+        if self.options.check_redos:
+            from templateapp import TemplateBuilder
+            try:
+                factory = TemplateBuilder(
+                    user_data=self.options.user_data,
+                    **self.kwargs
+                )
+                findings = factory.analyze_redos(
+                    fuzzing=True, budget=self.options.fuzz_budget
+                )
+                from templateapp.redos import report
+                print(report(findings))
+                is_confirmed = any(item.is_confirmed for item in findings)
+                sys.exit(1 if is_confirmed else 0)
+            except Exception as ex:
+                fmt = '*** {}: {}\n*** Failed to check ReDoS risk from\n{}'
+                print(fmt.format(type(ex).__name__, ex,
+                                 self.options.user_data))
+                sys.exit(1)
+
+    def optimize(self):
+        """Show rule-reordered template and its throughput report"""
+        if self.options.optimize:
+            from templateapp import TemplateBuilder
+            try:
+                kwargs = dict(engine=self.options.engine)
+                kwargs.update(self.kwargs)
+                factory = TemplateBuilder(
+                    user_data=self.options.user_data,
+                    test_data=self.options.test_data,
+                    **kwargs
+                )
+                result = factory.optimize(self.options.corpus or None)
+                print(result.template)
+                print(result.report(), file=sys.stderr)
+                sys.exit(0)
+            except Exception as ex:
+                fmt = '*** {}: {}\n*** Failed to optimize template from\n{}'
+                print(fmt.format(type(ex).__name__, ex,
+                                 self.options.user_data))
+                sys.exit(1)
+
+    def build_directory(self):
+        """Build templates of every user data file of input directory"""
+        from templateapp.batch import build_directory
+        self.load_config()
+        try:
+            result = build_directory(
+                self.options.input_dir, self.options.output_dir,
+                workers=self.options.jobs, platform=self.options.platform,
+                options=self.kwargs
+            )
+            print(result.report())
+            sys.exit(0 if result.is_success else 1)
+        except Exception as ex:
+            fmt = '*** {}: {}\n*** Failed to build templates from {}'
+            print(fmt.format(type(ex).__name__, ex, self.options.input_dir))
+            sys.exit(1)
+
+    def serve(self):
+        """Run a parse service until it is interrupted"""
+        from templateapp.registry import TemplateRegistry
+        from templateapp.service import create_server
+        options = self.options
+        registry = TemplateRegistry(engine=options.engine)
+        try:
+            options.templates and registry.load_files(options.templates)
+            options.user_templates and registry.load_user_templates()
+            max_body_size = int(options.max_body_size * 1024 * 1024)
+            server = create_server(registry, socket_path=options.socket,
+                                   host=options.host, port=options.port,
+                                   workers=options.jobs,
+                                   verbose=options.verbose,
+                                   request_timeout=options.timeout,
+                                   max_body_size=max_body_size,
+                                   max_pending=options.max_pending)
+        except Exception as ex:
+            fmt = '*** {}: {}\n*** Failed to start parse service'
+            print(fmt.format(type(ex).__name__, ex), file=sys.stderr)
+            sys.exit(1)
+
+        for name, error in registry.errors.items():
+            print('*** Skipped template {} - {}'.format(name, error),
+                  file=sys.stderr)
+        fmt = 'Serving {} template(s) on {}'
+        print(fmt.format(len(registry), server.url), file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        sys.exit(0)
+
+    def client(self):
+        """Forward stdin to a parse service and write its response to stdout"""
+        import json
+        import http.client
+        from templateapp.service import ParseClient
+        from templateapp.service import ServiceError
+        from templateapp.service import iter_chunks
+        options = self.options
+        client = ParseClient(socket_path=options.socket, host=options.host,
+                             port=options.port)
+        body = iter_chunks(sys.stdin.buffer)
+        try:
+            if options.verify:
+                query = dict(name=options.name)
+                count = options.expected_rows_count
+                if count is not None:
+                    query.update(expected_rows_count=count)
+                result = client.get_json('POST', '/verify', body=body, **query)
+                print(json.dumps(result))
+                sys.exit(0 if result['is_verified'] else 1)
+
+            response = client.request('POST', '/parse', body=body,
+                                      name=options.name,
+                                      format=options.format or 'jsonl')
+            output = sys.stdout.buffer
+            chunk = response.read1(65536)
+            while chunk:
+                output.write(chunk)
+                chunk = response.read1(65536)
+            output.flush()
+            sys.exit(0)
+        except BrokenPipeError:
+            sys.stderr.close()
+            sys.exit(0)
+        except (ServiceError, OSError, http.client.HTTPException) as ex:
+            print('*** {}: {}'.format(type(ex).__name__, ex), file=sys.stderr)
+            sys.exit(1)
+
+    def load_template(self):
+        """Return a template of --template file or of --name"""
+        options = self.options
+        if options.template_file:
+            with open(options.template_file) as stream:
+                return stream.read()
+
+        from templateapp.registry import load_user_templates
+        templates = load_user_templates()
+        if options.name not in templates:
+            fmt = 'Template {!r} is not found in user templates.'
+            raise KeyError(fmt.format(options.name))
+        return templates[options.name]
+
+    def parse_inputs(self):
+        """Parse many inputs via a stored template into a streaming sink"""
+        from templateapp.parser import TemplateParser
+        from templateapp.runner import parse_files
+        from templateapp.sink import get_sink
+        options = self.options
+        options.format = options.format or 'jsonl'
+        if options.format == 'sqlite' and not options.output:
+            print('*** sqlite format requires -o DATABASE', file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            parser = TemplateParser(self.load_template(),
+                                    engine=options.engine)
+            header = list(parser.header)
+            options.source_field and header.append(options.source_field)
+            kwargs = dict()
+            if options.format == 'sqlite':
+                stream, kwargs = options.output, dict(table=options.table)
+            elif options.output:
+                stream = open(options.output, 'w', newline='')
+            else:
+                stream = sys.stdout
+            try:
+                sink = get_sink(options.format, stream, header, **kwargs)
+                with sink:
+                    summary = parse_files(parser, options.inputs, sink,
+                                          workers=options.jobs,
+                                          source_field=options.source_field)
+            finally:
+                if options.output and stream is not options.output:
+                    stream.close()
+        except BrokenPipeError:
+            sys.stderr.close()
+            sys.exit(0)
+        except Exception as ex:
+            fmt = '*** {}: {}\n*** Failed to parse {}'
+            print(fmt.format(type(ex).__name__, ex, ' '.join(options.inputs)),
+                  file=sys.stderr)
+            sys.exit(1)
+
+        options.quiet or print(summary.report(), file=sys.stderr)
+        sys.exit(0 if summary.is_success else 1)
+
+    def stream_records(self):
+        """Write parsed records of test data to stdout one by one"""
+        if not self.options.format:
+            return
+
+        from templateapp import TemplateBuilder
+        from templateapp.sink import get_sink
+        source = self.test_source or self.options.test_data
+        if not source:
+            print('*** --format requires test data via -t TEXT, '
+                  '-t file::FILENAME, or -t -', file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            kwargs = dict(engine=self.options.engine)
+            kwargs.update(self.kwargs)
+            factory = TemplateBuilder(user_data=self.options.user_data,
+                                      **kwargs)
+            sink = get_sink(self.options.format, sys.stdout,
+                            factory.template_parser.header,
+                            flush=source is sys.stdin)
+            with sink:
+                sink.write_many(factory.iter_parse(source))
+            sys.exit(0)
+        except BrokenPipeError:
+            sys.stderr.close()
+            sys.exit(0)
+        except Exception as ex:
+            fmt = '*** {}: {}\n*** Failed to parse test data from\n{}'
+            print(fmt.format(type(ex).__name__, ex, self.options.user_data),
+                  file=sys.stderr)
+            sys.exit(1)
+
     def run(self):
         """Take CLI arguments, parse it, and process."""
+        if self.options.command == 'build':
+            self.build_directory()
+        elif self.options.command == 'serve':
+            self.serve()
+        elif self.options.command == 'client':
+            self.client()
+        elif self.options.command == 'parse':
+            self.parse_inputs()
         show_dependency(self.options)
         self.validate_cli_flags()
+        self.stream_records()
+        self.check_redos()
+        self.optimize()
+        self.verify_corpus()
         if not self.options.test_data:
             self.build_template()
         else:
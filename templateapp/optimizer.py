@@ -0,0 +1,454 @@
+"""Module containing a profile-guided rule reordering optimizer.
+
+TextFSM tries rules of a state in template order, so that a frequent rule
+placed late pays for every failing rule before it.  Rules are reordered by
+hit counts of a sample corpus with adjacent swaps, and two rules are only
+swapped if they are disjoint, i.e. no line can match both.  Rules which can
+match a same line keep their relative order, hence every line matches the
+same rules in the same order and parsed result is unchanged, including
+Continue rules.
+
+Disjointness is proven statically from leading literals of rule regexes.
+Rules which are not provably disjoint, but never matched a same line of
+the corpus, can be swapped too if parsing the corpus with the reordered
+template gives an identical result.
+"""
+
+import re
+from io import StringIO
+from itertools import combinations
+from time import perf_counter
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:     # pragma: no cover - Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from templateapp.engine import get_parser_class
+from templateapp.profiler import ProfilingTextFSM
+from templateapp.redos import CATEGORIES
+from templateapp.redos import REPEAT_OPS
+from templateapp.redos import is_nullable
+
+C = sre_constants
+
+
+def split_literal_prefix(pattern):
+    """return a leading literal and remaining nodes of a rule regex
+
+    Parameters
+    ----------
+    pattern (str): a rule regex.
+
+    Returns
+    -------
+    tuple: a literal prefix and a list of remaining parsed nodes, or None
+            if pattern uses inline flags or cannot be parsed.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+    if parsed.state.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+
+    nodes = []
+
+    def expand(subpattern):
+        for op, av in subpattern:
+            if op is C.SUBPATTERN:
+                if av[1] or av[2]:
+                    return False
+                if not expand(av[-1]):
+                    return False
+            else:
+                nodes.append((op, av))
+        return True
+
+    if not expand(parsed):
+        return None
+
+    lst = []
+    index = 0
+    for index, (op, av) in enumerate(nodes):
+        if op is C.AT and av is C.AT_BEGINNING:
+            continue
+        if op is not C.LITERAL:
+            break
+        lst.append(chr(av))
+    else:
+        index = len(nodes)
+    return ''.join(lst), nodes[index:]
+
+
+def set_contains(items, char):
+    """return True if a parsed character set may contain char"""
+    is_negated = False
+    is_found = False
+    for op, av in items:
+        if op is C.NEGATE:
+            is_negated = True
+        elif op is C.LITERAL:
+            is_found |= av == ord(char)
+        elif op is C.RANGE:
+            is_found |= av[0] <= ord(char) <= av[1]
+        elif op is C.CATEGORY and av in CATEGORIES:
+            is_found |= bool(re.match(CATEGORIES[av], char))
+        else:
+            return True
+    return is_found != is_negated
+
+
+def can_start_with(subpattern, char):
+    """return True if a parsed regex may match a text starting with char
+
+    It is conservative, i.e. an unsupported construct returns True.
+
+    Parameters
+    ----------
+    subpattern (list): a parsed sequence of regular expression.
+    char (str): a character.
+
+    Returns
+    -------
+    bool: False only if no match can start with char.
+    """
+    for op, av in subpattern:
+        if op is C.AT:
+            continue
+        if op is C.LITERAL:
+            return av == ord(char)
+        if op is C.NOT_LITERAL:
+            return av != ord(char)
+        if op is C.ANY:
+            return char != '\n'
+        if op is C.IN:
+            return set_contains(av, char)
+        if op is C.SUBPATTERN:
+            if av[1] or av[2]:
+                return True
+            body = av[-1]
+        elif op in REPEAT_OPS:
+            body = av[2]
+            if av[0] == 0:
+                if can_start_with(body, char):
+                    return True
+                continue
+        elif op is C.BRANCH:
+            if any(can_start_with(item, char) for item in av[1]):
+                return True
+            if is_nullable(op, av):
+                continue
+            return False
+        else:
+            return True
+
+        if can_start_with(body, char):
+            return True
+        if not is_nullable(op, av):
+            return False
+    return True
+
+
+def is_disjoint(pattern, other):
+    """return True if no line can match both rule regexes
+
+    Parameters
+    ----------
+    pattern (str): a rule regex.
+    other (str): other rule regex.
+
+    Returns
+    -------
+    bool: True if rules are provably disjoint.
+    """
+    first = split_literal_prefix(pattern)
+    second = split_literal_prefix(other)
+    if first is None or second is None:
+        return False
+
+    (prefix, nodes), (other_prefix, other_nodes) = first, second
+    size = min(len(prefix), len(other_prefix))
+    if prefix[:size] != other_prefix[:size]:
+        return True
+    if len(prefix) > size:
+        return not can_start_with(other_nodes, prefix[size])
+    if len(other_prefix) > size:
+        return not can_start_with(nodes, other_prefix[size])
+    return False
+
+
+class CorpusProfilingTextFSM(ProfilingTextFSM):
+    """Profiling parser which also records rules matching a same line
+
+    Attributes
+    ----------
+    overlaps (set): a set of (state, position, position) of rules which
+            matched a same line of corpus.
+    """
+    def __init__(self, template):
+        super().__init__(template)
+        self.overlaps = set()
+
+    def _CheckLine(self, line):
+        state = self._cur_state_name
+        matched = [position for position, rule in enumerate(self._cur_state)
+                   if rule.regex_obj.match(line)]
+        for pair in combinations(matched, 2):
+            self.overlaps.add((state,) + pair)
+        super()._CheckLine(line)
+
+
+def get_rule_lines(template, parser):
+    """return line positions of rules of each state of template text
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+    parser (TextFSM): a compiled parser of template.
+
+    Returns
+    -------
+    dict: a mapping of state name to a list of line positions.
+
+    Raises
+    ------
+    ValueError: raise exception if rules of template text cannot be located.
+    """
+    positions = dict()
+    state = None
+    for index, line in enumerate(template.splitlines()):
+        if re.match(r'\w+\s*$', line):
+            state = line.strip()
+            positions[state] = []
+        elif state and re.match(r'\s+\^', line):
+            positions[state].append(index)
+
+    for name, rules in parser.states.items():
+        if len(positions.get(name, [])) != len(rules):
+            raise ValueError('Cannot locate rules of state {}.'.format(name))
+    return positions
+
+
+def reorder(rules, hits, can_swap):
+    """return rule positions sorted by hits with adjacent swaps
+
+    Rules which cannot be swapped keep their relative order.
+
+    Parameters
+    ----------
+    rules (list): a list of rules of a state.
+    hits (list): a list of hit counts in order of rules.
+    can_swap (callable): a function of two positions which returns True
+            if rules are swappable.
+
+    Returns
+    -------
+    list: a list of rule positions in a new order.
+    """
+    order = list(range(len(rules)))
+    for index in range(1, len(order)):
+        current = index
+        while current > 0:
+            before, after = order[current - 1], order[current]
+            if hits[after] <= hits[before] or not can_swap(before, after):
+                break
+            order[current - 1], order[current] = after, before
+            current -= 1
+    return order
+
+
+def render(template, rule_lines, orders):
+    """return template text whose rules of each state are reordered"""
+    lines = template.splitlines()
+    result = list(lines)
+    for state, order in orders.items():
+        positions = rule_lines[state]
+        for position, index in zip(positions, order):
+            result[position] = lines[positions[index]]
+    text = '\n'.join(result)
+    return text + '\n' if template.endswith('\n') else text
+
+
+def parse_texts(parser, texts):
+    """return parsed rows of every text"""
+    lst = []
+    for text in texts:
+        parser.Reset()
+        lst.append(parser.ParseText(text))
+    return lst
+
+
+def measure_throughput(template, texts, engine='textfsm', repeat=3):
+    """return the best wall time of parsing all texts
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+    texts (list): a list of text.
+    engine (str): textfsm or alternation.  Default is textfsm.
+    repeat (int): a number of measurements.  Default is 3.
+
+    Returns
+    -------
+    float: seconds.
+    """
+    parser = get_parser_class(engine)(StringIO(template))
+    best = None
+    for _ in range(max(repeat, 1)):
+        start = perf_counter()
+        parse_texts(parser, texts)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def count_attempts(template, texts):
+    """return a total number of rule regex calls of parsing all texts"""
+    parser = ProfilingTextFSM(StringIO(template))
+    parse_texts(parser, texts)
+    return sum(stats.attempts for stats in parser.profile.rules.values())
+
+
+class OptimizationResult:
+    """Result of reordering rules of a template
+
+    Attributes
+    ----------
+    original (str): an original template.
+    template (str): an optimized template.
+    orders (dict): a mapping of state name to original rule positions in
+            a new order.  Only reordered states are included.
+    is_corpus_checked (bool): True if a reordering relies on an equivalence
+            check on corpus besides static disjointness.
+    lines_count (int): a number of corpus lines.
+    attempts (tuple): rule regex calls before and after.
+    elapsed (tuple): the best parse time in seconds before and after.
+
+    Properties
+    ----------
+    is_changed (bool): True if any rule is reordered.
+    speedup (float): a ratio of parse time before and after.
+
+    Methods
+    -------
+    report() -> str
+    """
+    def __init__(self, original, template, orders, is_corpus_checked=False,
+                 lines_count=0, attempts=(0, 0), elapsed=(0.0, 0.0)):
+        self.original = original
+        self.template = template
+        self.orders = orders
+        self.is_corpus_checked = is_corpus_checked
+        self.lines_count = lines_count
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        fmt = '{}(is_changed={}, speedup={:.2f})'
+        return fmt.format(type(self).__name__, self.is_changed, self.speedup)
+
+    @property
+    def is_changed(self):
+        """return True if any rule is reordered"""
+        return bool(self.orders)
+
+    @property
+    def speedup(self):
+        """return a ratio of parse time before and after"""
+        before, after = self.elapsed
+        return before / after if after else 1.0
+
+    def report(self):
+        """return a before/after throughput report in text format"""
+        lst = []
+        for state, order in self.orders.items():
+            lst.append('{}: rule order {}'.format(state, order))
+        if not lst:
+            lst.append('Rule order is unchanged.')
+        if self.is_corpus_checked:
+            lst.append('Reordering is verified by an equivalence check '
+                       'on corpus.')
+
+        before, after = self.elapsed
+        fmt = '{:<8} {:>14} {:>12} {:>16}'
+        lst.extend(['', fmt.format('', 'Attempts', 'Time (ms)', 'Lines/sec'),
+                    '-' * 53])
+        fmt = '{:<8} {:>14} {:>12.3f} {:>16.0f}'
+        for label, attempts, elapsed in zip(('Before', 'After'),
+                                            self.attempts, self.elapsed):
+            rate = self.lines_count / elapsed if elapsed else 0
+            lst.append(fmt.format(label, attempts, elapsed * 1000, rate))
+        lst.append('Speedup: {:.2f}x'.format(self.speedup))
+        return '\n'.join(lst)
+
+
+def optimize_template(template, texts, engine='textfsm', check_corpus=True,
+                      repeat=3):
+    """return a template whose rules are reordered by hits of corpus
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+    texts (list): a list of sample text.
+    engine (str): a parse engine to measure throughput.  Default is textfsm.
+    check_corpus (bool): also swap rules which never matched a same line of
+            corpus if parsing corpus gives an identical result.
+            Default is True.
+    repeat (int): a number of throughput measurements.  Default is 3.
+
+    Returns
+    -------
+    OptimizationResult: an optimized template and a throughput report.
+    """
+    texts = list(texts)
+    parser = CorpusProfilingTextFSM(StringIO(template))
+    expected = parse_texts(parser, texts)
+    rule_lines = get_rule_lines(template, parser)
+    stats = list(parser.profile.rules.values())
+
+    def build(is_swappable):
+        orders = dict()
+        for state, rules in parser.states.items():
+            hits = [item.hits for item in stats if item.state == state]
+
+            def can_swap(before, after):
+                return is_swappable(state, rules, before, after)
+
+            order = reorder(rules, hits, can_swap)
+            if order != sorted(order):
+                orders[state] = order
+        return orders
+
+    def is_proven(state, rules, before, after):
+        return is_disjoint(rules[before].regex, rules[after].regex)
+
+    def is_unseen(state, rules, before, after):
+        pair = (state, min(before, after), max(before, after))
+        if is_proven(state, rules, before, after):
+            return True
+        return pair not in parser.overlaps
+
+    orders = build(is_proven)
+    is_corpus_checked = False
+    if check_corpus:
+        candidate = build(is_unseen)
+        if candidate != orders:
+            optimized = render(template, rule_lines, candidate)
+            other = get_parser_class()(StringIO(optimized))
+            if parse_texts(other, texts) == expected:
+                orders, is_corpus_checked = candidate, True
+
+    optimized = render(template, rule_lines, orders)
+    return OptimizationResult(
+        template, optimized, orders, is_corpus_checked=is_corpus_checked,
+        lines_count=parser.profile.lines_count,
+        attempts=(count_attempts(template, texts),
+                  count_attempts(optimized, texts)),
+        elapsed=(measure_throughput(template, texts, engine=engine,
+                                    repeat=repeat),
+                 measure_throughput(optimized, texts, engine=engine,
+                                    repeat=repeat))
+    )
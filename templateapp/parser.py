@@ -0,0 +1,387 @@
+"""Module containing the logic for parsing text via TextFSM template."""
+
+import os
+import copy
+import threading
+from io import StringIO
+from collections.abc import Mapping
+
+from templateapp.cache import LRUCache
+from templateapp.engine import get_parser_class
+
+
+def iter_lines(source):
+    """yield lines of source without loading whole source to memory
+
+    Lines are split identically to TextFSM.ParseText which uses
+    str.splitlines.
+
+    Parameters
+    ----------
+    source (str, os.PathLike, file object): a text, a file path, or
+            a file object in text mode.
+
+    Returns
+    -------
+    generator: a generator of line.
+    """
+    if isinstance(source, str):
+        yield from source.splitlines()
+    elif isinstance(source, os.PathLike):
+        with open(source) as stream:
+            for chunk in stream:
+                yield from chunk.splitlines()
+    else:
+        for chunk in source:
+            yield from chunk.splitlines()
+
+
+def iter_rows(parser, source, eof=True):
+    """yield parsed rows as soon as TextFSM records them
+
+    This is a line-by-line equivalent of TextFSM.ParseText.  A peak memory
+    is bounded by the largest record instead of the size of source.  If
+    template has a Fillup value, rows are held until end of source because
+    Fillup updates previous records.
+
+    Parameters
+    ----------
+    parser (TextFSM): a TextFSM instance.
+    source (str, os.PathLike, file object): a text, a file path, or
+            a file object in text mode.
+    eof (bool): trigger EOF state at end of source.  Default is True.
+
+    Returns
+    -------
+    generator: a generator of list.
+    """
+    parser.Reset()
+    result = parser._result
+    is_streamable = not parser.GetValuesByAttrib('Fillup')
+
+    for line in iter_lines(source):
+        parser._CheckLine(line)
+        if is_streamable and result:
+            yield from result
+            del result[:]
+        if parser._cur_state_name in ('End', 'EOF'):
+            break
+
+    if parser._cur_state_name != 'End' and 'EOF' not in parser.states and eof:
+        parser._AppendRecord()
+
+    yield from result
+    del result[:]
+
+
+def iter_records(parser, source, eof=True):
+    """yield parsed records as dictionary
+
+    Parameters
+    ----------
+    parser (TextFSM): a TextFSM instance.
+    source (str, os.PathLike, file object): a text, a file path, or
+            a file object in text mode.
+    eof (bool): trigger EOF state at end of source.  Default is True.
+
+    Returns
+    -------
+    generator: a generator of dict.
+    """
+    header = parser.header
+    for row in iter_rows(parser, source, eof=eof):
+        yield dict(zip(header, row))
+
+
+class RowView(Mapping):
+    """Read-only dictionary view of a row of Columns
+
+    Attributes
+    ----------
+    columns (Columns): a columnar result.
+    index (int): a row position.
+    """
+    __slots__ = ('columns', 'index')
+
+    def __init__(self, columns, index):
+        self.columns = columns
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.columns.data[key][self.index]
+
+    def __iter__(self):
+        return iter(self.columns.header)
+
+    def __len__(self):
+        return len(self.columns.header)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class Columns:
+    """Columnar result of parsing which stores one list per Value
+
+    A record is not materialized as dictionary so that column names are not
+    repeated for every row.  A row is accessed via a RowView.
+
+    Attributes
+    ----------
+    header (list): a list of Value names.
+    data (dict): a mapping of Value name to a list of parsed values.
+
+    Methods
+    -------
+    Columns.from_records(records, header=None) -> Columns
+    append(row) -> None
+    extend(rows) -> None
+    column(name) -> list
+    to_records() -> list
+    """
+    def __init__(self, header):
+        self.header = list(header)
+        self.data = dict((name, []) for name in self.header)
+        self._lists = [self.data[name] for name in self.header]
+
+    def __len__(self):
+        return len(self._lists[0]) if self._lists else 0
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield RowView(self, index)
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self.data[item]
+        if isinstance(item, slice):
+            return [RowView(self, i) for i in range(len(self))[item]]
+        index = range(len(self))[item]
+        return RowView(self, index)
+
+    def __eq__(self, other):
+        if isinstance(other, Columns):
+            return self.data == other.data
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        if len(other) != len(self):
+            return False
+
+        keys = set(self.header)
+        for index, record in enumerate(other):
+            if not isinstance(record, Mapping) or len(record) != len(keys):
+                return False
+            for name, lst in self.data.items():
+                if name not in record or record[name] != lst[index]:
+                    return False
+        return True
+
+    def __repr__(self):
+        fmt = '{}(header={!r}, rows_count={})'
+        return fmt.format(type(self).__name__, self.header, len(self))
+
+    @classmethod
+    def from_records(cls, records, header=None):
+        """return Columns of a list of dictionary
+
+        Parameters
+        ----------
+        records (list): a list of dictionary.
+        header (list): a list of Value names.  Default is None which uses
+                keys of the first record.
+
+        Returns
+        -------
+        Columns: a columnar result.
+        """
+        records = list(records)
+        if header is None:
+            header = list(records[0]) if records else []
+        columns = cls(header)
+        columns.extend([record[name] for name in columns.header]
+                       for record in records)
+        return columns
+
+    def append(self, row):
+        """add a row in order of header
+
+        Parameters
+        ----------
+        row (list): a list of parsed values.
+        """
+        for lst, value in zip(self._lists, row):
+            lst.append(value)
+
+    def extend(self, rows):
+        """add rows in order of header
+
+        Parameters
+        ----------
+        rows (iterable): an iterable of list of parsed values.
+        """
+        for row in rows:
+            for lst, value in zip(self._lists, row):
+                lst.append(value)
+
+    def column(self, name):
+        """return a list of parsed values of Value name"""
+        return self.data[name]
+
+    def to_records(self):
+        """return rows as a list of dictionary"""
+        header = self.header
+        return [dict(zip(header, row)) for row in zip(*self._lists)]
+
+
+def iter_columns(parser, source, eof=True):
+    """return a columnar result of parsing source line by line
+
+    Parameters
+    ----------
+    parser (TextFSM): a TextFSM instance.
+    source (str, os.PathLike, file object): a text, a file path, or
+            a file object in text mode.
+    eof (bool): trigger EOF state at end of source.  Default is True.
+
+    Returns
+    -------
+    Columns: a columnar result.
+    """
+    columns = Columns(parser.header)
+    columns.extend(iter_rows(parser, source, eof=eof))
+    return columns
+
+
+class TemplateParser:
+    """Reusable compiled parser of a template
+
+    A template is compiled once.  A thread which creates TemplateParser
+    uses compiled TextFSM parser directly, other threads get their own
+    copy, and every parse starts with TextFSM.Reset.
+
+    Attributes
+    ----------
+    template (str): a TextFSM template.
+    engine (str): textfsm or alternation.  Default is textfsm.
+    prefilter (bool): skip lines which no rule of current state can match
+            by a literal scan.  Default is False.
+
+    Properties
+    ----------
+    parser (TextFSM): a TextFSM parser of current thread.
+    header (list): a list of Value names.
+
+    Methods
+    -------
+    parse(text, columnar=False) -> list or Columns
+    parse_rows(text) -> list
+    iter_records(source) -> generator
+    """
+    def __init__(self, template, parser=None, engine='textfsm',
+                 prefilter=False):
+        self.template = template
+        self.engine = engine
+        self.prefilter = prefilter
+        if parser is None:
+            cls = get_parser_class(engine=engine, prefilter=prefilter)
+            parser = cls(StringIO(template))
+        self._parser = parser
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+
+    @property
+    def parser(self):
+        """return a TextFSM parser of current thread"""
+        if threading.get_ident() == self._owner:
+            return self._parser
+        parser = getattr(self._local, 'parser', None)
+        if parser is None:
+            parser = copy.deepcopy(self._parser)
+            self._local.parser = parser
+        return parser
+
+    @property
+    def header(self):
+        """return a list of Value names"""
+        return self._parser.header
+
+    def parse_rows(self, text):
+        """return a list of parsed rows of text
+
+        Parameters
+        ----------
+        text (str): a text.
+
+        Returns
+        -------
+        list: a list of list.
+        """
+        parser = self.parser
+        parser.Reset()
+        return parser.ParseText(text)
+
+    def parse(self, text, columnar=False):
+        """return parsed records of text
+
+        Parameters
+        ----------
+        text (str): a text.
+        columnar (bool): return a Columns result.  Default is False.
+
+        Returns
+        -------
+        list: a list of dictionary or Columns if columnar is True.
+        """
+        parser = self.parser
+        if columnar:
+            return iter_columns(parser, text)
+        parser.Reset()
+        return parser.ParseTextToDicts(text)
+
+    def iter_records(self, source):
+        """yield parsed records of source one by one
+
+        Parameters
+        ----------
+        source (str, os.PathLike, file object): a text, a file path, or
+                a file object in text mode.
+
+        Returns
+        -------
+        generator: a generator of dict.
+        """
+        yield from iter_records(self.parser, source)
+
+
+parser_cache = LRUCache(maxsize=128)
+
+
+def get_parser(template, parser=None, engine='textfsm', prefilter=False,
+               parser_factory=None):
+    """return a process-wide TemplateParser of template
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+    parser (TextFSM): a compiled parser of template to reuse if template
+            is not cached yet.  Default is None.
+    engine (str): textfsm or alternation.  Default is textfsm.
+    prefilter (bool): skip lines which no rule of current state can match
+            by a literal scan.  Default is False.
+    parser_factory (callable): a callable which returns a compiled parser
+            of template.  It is only called if template is not cached yet
+            and parser is None.  Default is None.
+
+    Returns
+    -------
+    TemplateParser: a reusable parser.
+    """
+    key = (template, engine, bool(prefilter))
+    template_parser = parser_cache.get(key)
+    if template_parser is None:
+        if parser is None and parser_factory is not None:
+            parser = parser_factory()
+        template_parser = TemplateParser(template, parser=parser,
+                                         engine=engine, prefilter=prefilter)
+        parser_cache.set(key, template_parser)
+    return template_parser
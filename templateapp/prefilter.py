@@ -0,0 +1,175 @@
+"""Module containing a literal prefilter for TextFSM parsing.
+
+A rule can only match a line which contains its required literal, i.e.
+^Title +Price +Genre requires "Title".  If every rule of a state has a
+required literal, a line which has none of them cannot match any rule of
+that state, and TextFSM would do nothing with it.  Such a line is skipped
+before any rule regex runs.
+"""
+
+import re
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:     # pragma: no cover - Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from textfsm import TextFSM
+
+REPEAT_OPS = tuple(
+    getattr(sre_constants, name)
+    for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+    if hasattr(sre_constants, name)
+)
+ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+
+
+def collect_literals(subpattern, flags, runs):
+    """collect runs of literal characters which must occur in a match
+
+    Parameters
+    ----------
+    subpattern (list): a parsed sequence of regular expression.
+    flags (int): active regex flags.
+    runs (list): a list to store literal runs.
+    """
+    run = []
+    for op, av in subpattern:
+        if op is sre_constants.LITERAL and not flags & re.IGNORECASE:
+            run.append(chr(av))
+            continue
+
+        run and runs.append(''.join(run))
+        run = []
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, item = av
+            collect_literals(item, (flags | add_flags) & ~del_flags, runs)
+        elif op in REPEAT_OPS and av[0] >= 1:
+            collect_literals(av[2], flags, runs)
+        elif op is ATOMIC_GROUP:
+            collect_literals(av, flags, runs)
+
+    run and runs.append(''.join(run))
+
+
+def get_required_literal(pattern):
+    """return the longest literal which must occur in any match of pattern
+
+    Parameters
+    ----------
+    pattern (str): a regular expression pattern.
+
+    Returns
+    -------
+    str: a required literal.  Empty if there is no required literal.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return ''
+
+    runs = []
+    collect_literals(parsed, parsed.state.flags, runs)
+    return max(runs, key=len) if runs else ''
+
+
+def build_state_filters(parser):
+    """return a mapping of state name to required literals of its rules
+
+    A state is not filtered, i.e. value is None, if any of its rules has
+    no required literal.
+
+    Parameters
+    ----------
+    parser (TextFSM): a TextFSM instance.
+
+    Returns
+    -------
+    dict: a mapping of state name to a tuple of literals or None.
+    """
+    filters = dict()
+    for name, rules in parser.states.items():
+        literals = []
+        for rule in rules:
+            literal = get_required_literal(rule.regex)
+            if not literal:
+                literals = []
+                break
+            literals.append(literal)
+
+        # a literal containing another literal is redundant
+        lst = []
+        for literal in sorted(set(literals), key=len):
+            if not any(item in literal for item in lst):
+                lst.append(literal)
+        filters[name] = tuple(lst) or None
+    return filters
+
+
+class PrefilterTextFSM(TextFSM):
+    """TextFSM parser which skips lines no rule of current state can match
+
+    Attributes
+    ----------
+    filters (dict): a mapping of state name to required literals of its rules.
+    """
+    def __init__(self, template):
+        super().__init__(template)
+        self.filters = build_state_filters(self)
+
+    def _CheckLine(self, line):
+        literals = self.filters.get(self._cur_state_name)
+        if literals:
+            for literal in literals:
+                if literal in line:
+                    break
+            else:
+                return
+        super()._CheckLine(line)
+
+    def ParseText(self, text, eof=True):
+        """Passes text through FSM and returns a list of rows.
+
+        While current state is filtered, remaining text is scanned for the
+        nearest required literal so that irrelevant lines are skipped without
+        a per-line Python call.  A next position of every literal is kept
+        so that text is scanned at most once per literal.
+        """
+        lines = text.splitlines() if text else []
+        joined = '\n'.join(lines)
+        check_line = super()._CheckLine
+        positions = dict()
+        total = len(lines)
+        index, pos = 0, 0
+
+        while index < total:
+            literals = self.filters.get(self._cur_state_name)
+            if literals:
+                start = -1
+                for literal in literals:
+                    found = positions.get(literal, -2)
+                    if -1 != found < pos:
+                        found = joined.find(literal, pos)
+                        positions[literal] = found
+                    if found >= 0 and (start < 0 or found < start):
+                        start = found
+                if start < 0:
+                    break
+                count = joined.count('\n', pos, start)
+                if count:
+                    index += count
+                    pos = joined.rfind('\n', pos, start) + 1
+
+            line = lines[index]
+            check_line(line)
+            if self._cur_state_name in ('End', 'EOF'):
+                break
+            index += 1
+            pos += len(line) + 1
+
+        if self._cur_state_name != 'End' and 'EOF' not in self.states and eof:
+            self._AppendRecord()
+
+        return self._result
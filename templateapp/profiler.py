@@ -0,0 +1,265 @@
+"""Module containing per-rule hit counters and match-time profiling.
+
+A profiling parser times every rule regex call of TextFSM, so that rules
+which never fire and rules which burn time failing to match are visible
+per state.  Profiling uses stock TextFSM matching one rule at a time
+regardless of a parse engine because timing must be attributed per rule.
+"""
+
+import re
+import json
+from time import perf_counter
+from collections import OrderedDict
+
+from textfsm import TextFSM
+
+SORT_KEYS = ('total', 'attempts', 'hits', 'worst', 'miss', 'order')
+
+
+class RuleStats:
+    """Hit counters and regex time of a template rule
+
+    Attributes
+    ----------
+    state (str): a state name.
+    index (int): a rule position in state.
+    match (str): a rule match of template, i.e. ^${name} +${num}.
+    values (list): a list of Value names which a rule refers to.
+    attempts (int): a number of regex calls.
+    hits (int): a number of matched regex calls.
+    total (float): total regex time in seconds.
+    miss (float): regex time in seconds of calls which did not match.
+    worst (float): the slowest regex call in seconds.
+
+    Properties
+    ----------
+    name (str): a rule reference, i.e. Start[1].
+    is_dead (bool): True if a rule was tried but never matched.
+    """
+    __slots__ = ('state', 'index', 'match', 'values', 'attempts', 'hits',
+                 'total', 'miss', 'worst')
+
+    def __init__(self, state, index, match, values):
+        self.state = state
+        self.index = index
+        self.match = match
+        self.values = values
+        self.attempts = 0
+        self.hits = 0
+        self.total = 0.0
+        self.miss = 0.0
+        self.worst = 0.0
+
+    def __repr__(self):
+        fmt = '{}(name={!r}, attempts={}, hits={})'
+        return fmt.format(type(self).__name__, self.name, self.attempts,
+                          self.hits)
+
+    @property
+    def name(self):
+        """return a rule reference"""
+        return '{}[{}]'.format(self.state, self.index)
+
+    @property
+    def is_dead(self):
+        """return True if a rule was tried but never matched"""
+        return self.attempts > 0 and self.hits == 0
+
+    def to_dict(self):
+        """return rule statistics as dictionary"""
+        return OrderedDict(
+            state=self.state, index=self.index, match=self.match,
+            values=self.values, attempts=self.attempts, hits=self.hits,
+            total=self.total, miss=self.miss, worst=self.worst
+        )
+
+
+class RuleProfile:
+    """Per-rule statistics of a profiling parse
+
+    Attributes
+    ----------
+    rules (dict): a mapping of TextFSM rule to RuleStats in template order.
+    lines_count (int): a number of parsed lines.
+
+    Properties
+    ----------
+    dead_rules (list): a list of RuleStats which were tried but never matched.
+
+    Methods
+    -------
+    record(rule, is_hit, elapsed) -> None
+    reset() -> None
+    sorted_rules(sort='total') -> list
+    value_costs() -> OrderedDict
+    to_dict() -> dict
+    to_json(indent=2) -> str
+    dump(filename) -> None
+    report(sort='total', limit=None) -> str
+    """
+    def __init__(self, parser):
+        self.rules = OrderedDict()
+        self.lines_count = 0
+        for state in parser.state_list:
+            for index, rule in enumerate(parser.states[state]):
+                values = list(re.compile(rule.regex).groupindex)
+                stats = RuleStats(state, index, rule.match.strip(), values)
+                self.rules[rule] = stats
+
+    def __repr__(self):
+        fmt = '{}(rules_count={}, lines_count={})'
+        return fmt.format(type(self).__name__, len(self.rules),
+                          self.lines_count)
+
+    @property
+    def dead_rules(self):
+        """return a list of rules which were tried but never matched"""
+        return [stats for stats in self.rules.values() if stats.is_dead]
+
+    def record(self, rule, is_hit, elapsed):
+        """add a regex call of rule
+
+        Parameters
+        ----------
+        rule (TextFSMRule): a rule of template.
+        is_hit (bool): True if a rule regex matched.
+        elapsed (float): regex time in seconds.
+        """
+        stats = self.rules[rule]
+        stats.attempts += 1
+        stats.total += elapsed
+        if is_hit:
+            stats.hits += 1
+        else:
+            stats.miss += elapsed
+        if elapsed > stats.worst:
+            stats.worst = elapsed
+
+    def reset(self):
+        """clear all counters"""
+        self.lines_count = 0
+        for stats in self.rules.values():
+            stats.attempts = stats.hits = 0
+            stats.total = stats.miss = stats.worst = 0.0
+
+    def sorted_rules(self, sort='total'):
+        """return rule statistics in order of sort key
+
+        Parameters
+        ----------
+        sort (str): total, attempts, hits, worst, miss, or order which
+                keeps template order.  Default is total.
+
+        Returns
+        -------
+        list: a list of RuleStats in descending order of sort key.
+
+        Raises
+        ------
+        ValueError: raise exception if sort key is unknown.
+        """
+        if sort not in SORT_KEYS:
+            fmt = 'Unknown sort key {!r}, expected one of {}.'
+            raise ValueError(fmt.format(sort, ', '.join(SORT_KEYS)))
+        lst = list(self.rules.values())
+        if sort == 'order':
+            return lst
+        return sorted(lst, key=lambda stats: getattr(stats, sort),
+                      reverse=True)
+
+    def value_costs(self):
+        """return total regex time of rules which refer to each Value
+
+        A rule which refers to many Values adds its time to each of them.
+
+        Returns
+        -------
+        OrderedDict: a mapping of Value name to seconds in descending order.
+        """
+        costs = dict()
+        for stats in self.rules.values():
+            for name in stats.values:
+                costs[name] = costs.get(name, 0.0) + stats.total
+        items = sorted(costs.items(), key=lambda item: item[1], reverse=True)
+        return OrderedDict(items)
+
+    def to_dict(self):
+        """return profile as dictionary"""
+        return OrderedDict(
+            lines_count=self.lines_count,
+            rules=[stats.to_dict() for stats in self.rules.values()],
+            dead_rules=[stats.name for stats in self.dead_rules],
+            value_costs=self.value_costs()
+        )
+
+    def to_json(self, indent=2):
+        """return profile in JSON format"""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def dump(self, filename):
+        """save profile to a JSON file
+
+        Parameters
+        ----------
+        filename (str): a JSON file name.
+        """
+        with open(filename, 'w') as stream:
+            stream.write(self.to_json())
+
+    def report(self, sort='total', limit=None):
+        """return a per-rule breakdown in text format
+
+        Parameters
+        ----------
+        sort (str): a sort key.  Default is total.
+        limit (int): a number of rules to show.  Default is None which
+                shows all rules.
+
+        Returns
+        -------
+        str: a report.
+        """
+        fmt = '{:<16} {:>10} {:>10} {:>12} {:>12} {:>12}  {}'
+        lst = [fmt.format('Rule', 'Attempts', 'Hits', 'Total (ms)',
+                          'Miss (ms)', 'Worst (us)', 'Match'),
+               '-' * 96]
+        fmt = '{:<16} {:>10} {:>10} {:>12.3f} {:>12.3f} {:>12.1f}  {}'
+        for stats in self.sorted_rules(sort)[:limit]:
+            lst.append(fmt.format(stats.name, stats.attempts, stats.hits,
+                                  stats.total * 1000, stats.miss * 1000,
+                                  stats.worst * 1000000, stats.match))
+
+        lst.append('')
+        lst.append('Lines: {}'.format(self.lines_count))
+        dead_rules = self.dead_rules
+        if dead_rules:
+            names = ', '.join(stats.name for stats in dead_rules)
+            lst.append('Dead rules: {}'.format(names))
+        costs = self.value_costs()
+        if costs:
+            items = ('{} {:.3f} ms'.format(name, elapsed * 1000)
+                     for name, elapsed in costs.items())
+            lst.append('Value costs: {}'.format(', '.join(items)))
+        return '\n'.join(lst)
+
+
+class ProfilingTextFSM(TextFSM):
+    """TextFSM parser which records hit counters and time of every rule
+
+    Attributes
+    ----------
+    profile (RuleProfile): per-rule statistics.
+    """
+    def __init__(self, template):
+        super().__init__(template)
+        self.profile = RuleProfile(self)
+
+    def _CheckLine(self, line):
+        self.profile.lines_count += 1
+        super()._CheckLine(line)
+
+    def _CheckRule(self, rule, line):
+        start = perf_counter()
+        matched = rule.regex_obj.match(line)
+        self.profile.record(rule, matched is not None, perf_counter() - start)
+        return matched
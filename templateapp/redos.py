@@ -0,0 +1,599 @@
+"""Module containing a catastrophic-backtracking analyzer for template.
+
+A pattern is flagged statically if it has a quantifier nested in an
+unbounded quantifier, an alternation with overlapping branches in an
+unbounded quantifier, or unbounded quantifiers in sequence which can
+consume the same characters, i.e. \\S*[a-zA-Z0-9]\\S*.  A flagged pattern
+is confirmed by a time-budgeted fuzzer which pumps a worst-case input and
+measures a growth curve of matching time.
+"""
+
+import re
+import math
+from io import StringIO
+from time import perf_counter
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:     # pragma: no cover - Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from textfsm import TextFSM
+
+C = sre_constants
+REPEAT_OPS = tuple(
+    getattr(C, name)
+    for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+    if hasattr(C, name)
+)
+ATOMIC_GROUP = getattr(C, 'ATOMIC_GROUP', None)
+POSSESSIVE_REPEAT = getattr(C, 'POSSESSIVE_REPEAT', None)
+
+UNIVERSE = frozenset([chr(i) for i in range(32, 127)] + ['\t', '\x00', '\xe9'])
+CATEGORIES = {
+    C.CATEGORY_DIGIT: r'\d', C.CATEGORY_NOT_DIGIT: r'\D',
+    C.CATEGORY_SPACE: r'\s', C.CATEGORY_NOT_SPACE: r'\S',
+    C.CATEGORY_WORD: r'\w', C.CATEGORY_NOT_WORD: r'\W',
+}
+CATEGORY_CHARS = dict(
+    (code, frozenset(c for c in UNIVERSE if re.match(pattern, c)))
+    for code, pattern in CATEGORIES.items()
+)
+PREFERRED_CHARS = 'a1A _.:-/!\t\xe9'
+
+EXPONENTIAL = 'exponential'
+POLYNOMIAL = 'polynomial'
+LINEAR = 'linear'
+
+
+def is_unbounded(op, av):
+    """return True if a node is an unbounded quantifier"""
+    return op in REPEAT_OPS and av[1] == C.MAXREPEAT
+
+
+def get_chars(subpattern):
+    """return a set of characters which a parsed regex can consume
+
+    Parameters
+    ----------
+    subpattern (list): a parsed sequence of regular expression.
+
+    Returns
+    -------
+    frozenset: a set of characters in a sample universe.
+    """
+    chars = set()
+    for op, av in subpattern:
+        if op is C.LITERAL:
+            chars.add(chr(av))
+        elif op is C.NOT_LITERAL:
+            chars.update(UNIVERSE - {chr(av)})
+        elif op is C.ANY:
+            chars.update(UNIVERSE - {'\n'})
+        elif op is C.IN:
+            chars.update(get_set_chars(av))
+        elif op is C.SUBPATTERN:
+            chars.update(get_chars(av[-1]))
+        elif op in REPEAT_OPS:
+            chars.update(get_chars(av[2]))
+        elif op is C.BRANCH:
+            for item in av[1]:
+                chars.update(get_chars(item))
+        elif op is ATOMIC_GROUP:
+            chars.update(get_chars(av))
+    return frozenset(chars)
+
+
+def get_set_chars(items):
+    """return a set of characters of a parsed character set"""
+    chars = set()
+    is_negated = False
+    for op, av in items:
+        if op is C.NEGATE:
+            is_negated = True
+        elif op is C.LITERAL:
+            chars.add(chr(av))
+        elif op is C.RANGE:
+            chars.update(c for c in UNIVERSE if av[0] <= ord(c) <= av[1])
+        elif op is C.CATEGORY:
+            chars.update(CATEGORY_CHARS.get(av, UNIVERSE))
+    return frozenset(UNIVERSE - chars if is_negated else chars)
+
+
+def get_first_chars(subpattern):
+    """return a set of characters which a parsed regex can start with"""
+    chars = set()
+    for op, av in subpattern:
+        if op is C.AT:
+            continue
+        if op is C.SUBPATTERN:
+            chars.update(get_first_chars(av[-1]))
+        elif op is C.BRANCH:
+            for item in av[1]:
+                chars.update(get_first_chars(item))
+        elif op in REPEAT_OPS:
+            chars.update(get_first_chars(av[2]))
+        else:
+            chars.update(get_chars([(op, av)]))
+        if not is_nullable(op, av):
+            break
+    return frozenset(chars)
+
+
+def is_nullable(op, av):
+    """return True if a node can match an empty string"""
+    if op is C.AT:
+        return True
+    if op in REPEAT_OPS:
+        return av[0] == 0 or all(is_nullable(*node) for node in av[2])
+    if op is C.SUBPATTERN:
+        return all(is_nullable(*node) for node in av[-1])
+    if op is C.BRANCH:
+        return any(all(is_nullable(*node) for node in item) for item in av[1])
+    return False
+
+
+def flatten(subpattern):
+    """return a sequence where groups without quantifier are expanded"""
+    lst = []
+    for op, av in subpattern:
+        if op is C.SUBPATTERN:
+            lst.extend(flatten(av[-1]))
+        else:
+            lst.append((op, av))
+    return lst
+
+
+def contains_unbounded(subpattern):
+    """return an unbounded quantifier node of a parsed regex or None"""
+    for op, av in subpattern:
+        if is_unbounded(op, av) and op is not POSSESSIVE_REPEAT:
+            return op, av
+        if op is C.SUBPATTERN:
+            found = contains_unbounded(av[-1])
+        elif op in REPEAT_OPS:
+            found = contains_unbounded(av[2])
+        elif op is C.BRANCH:
+            items = map(contains_unbounded, av[1])
+            found = next((x for x in items if x), None)
+        else:
+            found = None
+        if found:
+            return found
+    return None
+
+
+def pick_char(chars):
+    """return a representative character of a set"""
+    for char in PREFERRED_CHARS:
+        if char in chars:
+            return char
+    return min(chars) if chars else 'a'
+
+
+class Issue:
+    """A static finding of a backtracking risk
+
+    Attributes
+    ----------
+    kind (str): nested-quantifier, overlapping-alternation, or
+            adjacent-quantifiers.
+    severity (str): exponential or polynomial.
+    pumps (list): a list of candidate strings to repeat in a worst-case input.
+    """
+    def __init__(self, kind, severity, pumps):
+        self.kind = kind
+        self.severity = severity
+        self.pumps = pumps
+
+    def __repr__(self):
+        fmt = '{}(kind={!r}, severity={!r})'
+        return fmt.format(type(self).__name__, self.kind, self.severity)
+
+
+def unwrap(op, av):
+    """return a single quantifier which is wrapped by an optional group
+
+    i.e. (\\d+)? is treated as \\d*.
+    """
+    while op in REPEAT_OPS and av[1] == 1:
+        flat = flatten(av[2])
+        if len(flat) != 1 or flat[0][0] not in REPEAT_OPS:
+            break
+        op, av = flat[0]
+    return op, av
+
+
+def is_backtracking(op, av):
+    """return True if a node is an unbounded and non-possessive quantifier"""
+    return is_unbounded(op, av) and op is not POSSESSIVE_REPEAT
+
+
+def check_sequence(subpattern, issues):
+    """collect issues of a parsed regex recursively
+
+    Parameters
+    ----------
+    subpattern (list): a parsed sequence of regular expression.
+    issues (list): a list to store Issue.
+    """
+    sequence = flatten(subpattern)
+    for index, (op, av) in enumerate(sequence):
+        if op in REPEAT_OPS:
+            body = av[2]
+            if is_backtracking(op, av):
+                check_repeat(body, issues)
+            if is_backtracking(*unwrap(op, av)):
+                check_adjacent(sequence, index, issues)
+            check_sequence(body, issues)
+        elif op is C.BRANCH:
+            for item in av[1]:
+                check_sequence(item, issues)
+        elif op is ATOMIC_GROUP:
+            check_sequence(av, issues)
+
+
+def check_repeat(body, issues):
+    """collect issues of a body of an unbounded quantifier"""
+    inner = contains_unbounded(body)
+    if inner:
+        # a mandatory delimiter which inner quantifier cannot consume
+        # splits iterations unambiguously, i.e. ( [a-z]+)*
+        inner_chars = get_chars(inner[1][2])
+        is_delimited = any(
+            not is_nullable(op, av) and not get_chars([(op, av)]) & inner_chars
+            for op, av in flatten(body)
+        )
+        if not is_delimited:
+            pumps = [pick_char(inner_chars)]
+            issues.append(Issue('nested-quantifier', EXPONENTIAL, pumps))
+
+    flat = flatten(body)
+    if len(flat) == 1 and flat[0][0] is C.BRANCH:
+        branches = flat[0][1][1]
+        seen = set()
+        for item in branches:
+            first = get_first_chars(item)
+            overlap = seen & first
+            if overlap:
+                pumps = [pick_char(overlap)]
+                issues.append(Issue('overlapping-alternation', EXPONENTIAL,
+                                    pumps))
+                break
+            seen |= first
+
+
+def check_adjacent(sequence, index, issues):
+    """collect an issue if a later quantifier competes with quantifier at index
+
+    Two quantifiers compete if characters consumed by the first one can
+    also start the second one, and every mandatory node between them
+    accepts those characters as well.
+    """
+    chars = get_chars(unwrap(*sequence[index])[1][2])
+    for op, av in sequence[index + 1:]:
+        unwrapped = unwrap(op, av)
+        if is_backtracking(*unwrapped):
+            overlap = chars & get_first_chars([unwrapped])
+            if overlap:
+                pumps = [pick_char(overlap)]
+                issues.append(Issue('adjacent-quantifiers', POLYNOMIAL, pumps))
+                return
+        if is_nullable(op, av):
+            continue
+        chars = chars & get_chars([(op, av)])
+        if not chars:
+            return
+
+
+def analyze_pattern(pattern):
+    """return static backtracking issues of a regex pattern
+
+    Parameters
+    ----------
+    pattern (str): a regular expression pattern.
+
+    Returns
+    -------
+    list: a list of Issue.  Empty list if pattern looks linear.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+    issues = []
+    check_sequence(parsed, issues)
+    lst = []
+    for issue in issues:
+        key = (issue.kind, issue.severity, issue.pumps)
+        if key not in [(x.kind, x.severity, x.pumps) for x in lst]:
+            lst.append(issue)
+    return lst
+
+
+def create_sample(subpattern):
+    """return a short string which matches a parsed regex"""
+    lst = []
+    for op, av in subpattern:
+        if op is C.LITERAL:
+            lst.append(chr(av))
+        elif op in (C.NOT_LITERAL, C.ANY, C.IN):
+            lst.append(pick_char(get_chars([(op, av)])))
+        elif op is C.SUBPATTERN:
+            lst.append(create_sample(av[-1]))
+        elif op in REPEAT_OPS:
+            lst.append(create_sample(av[2]) * av[0])
+        elif op is C.BRANCH:
+            lst.append(create_sample(av[1][0]))
+        elif op is ATOMIC_GROUP:
+            lst.append(create_sample(av))
+    return ''.join(lst)
+
+
+def get_group_prefix(pattern, name):
+    """return a sample text which leads a rule regex up to a named group
+
+    Parameters
+    ----------
+    pattern (str): a rule regex.
+    name (str): a group name.
+
+    Returns
+    -------
+    str: a sample prefix.
+    """
+    parsed = sre_parse.parse(pattern)
+    group_index = parsed.state.groupdict.get(name)
+    lst = []
+    for op, av in parsed:
+        if op is C.SUBPATTERN and av[0] == group_index:
+            break
+        lst.append(create_sample([(op, av)]))
+    return ''.join(lst)
+
+
+class GrowthCurve:
+    """Measured matching time of a pumped input
+
+    Attributes
+    ----------
+    pump (str): a repeated string.
+    points (list): a list of (size, seconds).
+    complexity (str): linear, polynomial, or exponential.
+    degree (float): a log-log slope of last points.
+    is_stalled (bool): True if a match exceeded a time budget.
+    """
+    def __init__(self, pump):
+        self.pump = pump
+        self.points = []
+        self.complexity = LINEAR
+        self.degree = 1.0
+        self.is_stalled = False
+
+    def __repr__(self):
+        fmt = '{}(pump={!r}, complexity={!r}, degree={:.2f})'
+        return fmt.format(type(self).__name__, self.pump, self.complexity,
+                          self.degree)
+
+    def classify(self, severity):
+        """classify complexity from measured points"""
+        points = [(n, t) for n, t in self.points if t > 5e-5]
+        if len(points) < 2:
+            if self.is_stalled:
+                self.complexity = severity
+            return
+
+        (n1, t1), (n2, t2) = points[0], points[-1]
+        self.degree = math.log(t2 / t1) / math.log(n2 / n1)
+        ratios = [b[1] / a[1] for a, b in zip(points[-3:], points[-2:])]
+        if severity == EXPONENTIAL and len(ratios) == 2 and min(ratios) >= 1.5:
+            self.complexity = EXPONENTIAL
+        elif self.is_stalled or (self.degree >= 1.5 and n2 >= 4 * n1):
+            self.complexity = POLYNOMIAL
+        else:
+            self.complexity = LINEAR
+
+
+def measure(regex, make_text, size):
+    """return wall time of one match of a generated text"""
+    text = make_text(size)
+    start = perf_counter()
+    regex.match(text)
+    return perf_counter() - start
+
+
+def fuzz(regex, prefix, pump, severity, budget=0.2, suffix='\x00'):
+    """measure a growth curve of regex against pumped inputs
+
+    Inputs are prefix + pump * n + suffix.  A size grows geometrically for a
+    polynomial risk and arithmetically for an exponential risk, and it stops
+    once a match takes longer than a fraction of budget or a total time
+    exceeds budget.
+
+    Parameters
+    ----------
+    regex (re.Pattern): a compiled regex.
+    prefix (str): a text leading a pumped part.
+    pump (str): a repeated string.
+    severity (str): exponential or polynomial.
+    budget (float): a time budget in seconds.  Default is 0.2.
+    suffix (str): a text to make a match fail.  Default is \\x00.
+
+    Returns
+    -------
+    GrowthCurve: a measured growth curve.
+    """
+    curve = GrowthCurve(pump)
+
+    def make_text(size):
+        return prefix + pump * size + suffix
+
+    started = perf_counter()
+    size = 4 if severity == EXPONENTIAL else 16
+    factor = 4 if severity == EXPONENTIAL else 8
+    while size <= 1 << 15:
+        elapsed = measure(regex, make_text, size)
+        curve.points.append((size, elapsed))
+        if elapsed * factor > budget:
+            curve.is_stalled = elapsed > budget / 2
+            break
+        if perf_counter() - started + elapsed * factor > budget:
+            break
+        size = size + 2 if severity == EXPONENTIAL else size * 2
+
+    curve.classify(severity)
+    return curve
+
+
+class Finding:
+    """Backtracking risk of a Value or a rule of template
+
+    Attributes
+    ----------
+    name (str): a Value name or a rule reference, i.e. Start[1].
+    pattern (str): a regex pattern.
+    issues (list): a list of static Issue.
+    curve (GrowthCurve): a worst measured growth curve.  None if not fuzzed.
+
+    Properties
+    ----------
+    severity (str): a worst static severity.
+    is_confirmed (bool): True if fuzzer measured a super-linear growth.
+    """
+    def __init__(self, name, pattern, issues, curve=None):
+        self.name = name
+        self.pattern = pattern
+        self.issues = issues
+        self.curve = curve
+
+    def __repr__(self):
+        fmt = '{}(name={!r}, severity={!r}, is_confirmed={})'
+        return fmt.format(type(self).__name__, self.name, self.severity,
+                          self.is_confirmed)
+
+    @property
+    def severity(self):
+        """return a worst static severity"""
+        kinds = [issue.severity for issue in self.issues]
+        return EXPONENTIAL if EXPONENTIAL in kinds else POLYNOMIAL
+
+    @property
+    def is_confirmed(self):
+        """return True if fuzzer measured a super-linear growth"""
+        return bool(self.curve) and self.curve.complexity != LINEAR
+
+    def to_dict(self):
+        """return finding as dictionary"""
+        result = dict(
+            name=self.name, pattern=self.pattern, severity=self.severity,
+            issues=[issue.kind for issue in self.issues],
+            is_confirmed=self.is_confirmed
+        )
+        if self.curve:
+            result.update(pump=self.curve.pump,
+                          complexity=self.curve.complexity,
+                          degree=round(self.curve.degree, 2),
+                          points=self.curve.points)
+        return result
+
+    def describe(self):
+        """return a one-line description of finding"""
+        kinds = ', '.join(sorted(set(issue.kind for issue in self.issues)))
+        txt = '{} - {} risk ({})'.format(self.name, self.severity, kinds)
+        if self.curve:
+            fmt = '{}; measured {} growth, slope {:.2f}, pump {!r}'
+            curve = self.curve
+            txt = fmt.format(txt, curve.complexity, curve.degree, curve.pump)
+            if curve.points:
+                size, elapsed = curve.points[-1]
+                txt += ', {:.1f} ms at n={}'.format(elapsed * 1000, size)
+        return txt
+
+
+def confirm(finding, regex, prefix, budget):
+    """fuzz every pump of finding and keep the worst curve"""
+    worst = None
+    pumps = []
+    for issue in finding.issues:
+        pumps.extend((pump, issue.severity) for pump in issue.pumps
+                     if (pump, issue.severity) not in pumps)
+
+    each_budget = budget / max(len(pumps), 1)
+    for pump, severity in pumps:
+        curve = fuzz(regex, prefix, pump, severity, budget=each_budget)
+        last = curve.points[-1][1] if curve.points else 0
+        if worst is None or (curve.complexity != LINEAR, last) > (
+                worst.complexity != LINEAR,
+                worst.points[-1][1] if worst.points else 0):
+            worst = curve
+    finding.curve = worst
+
+
+def compile_failing(pattern):
+    """return a regex of pattern which is forced to fail after it matches
+
+    A forced failure makes a fuzzer measure a whole backtracking search
+    even if pattern can consume a fuzzer suffix.  A leading inline flag,
+    i.e. ^(?i) of a generated rule, is kept at start of regex.
+    """
+    flags = ''
+    m = re.match(r'(\^?)(\(\?[aiLmsux]+\))', pattern)
+    if m:
+        flags = m.group(2)
+        pattern = m.group(1) + pattern[m.end():]
+    return re.compile(r'{}(?:{})(?!)'.format(flags, pattern))
+
+
+def analyze_template(template, fuzzing=False, budget=0.2):
+    """return backtracking risks of Values and rules of template
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+    fuzzing (bool): confirm each finding by a fuzzer.  Default is False.
+    budget (float): a time budget in seconds per finding.  Default is 0.2.
+
+    Returns
+    -------
+    list: a list of Finding.
+    """
+    parser = TextFSM(StringIO(template))
+    findings = []
+    flagged = dict()
+    for value in parser.values:
+        issues = analyze_pattern(value.regex)
+        if issues:
+            finding = Finding(value.name, value.regex, issues)
+            flagged[value.name] = finding
+            findings.append(finding)
+            if fuzzing:
+                confirm(finding, compile_failing(value.regex), '', budget)
+
+    for state_name, rules in parser.states.items():
+        for index, rule in enumerate(rules):
+            names = [name for name in re.compile(rule.regex).groupindex
+                     if name in flagged]
+            issues = analyze_pattern(rule.regex)
+            if not issues and not names:
+                continue
+            for name in names:
+                issues.extend(item for item in flagged[name].issues
+                              if item not in issues)
+            ref = '{}[{}] {}'.format(state_name, index, rule.match.strip())
+            finding = Finding(ref, rule.regex, issues)
+            findings.append(finding)
+            if fuzzing:
+                prefix = ''
+                if names:
+                    prefix = get_group_prefix(rule.regex, names[0])
+                confirm(finding, compile_failing(rule.regex), prefix, budget)
+    return findings
+
+
+def report(findings):
+    """return findings in text format"""
+    if not findings:
+        return 'No catastrophic-backtracking risk is found.'
+    return '\n'.join(finding.describe() for finding in findings)
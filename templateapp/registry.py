@@ -0,0 +1,187 @@
+"""Module containing a registry of named, compiled templates.
+
+A registry keeps every template compiled so that a long-running process,
+i.e. a parse service, never compiles a template per request.  Templates
+are loaded from template files or from the user template store which the
+GUI application maintains.
+"""
+
+import os
+import threading
+
+from templateapp.config import Data
+from templateapp.runner import expand_paths
+from templateapp.parser import TemplateParser
+
+
+def load_user_templates(filename=None):
+    """return templates of user template store without GUI
+
+    Parameters
+    ----------
+    filename (str): a user template file.  Default is None which uses
+            /home_dir/.geekstrident/templateapp/user_templates.yaml.
+
+    Returns
+    -------
+    dict: a mapping of template name to template.  Empty if file is not found.
+
+    Raises
+    ------
+    ValueError: raise exception if file is not a YAML mapping.
+    """
+    import yaml
+    filename = filename or Data.user_template_filename
+    if not os.path.isfile(filename):
+        return dict()
+
+    with open(filename) as stream:
+        content = yaml.safe_load(stream)
+    if content is None:
+        return dict()
+    if not isinstance(content, dict):
+        raise ValueError('{!r} IS NOT correct format.'.format(filename))
+    return dict((str(name), str(template))
+                for name, template in content.items())
+
+
+def get_template_name(path):
+    """return a template name of a template file, i.e. show_version"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+class TemplateRegistry:
+    """Thread-safe registry of named, compiled templates
+
+    Attributes
+    ----------
+    engine (str): textfsm or alternation.  Default is textfsm.
+    errors (dict): a mapping of template name to a compile error.
+
+    Properties
+    ----------
+    names (list): a sorted list of template names.
+
+    Methods
+    -------
+    add(name, template) -> TemplateParser
+    get(name) -> TemplateParser
+    load_files(paths) -> list
+    load_user_templates(filename=None) -> list
+    """
+    def __init__(self, engine='textfsm'):
+        self.engine = engine
+        self.errors = dict()
+        self._parsers = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._parsers)
+
+    def __contains__(self, name):
+        return name in self._parsers
+
+    def __repr__(self):
+        fmt = '{}(templates_count={}, errors_count={})'
+        return fmt.format(type(self).__name__, len(self), len(self.errors))
+
+    @property
+    def names(self):
+        """return a sorted list of template names"""
+        return sorted(self._parsers)
+
+    def add(self, name, template):
+        """compile template and register it under name
+
+        Parameters
+        ----------
+        name (str): a template name.
+        template (str): a TextFSM template.
+
+        Returns
+        -------
+        TemplateParser: a compiled parser.
+
+        Raises
+        ------
+        Exception: raise exception of TextFSM if template is invalid.
+        """
+        parser = TemplateParser(template, engine=self.engine)
+        with self._lock:
+            self._parsers[name] = parser
+            self.errors.pop(name, None)
+        return parser
+
+    def get(self, name):
+        """return a compiled parser of template name
+
+        Parameters
+        ----------
+        name (str): a template name.
+
+        Returns
+        -------
+        TemplateParser: a compiled parser.
+
+        Raises
+        ------
+        KeyError: raise exception if template name is not registered.
+        """
+        try:
+            return self._parsers[name]
+        except KeyError:
+            raise KeyError('Template {!r} is not registered.'.format(name))
+
+    def load(self, templates):
+        """register a mapping of template name to template
+
+        A template which cannot be compiled is kept in errors.
+
+        Returns
+        -------
+        list: a list of registered template names.
+        """
+        names = []
+        for name, template in templates.items():
+            try:
+                self.add(name, template)
+                names.append(name)
+            except Exception as ex:
+                self.errors[name] = '{}: {}'.format(type(ex).__name__, ex)
+        return names
+
+    def load_files(self, paths):
+        """register template files under their file names without extension
+
+        Parameters
+        ----------
+        paths (str, list): a file path, a directory, a glob pattern, or
+                a list of them.
+
+        Returns
+        -------
+        list: a list of registered template names.
+        """
+        templates = dict()
+        for path in expand_paths(paths):
+            try:
+                with open(path) as stream:
+                    templates[get_template_name(path)] = stream.read()
+            except Exception as ex:
+                name = get_template_name(path)
+                self.errors[name] = '{}: {}'.format(type(ex).__name__, ex)
+        return self.load(templates)
+
+    def load_user_templates(self, filename=None):
+        """register templates of user template store
+
+        Parameters
+        ----------
+        filename (str): a user template file.  Default is None which uses
+                a user template file of GUI application.
+
+        Returns
+        -------
+        list: a list of registered template names.
+        """
+        return self.load(load_user_templates(filename))
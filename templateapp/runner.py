@@ -0,0 +1,232 @@
+"""Module containing the logic for parsing many inputs via a stored template.
+
+A template is compiled once, per process if a process pool is used, and
+every input is parsed into one streaming sink.  Workers of a pool send rows
+back in chunks, so that memory is bounded by chunk size instead of by size
+of the largest file.  It does not depend on
+template building, so that running a stored template is a fast path.
+"""
+
+import os
+import glob
+from pathlib import Path
+from queue import Empty
+from time import perf_counter
+from multiprocessing import Manager
+from concurrent.futures import ProcessPoolExecutor
+
+from templateapp.parser import get_parser
+from templateapp.parser import iter_rows
+
+
+def expand_paths(paths):
+    """return a sorted list of files from file paths, directories, or globs
+
+    Parameters
+    ----------
+    paths (str, list): a file path, a directory, a glob pattern, or a list
+            of them.
+
+    Returns
+    -------
+    list: a list of file paths.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    lst = []
+    for path in paths:
+        path = str(path)
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                lst.extend(os.path.join(dirpath, name) for name in filenames)
+        elif glob.has_magic(path):
+            lst.extend(item for item in glob.glob(path, recursive=True)
+                       if os.path.isfile(item))
+        else:
+            lst.append(path)
+    return sorted(set(lst))
+
+
+class ParseSummary:
+    """Throughput summary of parsing many inputs
+
+    Attributes
+    ----------
+    paths (list): a list of parsed file paths.
+    rows_count (int): total number of written records.
+    bytes_count (int): total size of inputs in bytes.
+    errors (dict): a mapping of file path to an error message.
+    elapsed (float): total wall time in seconds.
+
+    Properties
+    ----------
+    is_success (bool): True if every input is parsed without error.
+
+    Methods
+    -------
+    report() -> str
+    """
+    def __init__(self, paths, rows_count=0, bytes_count=0, errors=None,
+                 elapsed=0.0):
+        self.paths = paths
+        self.rows_count = rows_count
+        self.bytes_count = bytes_count
+        self.errors = errors or dict()
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        fmt = '{}(files_count={}, rows_count={}, errors_count={})'
+        return fmt.format(type(self).__name__, len(self.paths),
+                          self.rows_count, len(self.errors))
+
+    @property
+    def is_success(self):
+        """return True if every input is parsed without error"""
+        return not self.errors
+
+    def report(self):
+        """return a summary in text format"""
+        lst = ['FAILED {} - {}'.format(path, error)
+               for path, error in self.errors.items()]
+        elapsed = self.elapsed or float('inf')
+        fmt = ('Files: {}, failed: {}, rows: {}, size: {:.2f} MB, '
+               'elapsed: {:.3f}s, throughput: {:.0f} rows/s, {:.2f} MB/s')
+        lst.append(fmt.format(len(self.paths), len(self.errors),
+                              self.rows_count, self.bytes_count / 1e6,
+                              self.elapsed, self.rows_count / elapsed,
+                              self.bytes_count / 1e6 / elapsed))
+        return '\n'.join(lst)
+
+
+CHUNK_SIZE = 1000
+
+
+def parse_file(path, template, queue, engine='textfsm', prefilter=False,
+               chunk_size=None):
+    """parse a file via a compiled template and send rows in chunks
+
+    A template is compiled once per worker process via a process-wide
+    parser.  Every chunk is put into queue as a tuple of path, rows, and
+    error.  Error is None if more chunks follow, otherwise it is an error
+    message which is empty if a file is parsed successfully.  Rows which are
+    parsed before an error are kept.
+
+    Parameters
+    ----------
+    path (str): a file path.
+    template (str): a TextFSM template.
+    queue (multiprocessing.managers.BaseProxy): a managed queue of parsed
+            chunks.
+    engine (str): textfsm or alternation.  Default is textfsm.
+    prefilter (bool): skip lines which no rule of current state can match.
+            Default is False.
+    chunk_size (int): a maximum number of rows per chunk.  Default is None
+            which uses CHUNK_SIZE.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    rows, error = [], ''
+    try:
+        parser = get_parser(template, engine=engine, prefilter=prefilter)
+        for row in iter_rows(parser.parser, Path(path)):
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                queue.put((path, rows, None))
+                rows = []
+    except Exception as ex:
+        error = '{}: {}'.format(type(ex).__name__, ex)
+    queue.put((path, rows, error))
+
+
+def get_size(path):
+    """return a file size in bytes or 0 if it is unknown"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def parse_files(parser, paths, sink, workers=None, source_field=''):
+    """parse many files via a compiled template into a streaming sink
+
+    Parameters
+    ----------
+    parser (TemplateParser): a compiled parser of template.
+    paths (str, list): a file path, a directory, a glob pattern, or a list
+            of them.
+    sink (RecordSink): a sink of parsed records.
+    workers (int): a number of worker processes.  Default is None which
+            parses in current process and writes records as soon as they
+            are emitted, in order of file path.  A pool writes records in
+            chunks of 1000 rows as soon as workers send them, so records
+            of a file keep their order but files may interleave.
+    source_field (str): add a file path of every record under this name.
+            Default is empty.
+
+    Returns
+    -------
+    ParseSummary: a throughput summary.
+    """
+    start = perf_counter()
+    paths = expand_paths(paths)
+    header = parser.header
+    errors = dict()
+    count = sink.count
+
+    def write(path, rows):
+        for row in rows:
+            record = dict(zip(header, row))
+            if source_field:
+                record[source_field] = path
+            sink.write(record)
+
+    def guard(path, rows):
+        # only an error of parsing is kept per file, an error of sink stops
+        try:
+            yield from rows
+        except Exception as ex:
+            errors[path] = '{}: {}'.format(type(ex).__name__, ex)
+
+    if workers is None or workers <= 1:
+        for path in paths:
+            write(path, guard(path, iter_rows(parser.parser, Path(path))))
+    else:
+        # a managed queue is sent with every task instead of a pool
+        # initializer which requires Python 3.7+
+        with Manager() as manager, \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+            queue = manager.Queue(maxsize=workers * 4)
+            futures = [executor.submit(parse_file, path, parser.template,
+                                       queue, engine=parser.engine,
+                                       prefilter=parser.prefilter)
+                       for path in paths]
+            pending = len(paths)
+            try:
+                while pending:
+                    try:
+                        path, rows, error = queue.get(timeout=0.1)
+                    except Empty:
+                        for future in futures:
+                            if future.done() and future.exception():
+                                raise future.exception()
+                        continue
+                    write(path, rows)
+                    if error:
+                        errors[path] = error
+                    if error is not None:
+                        pending -= 1
+            finally:
+                # an error of sink stops, workers which are blocked on a
+                # full queue are drained so that pool can shut down
+                if pending:
+                    for future in futures:
+                        future.cancel()
+                    while not all(future.done() for future in futures):
+                        try:
+                            queue.get(timeout=0.1)
+                        except Empty:
+                            pass
+
+    return ParseSummary(paths, rows_count=sink.count - count,
+                        bytes_count=sum(get_size(path) for path in paths),
+                        errors=errors, elapsed=perf_counter() - start)
@@ -0,0 +1,678 @@
+"""Module containing a local parse service which keeps templates warm.
+
+A CLI call pays an interpreter startup, imports, and a template compile
+before a single line is parsed.  A parse service is started once, keeps a
+registry of compiled templates, and answers parse and verify requests of
+HTTP over a Unix socket or a loopback TCP port.  Requests are handled
+concurrently by a pool of long-lived threads, so that a per-thread copy of
+a compiled parser is made once per thread instead of once per request.
+A connection serves one request and is closed, a connection is timed out,
+and a request body is capped, so that idle or large clients cannot hold
+every thread.  Connections which wait for a thread are capped too, and a
+connection beyond that cap is answered with 503.  A request body can be
+sent in chunked encoding.
+
+Endpoints
+---------
+GET  /health                      -> {"status": "ok", "templates_count": N}
+GET  /templates                   -> {"templates": [...], "errors": {...}}
+PUT  /templates?name=NAME         body is a template
+POST /parse?name=NAME&format=FMT  body is a text, FMT is jsonl, csv, tsv,
+                                  or json
+POST /verify?name=NAME            body is {"text": ...,
+                                           "expected_rows_count": ...,
+                                           "expected_result": [...]}
+POST /verify?name=NAME&expected_rows_count=N   body is a text
+"""
+
+import os
+import io
+import json
+import time
+import socket
+import ipaddress
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from urllib.parse import parse_qs
+from urllib.parse import urlencode
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 30
+MAX_BODY_SIZE = 64 * 1024 * 1024
+MAX_PENDING = 32
+REJECT_TIMEOUT = 1.0
+
+CONTENT_TYPES = dict(
+    json='application/json',
+    jsonl='application/x-ndjson',
+    csv='text/csv',
+    tsv='text/tab-separated-values',
+)
+
+
+class ServiceError(Exception):
+    """Error of a request which is answered with an HTTP status"""
+    def __init__(self, message='', status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ParseRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler of parse, verify, and template requests
+
+    A registry is an attribute of server.
+    """
+    protocol_version = 'HTTP/1.1'
+    wbufsize = io.DEFAULT_BUFFER_SIZE
+
+    def setup(self):
+        self.timeout = self.server.request_timeout
+        super().setup()
+
+    def address_string(self):
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @property
+    def registry(self):
+        return self.server.registry
+
+    def get_query(self):
+        """return path and a mapping of query parameters"""
+        parts = urlsplit(self.path)
+        query = dict((key, values[-1])
+                     for key, values in parse_qs(parts.query).items())
+        return parts.path.rstrip('/') or '/', query
+
+    def read_body(self):
+        """return request body as text
+
+        Raises
+        ------
+        ServiceError: raise exception if body is malformed or larger than
+                max_body_size of server.
+        """
+        limit = self.server.max_body_size
+        error = 'Request body exceeds {} bytes.'.format(limit)
+        try:
+            encoding = self.headers.get('Transfer-Encoding', '').lower()
+            if encoding == 'chunked':
+                chunks, size = [], 0
+                while True:
+                    line = self.rfile.readline(1024)
+                    length = int(line.split(b';')[0].strip(), 16)
+                    if not length:
+                        while self.rfile.readline(1024).strip():
+                            pass
+                        break
+                    size += length
+                    if size > limit:
+                        raise ServiceError(error, status=413)
+                    chunks.append(self.rfile.read(length))
+                    self.rfile.readline(1024)
+                data = b''.join(chunks)
+            else:
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > limit:
+                    raise ServiceError(error, status=413)
+                data = self.rfile.read(length) if length > 0 else b''
+            return data.decode('utf-8')
+        except ValueError as ex:
+            raise ServiceError('Malformed request body - {}'.format(ex))
+
+    def get_parser(self, query):
+        """return a compiled parser of name of query"""
+        name = query.get('name', '')
+        if not name:
+            raise ServiceError('name parameter is required.')
+        try:
+            return self.registry.get(name)
+        except KeyError as ex:
+            raise ServiceError(ex.args[0], status=404)
+
+    def send_headers(self, status, content_type, length=None):
+        """send status and headers of a response
+
+        A response is chunked if length is None.
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if length is None:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(length))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+
+    def send_json(self, data, status=200):
+        """send data in JSON format"""
+        content = json.dumps(data).encode('utf-8')
+        self.send_headers(status, CONTENT_TYPES['json'], length=len(content))
+        self.wfile.write(content)
+
+    def handle_request(self, method):
+        self.is_streaming = False
+        self.chunked_writer = None
+        # one request per connection so that an idle client does not
+        # hold a request thread between requests
+        self.close_connection = True
+        try:
+            path, query = self.get_query()
+            # a body is always consumed so that an early error response
+            # does not reset a client which is still sending
+            body = self.read_body()
+            routes = {
+                ('GET', '/health'): self.do_health,
+                ('GET', '/templates'): self.do_list,
+                ('PUT', '/templates'): self.do_register,
+                ('POST', '/parse'): self.do_parse,
+                ('POST', '/verify'): self.do_verify,
+            }
+            handler = routes.get((method, path))
+            if handler is None:
+                fmt = 'Unknown endpoint {} {}.'
+                raise ServiceError(fmt.format(method, path), status=404)
+            handler(query, body)
+        except ServiceError as ex:
+            self.send_json(dict(error=str(ex)), status=ex.status)
+        except Exception as ex:
+            error = '{}: {}'.format(type(ex).__name__, ex)
+            if self.is_streaming:
+                # a status is already sent, so that a truncated chunked
+                # response is the only way to signal an error.  A last
+                # chunk is never written and a connection is shut down.
+                self.abort_streaming()
+                self.log_error('%s', error)
+            else:
+                self.send_json(dict(error=error), status=500)
+
+    def abort_streaming(self):
+        """drop a chunked response without its last chunk"""
+        self.close_connection = True
+        self.chunked_writer.abort()
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_PUT(self):
+        self.handle_request('PUT')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_health(self, query, body):
+        self.send_json(dict(status='ok', templates_count=len(self.registry)))
+
+    def do_list(self, query, body):
+        self.send_json(dict(templates=self.registry.names,
+                            errors=self.registry.errors))
+
+    def do_register(self, query, body):
+        name = query.get('name', '')
+        if not name:
+            raise ServiceError('name parameter is required.')
+        try:
+            self.registry.add(name, body)
+        except Exception as ex:
+            raise ServiceError('{}: {}'.format(type(ex).__name__, ex))
+        self.send_json(dict(name=name), status=201)
+
+    def do_parse(self, query, body):
+        """stream parsed records of request body in chunked encoding"""
+        parser = self.get_parser(query)
+        fmt = query.get('format', 'jsonl').lower()
+        if fmt not in CONTENT_TYPES:
+            fmt_ = 'Unknown format {!r}, expected one of {}.'
+            raise ServiceError(fmt_.format(fmt, ', '.join(CONTENT_TYPES)))
+
+        if fmt == 'json':
+            self.send_json(parser.parse(body))
+            return
+
+        from templateapp.sink import get_sink
+        records = parser.iter_records(body)
+        # parse the first record before headers so that an error of
+        # parsing is still answered with an error status
+        first = next(records, None)
+
+        self.send_headers(200, CONTENT_TYPES[fmt])
+        self.is_streaming = True
+        stream = self.chunked_writer = ChunkedWriter(self.wfile)
+        sink = get_sink(fmt, stream, parser.header)
+        if first is not None:
+            sink.write(first)
+        sink.write_many(records)
+        stream.close()
+
+    def do_verify(self, query, body):
+        from templateapp.compare import compare_rows
+        parser = self.get_parser(query)
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith(CONTENT_TYPES['json']):
+            try:
+                data = json.loads(body or '{}')
+            except ValueError as ex:
+                raise ServiceError('Invalid JSON body - {}'.format(ex))
+            if not isinstance(data, dict):
+                raise ServiceError('JSON body must be an object.')
+        else:
+            data = dict(text=body)
+            count = query.get('expected_rows_count')
+            if count:
+                try:
+                    data['expected_rows_count'] = int(count)
+                except ValueError:
+                    error = 'expected_rows_count must be an integer.'
+                    raise ServiceError(error)
+
+        text = data.get('text', '')
+        expected_rows_count = data.get('expected_rows_count')
+        expected_result = data.get('expected_result')
+        rows = parser.parse(text) if text else []
+
+        is_verified = bool(rows)
+        lst = [] if rows else ['There is no record after parsed.']
+        if rows and expected_rows_count is not None:
+            if len(rows) != expected_rows_count:
+                is_verified = False
+                fmt = 'Parsed-row-count is {} while expected-row-count is {}.'
+                lst.append(fmt.format(len(rows), expected_rows_count))
+        if rows and expected_result is not None:
+            comparison = compare_rows(rows, expected_result)
+            if not comparison.is_matched:
+                is_verified = False
+                lst.append(comparison.report())
+
+        self.send_json(dict(is_verified=is_verified, rows_count=len(rows),
+                            message='\n'.join(lst)))
+
+
+class ChunkedWriter(io.TextIOBase):
+    """Text stream which writes HTTP chunks to a binary stream
+
+    An aborted writer is closed without its last chunk, so that a client
+    sees a truncated response instead of a complete one.
+    """
+    def __init__(self, stream, size=io.DEFAULT_BUFFER_SIZE):
+        self.stream = stream
+        self.size = size
+        self.is_aborted = False
+        self._buffer = []
+        self._length = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer.append(text)
+        self._length += len(text)
+        if self._length >= self.size:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            data = ''.join(self._buffer).encode('utf-8')
+            self._buffer, self._length = [], 0
+            self.stream.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.stream.flush()
+
+    def abort(self):
+        """discard buffered data and close without a last chunk"""
+        self.is_aborted = True
+        self._buffer, self._length = [], 0
+        super().close()
+
+    def close(self):
+        """flush remaining data and write a last chunk"""
+        if not self.closed and not self.is_aborted:
+            self.flush()
+            self.stream.write(b'0\r\n\r\n')
+            self.stream.flush()
+            super().close()
+
+
+class ParseServer(HTTPServer):
+    """HTTP server of a template registry on a TCP port
+
+    Attributes
+    ----------
+    registry (TemplateRegistry): a registry of compiled templates.
+    workers (int): a number of request threads.  Default is 8.
+    verbose (bool): log every request to stderr.  Default is False.
+    request_timeout (float): a socket timeout of a connection in seconds.
+            Default is 30.
+    max_body_size (int): a maximum request body in bytes.  Default is 64 MB.
+    max_pending (int): a maximum number of connections which wait for
+            a request thread.  Default is 32.
+    """
+    def __init__(self, address, registry, workers=8, verbose=False,
+                 request_timeout=DEFAULT_TIMEOUT, max_body_size=MAX_BODY_SIZE,
+                 max_pending=MAX_PENDING):
+        self.registry = registry
+        self.workers = max(int(workers), 1)
+        self.verbose = verbose
+        self.request_timeout = request_timeout
+        self.max_body_size = max_body_size
+        self.max_pending = max(int(max_pending), 0)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        # a work queue of executor is unbounded, so that every accepted
+        # connection takes a slot until it is shut down
+        size = self.workers + self.max_pending
+        self.slots = threading.BoundedSemaphore(size)
+        super().__init__(address, ParseRequestHandler)
+
+    @property
+    def url(self):
+        """return an address of server"""
+        host, port = self.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            self.reject_request(request)
+            return
+        try:
+            self.executor.submit(self.process_request_thread, request,
+                                 client_address)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def reject_request(self, request):
+        """answer 503 to a connection without a request thread
+
+        A sent request is drained for at most REJECT_TIMEOUT seconds so that
+        closing a connection does not reset a response before it is read.
+        """
+        content = json.dumps(dict(error='Service is busy.')).encode('utf-8')
+        head = ('HTTP/1.1 503 Service Unavailable\r\n'
+                'Content-Type: {}\r\nContent-Length: {}\r\n'
+                'Connection: close\r\n\r\n')
+        head = head.format(CONTENT_TYPES['json'], len(content))
+        deadline = time.monotonic() + REJECT_TIMEOUT
+        try:
+            request.settimeout(REJECT_TIMEOUT)
+            request.sendall(head.encode('ascii') + content)
+            request.shutdown(socket.SHUT_WR)
+            while time.monotonic() < deadline and request.recv(65536):
+                pass
+        except OSError:
+            pass
+        self.close_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+class UnixParseServer(ParseServer):
+    """HTTP server of a template registry on a Unix socket
+
+    A stale socket file is removed before binding and a socket file is
+    only accessible by its owner.
+    """
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        self.socket.bind(self.server_address)
+        os.chmod(self.server_address, 0o600)
+        self.server_name, self.server_port = 'localhost', 0
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+    @property
+    def url(self):
+        """return an address of server"""
+        return 'unix://{}'.format(self.server_address)
+
+
+def is_loopback(host):
+    """return True if host is localhost or a loopback address"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def create_server(registry, socket_path='', host=DEFAULT_HOST,
+                  port=DEFAULT_PORT, workers=8, verbose=False,
+                  request_timeout=DEFAULT_TIMEOUT, max_body_size=MAX_BODY_SIZE,
+                  max_pending=MAX_PENDING):
+    """return a parse server of a Unix socket or a loopback TCP port
+
+    A service has no authentication and it can register templates, so that
+    it is only bound to a Unix socket or a loopback address.
+
+    Parameters
+    ----------
+    registry (TemplateRegistry): a registry of compiled templates.
+    socket_path (str): a Unix socket file.  Default is empty which uses
+            a TCP port.
+    host (str): a loopback host.  Default is 127.0.0.1.
+    port (int): a port.  Default is 8765.
+    workers (int): a number of request threads.  Default is 8.
+    verbose (bool): log every request to stderr.  Default is False.
+    request_timeout (float): a socket timeout of a connection in seconds.
+            Default is 30.
+    max_body_size (int): a maximum request body in bytes.  Default is 64 MB.
+    max_pending (int): a maximum number of connections which wait for
+            a request thread.  Default is 32.
+
+    Returns
+    -------
+    ParseServer: a server which is not serving yet.
+
+    Raises
+    ------
+    ValueError: raise exception if host is not a loopback address.
+    """
+    kwargs = dict(workers=workers, verbose=verbose,
+                  request_timeout=request_timeout, max_body_size=max_body_size,
+                  max_pending=max_pending)
+    if socket_path:
+        return UnixParseServer(socket_path, registry, **kwargs)
+    if not is_loopback(host):
+        fmt = ('Refused to bind {!r}, parse service only binds a loopback '
+               'address.')
+        raise ValueError(fmt.format(host))
+    return ParseServer((host, port), registry, **kwargs)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket"""
+    def __init__(self, socket_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ParseClient:
+    """Client of a parse service
+
+    Attributes
+    ----------
+    socket_path (str): a Unix socket file.  Default is empty which uses
+            a TCP port.
+    host (str): a host name.  Default is 127.0.0.1.
+    port (int): a port.  Default is 8765.
+    timeout (float): a socket timeout in seconds.  Default is None.
+
+    Methods
+    -------
+    request(method, path, body=None, **query) -> http.client.HTTPResponse
+    parse(name, text, fmt='json') -> list or str
+    verify(name, text, expected_rows_count=None, expected_result=None) -> dict
+    register(name, template) -> None
+    templates() -> list
+
+    Raises
+    ------
+    ServiceError: raise exception if service answers with an error status.
+    """
+    def __init__(self, socket_path='', host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 timeout=None):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def __repr__(self):
+        if self.socket_path:
+            return '{}(socket_path={!r})'.format(type(self).__name__,
+                                                 self.socket_path)
+        fmt = '{}(host={!r}, port={})'
+        return fmt.format(type(self).__name__, self.host, self.port)
+
+    def connect(self):
+        """return a new HTTP connection"""
+        if self.socket_path:
+            return UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port,
+                                          timeout=self.timeout)
+
+    def request(self, method, path, body=None, content_type='', **query):
+        """send a request and return a response with a success status
+
+        A response is read by a caller.  Its connection is closed once
+        the response is fully read.
+
+        Parameters
+        ----------
+        method (str): GET, PUT, or POST.
+        path (str): an endpoint, i.e. /parse.
+        body (str, bytes, iterable): a request body.  An iterable of bytes
+                is sent in chunked encoding.  Default is None.
+        content_type (str): a content type of body.  Default is empty.
+        query (dict): query parameters.
+
+        Returns
+        -------
+        http.client.HTTPResponse: a response.
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if query:
+            path = '{}?{}'.format(path, urlencode(query))
+        headers = {'Connection': 'close'}
+        content_type and headers.update({'Content-Type': content_type})
+        conn = self.connect()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+        except (BrokenPipeError, ConnectionResetError):
+            # a service may answer an error, i.e. 413, before whole body
+            # is sent, and its response is still readable
+            pass
+        response = conn.getresponse()
+        conn.close()
+        if response.status >= 400:
+            content = response.read().decode('utf-8', 'replace')
+            try:
+                message = json.loads(content)['error']
+            except Exception:
+                message = content
+            raise ServiceError(message, status=response.status)
+        return response
+
+    def get_json(self, method, path, body=None, content_type='', **query):
+        """send a request and return its decoded JSON response"""
+        response = self.request(method, path, body=body,
+                                content_type=content_type, **query)
+        return json.loads(response.read())
+
+    def parse(self, name, text, fmt='json'):
+        """return parsed records of text
+
+        Parameters
+        ----------
+        name (str): a template name.
+        text (str, iterable): a text or an iterable of bytes.
+        fmt (str): json, jsonl, csv, or tsv.  Default is json.
+
+        Returns
+        -------
+        list: a list of dictionary if fmt is json, otherwise, str.
+        """
+        if fmt == 'json':
+            return self.get_json('POST', '/parse', body=text, name=name,
+                                 format=fmt)
+        response = self.request('POST', '/parse', body=text, name=name,
+                                format=fmt)
+        try:
+            return response.read().decode('utf-8')
+        except http.client.IncompleteRead:
+            raise ServiceError('Response is truncated by an error of parsing.',
+                               status=500)
+
+    def verify(self, name, text, expected_rows_count=None,
+               expected_result=None):
+        """return a verification result of text
+
+        Returns
+        -------
+        dict: a result of is_verified, rows_count, and message.
+        """
+        body = json.dumps(dict(text=text,
+                               expected_rows_count=expected_rows_count,
+                               expected_result=expected_result))
+        return self.get_json('POST', '/verify', body=body,
+                             content_type=CONTENT_TYPES['json'], name=name)
+
+    def register(self, name, template):
+        """compile template on service and register it under name"""
+        self.request('PUT', '/templates', body=template, name=name).read()
+
+    def templates(self):
+        """return a list of registered template names"""
+        return self.get_json('GET', '/templates')['templates']
+
+
+def iter_chunks(stream, size=io.DEFAULT_BUFFER_SIZE * 8):
+    """yield blocks of a binary stream so that it is sent without loading
+    whole stream to memory"""
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def start_server(server):
+    """serve requests of server in a daemon thread and return the thread"""
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,217 @@
+"""Module containing streaming sinks which write parsed records one by one."""
+
+import csv
+import json
+from abc import ABC
+from abc import abstractmethod
+
+FORMATS = ('jsonl', 'csv', 'tsv', 'sqlite')
+
+
+class RecordSink(ABC):
+    """Base sink which writes parsed records as soon as they are emitted
+
+    A subclass implements write_record to serialize one record.
+
+    Attributes
+    ----------
+    stream (file object): an output stream in text mode.
+    header (list): a list of Value names.
+    flush (bool): flush stream after every record.  Default is False.
+    count (int): a number of written records.
+
+    Methods
+    -------
+    write(record) -> None
+    write_record(record) -> None
+    write_many(records) -> int
+    close() -> None
+    """
+    def __init__(self, stream, header, flush=False):
+        self.stream = stream
+        self.header = list(header)
+        self.flush = flush
+        self.count = 0
+
+    def __repr__(self):
+        fmt = '{}(count={})'
+        return fmt.format(type(self).__name__, self.count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def write(self, record):
+        """write a parsed record
+
+        Parameters
+        ----------
+        record (dict): a parsed record.
+        """
+        self.write_record(record)
+        self.count += 1
+        self.flush and self.stream.flush()
+
+    @abstractmethod
+    def write_record(self, record):
+        """serialize a parsed record to stream without counting it
+
+        Parameters
+        ----------
+        record (dict): a parsed record.
+        """
+
+    def write_many(self, records):
+        """write parsed records and return a number of written records
+
+        Parameters
+        ----------
+        records (iterable): an iterable of parsed record.
+
+        Returns
+        -------
+        int: a number of written records.
+        """
+        count = self.count
+        for record in records:
+            self.write(record)
+        return self.count - count
+
+    def close(self):
+        """flush stream"""
+        self.stream.flush()
+
+
+class JsonLinesSink(RecordSink):
+    """Sink which writes one JSON object per line."""
+    def write_record(self, record):
+        self.stream.write(json.dumps(record))
+        self.stream.write('\n')
+
+
+class DelimitedSink(RecordSink):
+    """Sink which writes a header row and one delimited row per record
+
+    A list value of a List Value is written in JSON format.
+    """
+    delimiter = ','
+
+    def __init__(self, stream, header, flush=False):
+        super().__init__(stream, header, flush=flush)
+        self.writer = csv.writer(stream, delimiter=self.delimiter,
+                                 lineterminator='\n')
+        self.writer.writerow(self.header)
+
+    def write_record(self, record):
+        row = []
+        for name in self.header:
+            value = record.get(name, '')
+            row.append(json.dumps(value) if isinstance(value, list) else value)
+        self.writer.writerow(row)
+
+
+class TsvSink(DelimitedSink):
+    """Sink which writes tab-separated rows."""
+    delimiter = '\t'
+
+
+class SqliteSink(RecordSink):
+    """Sink which inserts records into a table of a SQLite database
+
+    A table has one TEXT column per Value and it is created if it does
+    not exist.  A list value of a List Value is stored in JSON format.
+    Records are inserted and committed in batches.
+
+    Attributes
+    ----------
+    stream (str, os.PathLike, sqlite3.Connection): a database file or
+            a connection.
+    table (str): a table name.  Default is records.
+    batch_size (int): a number of records per commit.  Default is 1000.
+    """
+    batch_size = 1000
+
+    def __init__(self, stream, header, flush=False, table='records'):
+        import sqlite3
+        super().__init__(stream, header, flush=flush)
+        self.table = table
+        self.is_owner = not isinstance(stream, sqlite3.Connection)
+        if self.is_owner:
+            self.connection = sqlite3.connect(str(stream))
+        else:
+            self.connection = stream
+        self._rows = []
+
+        columns = [self.quote(name) for name in self.header]
+        definition = ', '.join('{} TEXT'.format(name) for name in columns)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS {} ({})'.format(
+            self.quote(table), definition
+        ))
+        self.statement = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            self.quote(table), ', '.join(columns),
+            ', '.join('?' for _ in columns)
+        )
+
+    @staticmethod
+    def quote(name):
+        """return a quoted SQL identifier"""
+        return '"{}"'.format(str(name).replace('"', '""'))
+
+    def write(self, record):
+        self.write_record(record)
+        self.count += 1
+        if self.flush or len(self._rows) >= self.batch_size:
+            self.commit()
+
+    def write_record(self, record):
+        row = []
+        for name in self.header:
+            value = record.get(name, '')
+            row.append(json.dumps(value) if isinstance(value, list) else value)
+        self._rows.append(row)
+
+    def commit(self):
+        """insert pending records and commit"""
+        if self._rows:
+            self.connection.executemany(self.statement, self._rows)
+            self._rows = []
+        self.connection.commit()
+
+    def close(self):
+        """commit pending records and close an owned connection"""
+        self.commit()
+        self.is_owner and self.connection.close()
+
+
+SINKS = dict(jsonl=JsonLinesSink, csv=DelimitedSink, tsv=TsvSink,
+             sqlite=SqliteSink)
+
+
+def get_sink(fmt, stream, header, flush=False, **kwargs):
+    """return a streaming sink of format
+
+    Parameters
+    ----------
+    fmt (str): jsonl, csv, tsv, or sqlite.
+    stream (file object): an output stream in text mode, or a database
+            file if fmt is sqlite.
+    header (list): a list of Value names.
+    flush (bool): flush stream after every record.  Default is False.
+    kwargs (dict): other keyword arguments of sink, i.e. table of sqlite.
+
+    Returns
+    -------
+    RecordSink: a sink.
+
+    Raises
+    ------
+    ValueError: raise exception if format is unknown.
+    """
+    fmt = str(fmt).lower()
+    if fmt not in SINKS:
+        fmt_ = 'Unknown format {!r}, expected one of {}.'
+        raise ValueError(fmt_.format(fmt, ', '.join(FORMATS)))
+    return SINKS[fmt](stream, header, flush=flush, **kwargs)
@@ -0,0 +1,122 @@
+"""Module containing the per-phase timing instrumentation for templateapp."""
+
+from time import perf_counter
+from collections import OrderedDict
+
+
+class NullTimer:
+    """No-op context manager for a disabled instrumentation."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class PhaseTimer:
+    """Context manager to record wall time of a phase
+
+    Attributes
+    ----------
+    stats (PhaseStats): an instance of PhaseStats.
+    phase (str): a phase name.
+    """
+    def __init__(self, stats, phase):
+        self.stats = stats
+        self.phase = phase
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stats.record(self.phase, perf_counter() - self.start)
+        return False
+
+
+null_timer = NullTimer()
+
+
+class PhaseStats:
+    """Wall time and call counts of template building phases
+
+    Attributes
+    ----------
+    enabled (bool): a flag to record phases.  Default is True.
+    callback (callable): a function of (phase, elapsed) which is called
+            whenever a phase is recorded.  Default is None.
+    phases (OrderedDict): a mapping of phase name to [count, total, worst].
+
+    Methods
+    -------
+    timer(phase) -> context manager
+    record(phase, elapsed) -> None
+    reset() -> None
+    to_dict() -> dict
+    report() -> str
+    """
+    def __init__(self, enabled=True, callback=None):
+        self.enabled = enabled
+        self.callback = callback
+        self.phases = OrderedDict()
+
+    def __bool__(self):
+        return self.enabled
+
+    def timer(self, phase):
+        """return a context manager to record wall time of phase
+
+        Parameters
+        ----------
+        phase (str): a phase name.
+
+        Returns
+        -------
+        PhaseTimer: a phase timer or a no-op timer if stats is disabled.
+        """
+        return PhaseTimer(self, phase) if self.enabled else null_timer
+
+    def record(self, phase, elapsed):
+        """add elapsed time to phase
+
+        Parameters
+        ----------
+        phase (str): a phase name.
+        elapsed (float): wall time in seconds.
+        """
+        item = self.phases.get(phase)
+        if item is None:
+            self.phases[phase] = [1, elapsed, elapsed]
+        else:
+            item[0] += 1
+            item[1] += elapsed
+            item[2] = max(item[2], elapsed)
+        self.callback and self.callback(phase, elapsed)
+
+    def reset(self):
+        """remove all recorded phases"""
+        self.phases.clear()
+
+    def to_dict(self):
+        """return recorded phases as dictionary"""
+        return OrderedDict(
+            (phase, dict(count=count, total=total, worst=worst))
+            for phase, (count, total, worst) in self.phases.items()
+        )
+
+    def report(self):
+        """return a phase breakdown in text format
+
+        A phase can be nested in other phase, i.e. parse_line in prepare,
+        so that totals are not additive.
+        """
+        fmt = '{:<24} {:>8} {:>12} {:>12} {:>12}'
+        lst = [fmt.format('Phase', 'Calls', 'Total (ms)', 'Mean (ms)',
+                          'Worst (ms)'),
+               '-' * 72]
+        fmt = '{:<24} {:>8} {:>12.3f} {:>12.3f} {:>12.3f}'
+        for phase, (count, elapsed, worst) in self.phases.items():
+            lst.append(fmt.format(phase, count, elapsed * 1000,
+                                  elapsed * 1000 / count, worst * 1000))
+        return '\n'.join(lst)
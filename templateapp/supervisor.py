@@ -0,0 +1,486 @@
+"""Module containing budgeted parsing in supervised worker processes.
+
+A regex call cannot be interrupted from Python, so a pathological input
+can hang a parse indefinitely.  A budgeted parse runs in a worker process
+which is watched by its caller: a worker is killed and replaced once it
+exceeds a wall-clock budget or a resident memory budget, and a row budget
+is checked by a worker itself.  Workers are kept alive between calls and
+a compiled template is cached per worker, so that isolation does not cost
+a process spawn or a template compile per input.
+"""
+
+import os
+import atexit
+import threading
+import multiprocessing
+from time import perf_counter
+
+from templateapp.exceptions import TemplateBuilderError
+from templateapp.exceptions import TemplateParseBudgetError
+from templateapp.parser import get_parser
+from templateapp.parser import iter_records
+from templateapp.parser import iter_rows
+
+SECONDS = 'seconds'
+ROWS = 'rows'
+RSS = 'rss'
+CRASH = 'crash'
+
+POLL_INTERVAL = 0.02
+
+
+class ParseBudget:
+    """Limits of a supervised parse
+
+    Attributes
+    ----------
+    seconds (float): a wall-clock budget.  Default is None which is unlimited.
+    rows (int): a maximum number of parsed rows.  Default is None.
+    rss (int): a maximum resident memory of a worker in bytes.  It is
+            checked where /proc is available.  Default is None.
+    """
+    def __init__(self, seconds=None, rows=None, rss=None):
+        self.seconds = seconds
+        self.rows = rows
+        self.rss = rss
+
+    def __repr__(self):
+        fmt = '{}(seconds={}, rows={}, rss={})'
+        return fmt.format(type(self).__name__, self.seconds, self.rows,
+                          self.rss)
+
+    def __bool__(self):
+        return any(item is not None for item in (self.seconds, self.rows,
+                                                 self.rss))
+
+
+class ParseResult:
+    """Result of a supervised parse
+
+    Attributes
+    ----------
+    records (list): a list of parsed dictionary.  Empty if parse failed
+            or only rows are counted.
+    rows_count (int): a number of parsed rows.
+    reason (str): seconds, rows, rss, or crash if a budget is exceeded or
+            a worker died, otherwise empty.
+    error (str): an error message.  Empty if parse succeeded.
+    elapsed (float): parse time in seconds.
+
+    Properties
+    ----------
+    is_success (bool): True if parse finished within budget.
+
+    Methods
+    -------
+    raise_for_error() -> None
+    """
+    def __init__(self, records=None, reason='', error='', elapsed=0.0,
+                 rows_count=None):
+        self.records = records or []
+        if rows_count is None:
+            rows_count = len(self.records)
+        self.rows_count = rows_count
+        self.reason = reason
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        fmt = '{}(is_success={}, reason={!r}, rows_count={})'
+        return fmt.format(type(self).__name__, self.is_success, self.reason,
+                          self.rows_count)
+
+    @property
+    def is_success(self):
+        """return True if parse finished within budget"""
+        return not self.error
+
+    def raise_for_error(self):
+        """raise exception if parse failed
+
+        Raises
+        ------
+        TemplateParseBudgetError: raise exception if budget is exceeded or
+                a worker died.
+        TemplateBuilderError: raise exception if there is error during
+                parsing text.
+        """
+        if self.reason:
+            raise TemplateParseBudgetError(self.error, reason=self.reason)
+        if self.error:
+            raise TemplateBuilderError(self.error)
+
+
+def get_rss(pid):
+    """return resident memory of a process in bytes or None if unknown"""
+    try:
+        with open('/proc/{}/statm'.format(pid)) as stream:
+            pages = int(stream.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def read_source(source):
+    """return a text of a text, a file path, or a file object
+
+    Parameters
+    ----------
+    source (str, os.PathLike, file object): a text, a file path, or
+            a file object in text mode.
+
+    Returns
+    -------
+    str: a text.
+    """
+    if isinstance(source, str):
+        return source
+    if isinstance(source, os.PathLike):
+        with open(source) as stream:
+            return stream.read()
+    return source.read()
+
+
+def serve(conn):
+    """run a worker loop which parses requests of a connection
+
+    A request is (template, engine, prefilter, text, max_rows, count_only)
+    and a reply is ('ok', records), ('count', count) if count_only is True,
+    (ROWS, count), or ('error', message).
+
+    Parameters
+    ----------
+    conn (multiprocessing.connection.Connection): a worker end of a pipe.
+    """
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+
+        template, engine, prefilter, text, max_rows, count_only = request
+        try:
+            parser = get_parser(template, engine=engine, prefilter=prefilter)
+            records, count = [], 0
+            if count_only:
+                items = iter_rows(parser.parser, text)
+            else:
+                items = iter_records(parser.parser, text)
+            for record in items:
+                count += 1
+                count_only or records.append(record)
+                if max_rows is not None and count > max_rows:
+                    break
+            if max_rows is not None and count > max_rows:
+                reply = (ROWS, count)
+            elif count_only:
+                reply = ('count', count)
+            else:
+                reply = ('ok', records)
+        except Exception as ex:
+            reply = ('error', '{}: {}'.format(type(ex).__name__, ex))
+        conn.send(reply)
+
+
+class Worker:
+    """A reusable parse worker process
+
+    Attributes
+    ----------
+    process (multiprocessing.Process): a worker process.
+    conn (multiprocessing.connection.Connection): a parent end of a pipe.
+    """
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=serve, args=(child,),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+
+    @property
+    def is_alive(self):
+        """return True if worker process is running"""
+        return self.process.is_alive()
+
+    def kill(self):
+        """terminate worker process immediately"""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        """stop worker process gracefully"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ParseSupervisor:
+    """A pool of reusable worker processes which parse within budget
+
+    Attributes
+    ----------
+    size (int): a maximum number of worker processes.  Default is 2.
+    budget (ParseBudget): a default budget.  Default is unlimited.
+    kills (int): a number of killed workers.
+
+    Methods
+    -------
+    parse(template, text, budget=None, engine='textfsm', prefilter=False,
+            count_only=False) -> ParseResult
+    parse_many(template, sources, budget=None, engine='textfsm',
+            prefilter=False, count_only=False) -> list
+    close() -> None
+    """
+    def __init__(self, size=2, budget=None, start_method=None):
+        self.size = max(int(size), 1)
+        self.budget = budget or ParseBudget()
+        self.kills = 0
+        self._context = multiprocessing.get_context(start_method)
+        self._idle = []
+        self._count = 0
+        self._condition = threading.Condition()
+        self._is_closed = False
+
+    def __repr__(self):
+        fmt = '{}(size={}, workers_count={}, kills={})'
+        return fmt.format(type(self).__name__, self.size, self._count,
+                          self.kills)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def acquire(self):
+        """return an idle worker or start a new one"""
+        with self._condition:
+            while True:
+                if self._is_closed:
+                    raise RuntimeError('ParseSupervisor is closed.')
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.is_alive:
+                        return worker
+                    self._count -= 1
+                if self._count < self.size:
+                    self._count += 1
+                    break
+                self._condition.wait()
+        try:
+            return Worker(self._context)
+        except Exception:
+            with self._condition:
+                self._count -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, worker, is_broken=False):
+        """put worker back to pool or discard a broken worker"""
+        if is_broken:
+            worker.kill()
+        with self._condition:
+            if is_broken or self._is_closed:
+                self._count -= 1
+                if not is_broken:
+                    worker.close()
+            else:
+                self._idle.append(worker)
+            self._condition.notify()
+
+    def parse(self, template, text, budget=None, engine='textfsm',
+              prefilter=False, count_only=False):
+        """parse text via template in a worker process within budget
+
+        Parameters
+        ----------
+        template (str): a TextFSM template.
+        text (str): a text.
+        budget (ParseBudget): a budget.  Default is None which uses
+                budget of supervisor.
+        engine (str): textfsm or alternation.  Default is textfsm.
+        prefilter (bool): skip lines which no rule of current state can
+                match.  Default is False.
+        count_only (bool): only count parsed rows, so that records are not
+                sent back from a worker.  Default is False.
+
+        Returns
+        -------
+        ParseResult: parsed records or a reason why parse was stopped.
+        """
+        budget = budget or self.budget
+        start = perf_counter()
+        worker = self.acquire()
+        # a worker is discarded unless it answered, so that any error,
+        # i.e. a pickling error or KeyboardInterrupt, does not leak a slot
+        is_broken = True
+        try:
+            worker.conn.send((template, engine, bool(prefilter), text,
+                              budget.rows, count_only))
+            reason = self.watch(worker, budget, start)
+            if reason:
+                self.kills += 1
+                return ParseResult(reason=reason,
+                                   error=self.describe(reason, budget),
+                                   elapsed=perf_counter() - start)
+            status, payload = worker.conn.recv()
+            is_broken = False
+        except (EOFError, OSError) as ex:
+            error = 'Parse worker died - {}: {}'.format(type(ex).__name__, ex)
+            return ParseResult(reason=CRASH, error=error,
+                               elapsed=perf_counter() - start)
+        finally:
+            self.release(worker, is_broken=is_broken)
+
+        elapsed = perf_counter() - start
+        if status == 'ok':
+            return ParseResult(records=payload, elapsed=elapsed)
+        if status == 'count':
+            return ParseResult(rows_count=payload, elapsed=elapsed)
+        if status == ROWS:
+            return ParseResult(reason=ROWS, error=self.describe(ROWS, budget),
+                               elapsed=elapsed)
+        return ParseResult(error=payload, elapsed=elapsed)
+
+    def watch(self, worker, budget, start):
+        """wait for a reply of worker and return a reason if over budget"""
+        while not worker.conn.poll(POLL_INTERVAL):
+            if not worker.is_alive:
+                return CRASH
+            if budget.seconds is not None:
+                if perf_counter() - start > budget.seconds:
+                    return SECONDS
+            if budget.rss is not None:
+                rss = get_rss(worker.process.pid)
+                if rss is not None and rss > budget.rss:
+                    return RSS
+        return ''
+
+    @staticmethod
+    def describe(reason, budget):
+        """return an error message of an exceeded budget"""
+        if reason == SECONDS:
+            return 'Parse exceeded {} second(s) budget.'.format(budget.seconds)
+        if reason == ROWS:
+            return 'Parse exceeded {} row(s) budget.'.format(budget.rows)
+        if reason == RSS:
+            fmt = 'Parse exceeded {} byte(s) memory budget.'
+            return fmt.format(budget.rss)
+        return 'Parse worker died unexpectedly.'
+
+    def parse_many(self, template, sources, budget=None, engine='textfsm',
+                   prefilter=False, count_only=False):
+        """parse many sources concurrently within budget per source
+
+        A source which exceeds budget only fails its own result.
+
+        Parameters
+        ----------
+        template (str): a TextFSM template.
+        sources (list): a list of text or os.PathLike file path.  A file is
+                read by a calling thread right before it is parsed.
+        budget (ParseBudget): a budget per text.  Default is None which
+                uses budget of supervisor.
+        engine (str): textfsm or alternation.  Default is textfsm.
+        prefilter (bool): skip lines which no rule of current state can
+                match.  Default is False.
+        count_only (bool): only count parsed rows of every source.
+                Default is False.
+
+        Returns
+        -------
+        list: a list of ParseResult in order of sources.
+        """
+        sources = list(sources)
+        results = [None] * len(sources)
+        position = iter(range(len(sources)))
+        lock = threading.Lock()
+
+        def run():
+            while True:
+                with lock:
+                    index = next(position, None)
+                if index is None:
+                    return
+                try:
+                    text = read_source(sources[index])
+                except Exception as ex:
+                    error = '{}: {}'.format(type(ex).__name__, ex)
+                    results[index] = ParseResult(error=error)
+                    continue
+                results[index] = self.parse(template, text, budget=budget,
+                                            engine=engine, prefilter=prefilter,
+                                            count_only=count_only)
+
+        threads = [threading.Thread(target=run)
+                   for _ in range(min(self.size, len(sources)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def close(self):
+        """stop all worker processes"""
+        with self._condition:
+            self._is_closed = True
+            workers, self._idle = self._idle, []
+            self._count -= len(workers)
+            self._condition.notify_all()
+        for worker in workers:
+            worker.close()
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def get_supervisor():
+    """return a process-wide ParseSupervisor which is closed at exit"""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None or _supervisor._is_closed:
+            _supervisor = ParseSupervisor(size=max(os.cpu_count() or 1, 2))
+            atexit.register(_supervisor.close)
+        return _supervisor
+
+
+def parse_within_budget(template, source, budget, engine='textfsm',
+                        prefilter=False):
+    """return parsed records of source or raise if budget is exceeded
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+    source (str, os.PathLike, file object): a text, a file path, or
+            a file object in text mode.
+    budget (ParseBudget): a budget.
+    engine (str): textfsm or alternation.  Default is textfsm.
+    prefilter (bool): skip lines which no rule of current state can match.
+            Default is False.
+
+    Returns
+    -------
+    list: a list of dictionary.
+
+    Raises
+    ------
+    TemplateParseBudgetError: raise exception if budget is exceeded.
+    TemplateBuilderError: raise exception if there is error during parsing
+            text.
+    """
+    result = get_supervisor().parse(template, read_source(source),
+                                    budget=budget, engine=engine,
+                                    prefilter=prefilter)
+    result.raise_for_error()
+    return result.records
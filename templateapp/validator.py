@@ -0,0 +1,193 @@
+"""Module containing a lightweight structural validator for template.
+
+It checks a template layout the same way TextFSM does but without
+compiling any Value or rule regex.
+"""
+
+import re
+from string import Template
+
+VALUE_OPTIONS = ('Filldown', 'Fillup', 'Key', 'List', 'Required')
+LINE_OPERATORS = ('Continue', 'Next', 'Error')
+RECORD_OPERATORS = ('Clear', 'Clearall', 'Record', 'NoRecord')
+MAX_NAME_LEN = 48
+
+
+def is_comment(line):
+    """return True if line is a template comment"""
+    return line.lstrip().startswith('#')
+
+
+def parse_value(line):
+    """return name of a Value declaration
+
+    Parameters
+    ----------
+    line (str): a Value declaration i.e. Value Filldown name (regex).
+
+    Returns
+    -------
+    tuple: a value name and an error message.  Error is empty if it is valid.
+    """
+    tokens = line.split(' ')
+    if len(tokens) < 3:
+        return '', 'Expect at least 3 tokens on line.'
+
+    if not tokens[2].startswith('('):
+        for option in tokens[1].split(','):
+            if option not in VALUE_OPTIONS:
+                return '', 'Unknown option {!r}.'.format(option)
+        name, regex = tokens[2], ' '.join(tokens[3:])
+    else:
+        name, regex = tokens[1], ' '.join(tokens[2:])
+
+    if len(name) > MAX_NAME_LEN:
+        return name, 'Invalid Value name {!r} or name too long.'.format(name)
+
+    if (len(regex) < 2 or regex[0] != '(' or regex[-1] != ')'
+            or regex[-2] == '\\'):
+        fmt = 'Value {!r} must be contained within a "()" pair.'
+        return name, fmt.format(regex)
+    return name, ''
+
+
+def parse_new_state(action):
+    """return a line operator and a new state of rule action
+
+    Parameters
+    ----------
+    action (str): a rule action i.e. Next.Record State2.
+
+    Returns
+    -------
+    tuple: a line operator and a new state.
+    """
+    tokens = action.split(None, 1)
+    if not tokens:
+        return '', ''
+
+    first = tokens[0]
+    lop, _, rop = first.partition('.')
+    if lop in LINE_OPERATORS and (not rop or rop in RECORD_OPERATORS):
+        return lop, tokens[1].strip() if len(tokens) > 1 else ''
+    if first in RECORD_OPERATORS:
+        return '', tokens[1].strip() if len(tokens) > 1 else ''
+    return '', action.strip()
+
+
+def validate_template(template):
+    """return a list of structural errors of template
+
+    It verifies Value declarations, state names, Start state, rule format,
+    variable references, and destination states.
+
+    Parameters
+    ----------
+    template (str): a TextFSM template.
+
+    Returns
+    -------
+    list: a list of error messages.  Empty list if template is valid.
+    """
+    errors = []
+    lines = template.splitlines()
+    total = len(lines)
+    index = 0
+
+    values = []
+    while index < total:
+        line = lines[index].rstrip()
+        index += 1
+        if not line:
+            break
+        if is_comment(line):
+            continue
+        if line.startswith('Value '):
+            name, error = parse_value(line)
+            if error:
+                errors.append('{} Line {}.'.format(error, index))
+            elif name in values:
+                fmt = 'Duplicate declarations for Value {!r}. Line: {}.'
+                errors.append(fmt.format(name, index))
+            else:
+                values.append(name)
+        elif not values:
+            errors.append('No Value definitions found.')
+            return errors
+        else:
+            fmt = 'Expected blank line after last Value entry. Line: {}.'
+            errors.append(fmt.format(index))
+            return errors
+
+    states = dict()
+    destinations = []
+    while index < total:
+        line = lines[index].rstrip()
+        index += 1
+        if not line or is_comment(line):
+            continue
+
+        state_name = line
+        if (not re.match(r'\w+$', state_name) or len(state_name) > MAX_NAME_LEN
+                or state_name in LINE_OPERATORS
+                or state_name in RECORD_OPERATORS):
+            fmt = 'Invalid state name: {!r}. Line: {}'
+            errors.append(fmt.format(state_name, index))
+            return errors
+        if state_name in states:
+            fmt = 'Duplicate state name: {!r}. Line: {}'
+            errors.append(fmt.format(state_name, index))
+            return errors
+        states[state_name] = 0
+
+        while index < total:
+            line = lines[index].rstrip()
+            index += 1
+            if not line:
+                break
+            if is_comment(line):
+                continue
+            if not line.startswith((' ^', '  ^', '\t^')):
+                fmt = ("Missing white space or carat ('^') before rule. "
+                       "Line: {}")
+                errors.append(fmt.format(index))
+                continue
+
+            states[state_name] += 1
+            match_action = re.match(r'(?P<match>.*)(\s->(?P<action>.*))',
+                                    line.strip())
+            if match_action:
+                match = match_action.group('match')
+                action = match_action.group('action')
+            else:
+                match, action = line.strip(), ''
+
+            for m in Template.pattern.finditer(match):
+                name = m.group('named') or m.group('braced')
+                if m.group('invalid') is not None:
+                    fmt = 'Invalid variable substitution: {!r}. Line: {}.'
+                    errors.append(fmt.format(match, index))
+                elif name and name not in values:
+                    fmt = 'Undeclared variable {!r}. Line: {}.'
+                    errors.append(fmt.format(name, index))
+
+            lop, new_state = parse_new_state(action)
+            if lop == 'Continue' and new_state:
+                fmt = 'Action Continue with new state {}. Line: {}.'
+                errors.append(fmt.format(new_state, index))
+            elif lop != 'Error' and new_state:
+                destinations.append((new_state, state_name, index))
+
+    if 'Start' not in states:
+        errors.append("Missing state 'Start'.")
+
+    for name in ('End', 'EOF'):
+        if states.get(name):
+            errors.append('Non-Empty {!r} state.'.format(name))
+
+    for new_state, state_name, line_num in destinations:
+        if new_state not in states and new_state not in ('End', 'EOF'):
+            fmt = 'State {!r} not found, referenced in state {!r}. Line: {}.'
+            errors.append(fmt.format(new_state, state_name, line_num))
+
+    return errors
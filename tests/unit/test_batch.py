@@ -0,0 +1,132 @@
+import pytest
+
+from templateapp import TemplateBuilder
+from templateapp import batch
+from templateapp.batch import build_batch
+from templateapp.batch import expand_paths
+from templateapp.batch import build_directory
+from templateapp.main import Cli
+from templateapp.parser import get_parser
+
+
+@pytest.fixture
+def specs():
+    return [
+        'digits(var_x) -> Record',
+        dict(user_data='word(var_name) digits(var_age) -> Record',
+             author='user1'),
+        'no variable here',
+        'letters(var_y)   digits(var_z)',
+    ]
+
+
+class TestBuildBatch:
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_ordered(self, specs, workers):
+        results = list(build_batch(specs, workers=workers))
+        assert [r.index for r in results] == [0, 1, 2, 3]
+        assert [r.is_success for r in results] == [True, True, False, True]
+        assert 'TemplateBuilderInvalidFormat' in results[2].error
+        assert '# Created by  : user1' in results[1].template
+
+        expected = TemplateBuilder(user_data=specs[0]).template
+        assert results[0].template == expected
+
+    def test_as_completed(self, specs):
+        results = list(TemplateBuilder.build_many(specs, workers=2,
+                                                  ordered=False))
+        assert sorted(r.index for r in results) == [0, 1, 2, 3]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for index in range(4):
+        node = tmp_path / 'good{}.txt'.format(index)
+        text = 'Title  Price\nabc  {}\nxyz  {}\n'.format(index, index)
+        node.write_text(text)
+    sub = tmp_path / 'sub'
+    sub.mkdir()
+    (sub / 'bad.txt').write_text('nothing here\n')
+    return tmp_path
+
+
+class TestVerifyCorpus:
+    def test_expand_paths(self, corpus):
+        assert len(expand_paths(str(corpus))) == 5
+        assert len(expand_paths(str(corpus / '*.txt'))) == 4
+        assert len(expand_paths([str(corpus / '**' / '*.txt')])) == 5
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_verify_corpus(self, corpus, workers):
+        factory = TemplateBuilder(
+            user_data=('Title  Price\n'
+                       'word(var_title)  digits(var_price) -> Record')
+        )
+        report = factory.verify_corpus(str(corpus), workers=workers)
+        assert len(report.results) == 5
+        assert report.rows_count == 8
+        assert report.passed_count == 4
+        assert not report.is_passed
+        bad = str(corpus / 'sub' / 'bad.txt')
+        assert [r.path for r in report.failed] == [bad]
+        assert 'Files: 5, passed: 4, failed: 1, rows: 8' in report.report()
+
+    def test_verify_file_compiles_template_once(self, corpus):
+        factory = TemplateBuilder(
+            user_data=('Title  Price\n'
+                       'word(var_title)  digits(var_price) -> Record'),
+            prefilter=True
+        )
+        path = str(corpus / 'good0.txt')
+        result = batch.verify_file(path, template=factory.template,
+                                   prefilter=True)
+        assert result.rows_count == 2
+        parser = get_parser(factory.template, prefilter=True)
+        result = batch.verify_file(path, template=factory.template,
+                                   prefilter=True)
+        assert result.rows_count == 2
+        assert get_parser(factory.template, prefilter=True) is parser
+
+
+@pytest.fixture
+def snippets(tmp_path):
+    input_dir = tmp_path / 'snippets'
+    (input_dir / 'show').mkdir(parents=True)
+    (input_dir / 'name.txt').write_text('Name: word(var_name) -> record')
+    (input_dir / 'show' / 'num.yaml').write_text(
+        'user_data: "x digits(var_num) -> record"\n'
+        'test_data: "x 1\\nx 2"\n'
+    )
+    (input_dir / 'bad.yml').write_text('- not a mapping\n')
+    return input_dir
+
+
+class TestBuildDirectory:
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_build_directory(self, snippets, tmp_path, workers):
+        output_dir = tmp_path / 'templates'
+        result = build_directory(str(snippets), str(output_dir),
+                                 workers=workers, platform='pytest',
+                                 options=dict(author='user1'))
+        assert not result.is_success
+        bad = str(snippets / 'bad.yml')
+        assert [path for path, _ in result.failed] == [bad]
+        assert 'Files: 3, built: 2, failed: 1, written: 3' in result.report()
+
+        template = (output_dir / 'name.textfsm').read_text()
+        assert '# Created by  : user1' in template
+        assert (output_dir / 'show' / 'num.textfsm').exists()
+        script = (output_dir / 'show' / 'test_num.py').read_text()
+        assert 'import pytest' in script
+        assert not (output_dir / 'test_name.py').exists()
+
+    def test_cli_build_command(self, snippets, tmp_path, capsys):
+        output_dir = tmp_path / 'out'
+        (snippets / 'bad.yml').unlink()
+        app = Cli(['build', '--input-dir', str(snippets),
+                   '--output-dir', str(output_dir), '-j', '1'])
+        with pytest.raises(SystemExit) as ex:
+            app.run()
+        assert ex.value.code == 0
+        assert 'built: 2, failed: 0' in capsys.readouterr().out
+        assert (output_dir / 'show' / 'num.textfsm').exists()
@@ -0,0 +1,99 @@
+import pytest
+from textwrap import dedent
+from unittest import mock
+
+from templateapp import TemplateBuilder
+from templateapp import TemplateCache
+from templateapp.cache import LRUCache
+from templateapp.core import line_pattern_cache
+
+
+@pytest.fixture
+def user_data():
+    data = """
+        Title                   Price       Genre
+        mixed_words(var_title)   number(var_price)   words(var_genre) -> Record
+    """
+    return dedent(data).strip()
+
+
+class TestLRUCache:
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+        assert 'b' not in cache
+        assert cache.get('b') is None
+        assert cache.stats == dict(hits=1, misses=1, size=2, maxsize=2)
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.get('a')
+        cache.clear()
+        assert cache.stats == dict(hits=0, misses=0, size=0, maxsize=128)
+
+
+class TestTemplateCache:
+    def test_make_key(self, user_data):
+        key1 = TemplateCache.make_key(user_data, author='user1')
+        key2 = TemplateCache.make_key(user_data, author='user1')
+        key3 = TemplateCache.make_key(user_data, author='user2')
+        assert key1 == key2
+        assert key1 != key3
+
+    def test_memory_hit(self, user_data):
+        cache = TemplateCache()
+        factory1 = TemplateBuilder(user_data=user_data, cache=cache)
+        factory2 = TemplateBuilder(user_data=user_data, cache=cache)
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert factory2.template == factory1.template
+        assert factory2.template_parser is not factory1.template_parser
+        assert factory2.variables and factory2.line_entries
+
+    def test_disk_hit(self, user_data, tmp_path):
+        cache = TemplateCache(disk=True, directory=str(tmp_path))
+        factory1 = TemplateBuilder(user_data=user_data, cache=cache)
+
+        other_cache = TemplateCache(disk=True, directory=str(tmp_path))
+        factory2 = TemplateBuilder(user_data=user_data, cache=other_cache)
+        assert other_cache.disk_hits == 1
+        assert factory2.template == factory1.template
+        assert factory2.template_parser is not None
+
+        other_cache.clear(disk=True)
+        assert not list(tmp_path.glob('*.textfsm'))
+
+    def test_verify_with_shared_parser(self, user_data):
+        test_data = dedent("""
+            Title                   Price       Genre
+            Midnight Rain           5.95        Fantasy
+        """).strip()
+        cache = TemplateCache()
+        for _ in range(2):
+            factory = TemplateBuilder(user_data=user_data, test_data=test_data,
+                                      cache=cache)
+            assert factory.verify(expected_rows_count=1)
+
+    def test_apply_edit_after_memory_hit(self, user_data):
+        cache = TemplateCache()
+        TemplateBuilder(user_data=user_data, cache=cache)
+        factory = TemplateBuilder(user_data=user_data, cache=cache)
+        factory.apply_edit(1, 'Book letters(var_kind)')
+        assert 'Value kind' in factory.template
+        assert 'Value genre' in factory.template
+
+    def test_hit_does_not_parse_user_data(self, user_data, tmp_path):
+        cache = TemplateCache(disk=True, directory=str(tmp_path))
+        TemplateBuilder(user_data=user_data, cache=cache)
+        line_pattern_cache.clear()
+        other_cache = TemplateCache(disk=True, directory=str(tmp_path))
+        with mock.patch('templateapp.core.LinePattern',
+                        side_effect=AssertionError('LinePattern is called')):
+            factory = TemplateBuilder(user_data=user_data, cache=other_cache)
+            assert other_cache.disk_hits == 1
+            assert factory.template_parser is not None
+        assert factory.variables and factory.line_entries
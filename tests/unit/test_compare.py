@@ -0,0 +1,68 @@
+import io
+import json
+
+from templateapp.compare import iter_jsonl
+from templateapp.compare import compare_rows
+from templateapp.parser import Columns
+
+
+expected = [
+    dict(name='a', value='1'),
+    dict(name='b', value='2'),
+    dict(name='c', value='3'),
+]
+
+
+class TestIterJsonl:
+    def test_reading_file_and_stream(self, tmp_path):
+        content = '\n'.join(json.dumps(record) for record in expected) + '\n\n'
+        node = tmp_path / 'expected.jsonl'
+        node.write_text(content)
+        assert list(iter_jsonl(node)) == expected
+        assert list(iter_jsonl(str(node))) == expected
+        assert list(iter_jsonl(io.StringIO(content))) == expected
+
+
+class TestCompareRows:
+    def test_matched(self):
+        comparison = compare_rows(iter(expected), expected)
+        assert comparison.is_matched
+        assert comparison.rows_count == 3
+        assert comparison.expected_rows_count == 3
+        assert comparison.to_index() == dict()
+
+    def test_matched_columns(self):
+        comparison = compare_rows(Columns.from_records(expected), expected)
+        assert comparison.is_matched
+
+    def test_field_index(self):
+        rows = [dict(name='a', value='1'),
+                dict(name='b', value='x'),
+                dict(name='x', value='3', extra='')]
+        comparison = compare_rows(rows, expected)
+        assert not comparison.is_matched
+        assert comparison.to_index() == {1: ['value'], 2: ['name', 'extra']}
+        assert "Row 1: value: 'x' != '2'" in comparison.report()
+
+    def test_missing_and_unexpected_rows(self):
+        comparison = compare_rows(expected[:2], expected)
+        assert comparison.to_index() == {2: []}
+        assert 'missing parsed row' in comparison.report()
+
+        comparison = compare_rows(expected, expected[:1])
+        assert comparison.to_index() == {1: [], 2: []}
+        assert 'unexpected parsed row' in comparison.report()
+
+    def test_stop_early(self):
+        consumed = []
+
+        def generate():
+            for index in range(1000):
+                consumed.append(index)
+                yield dict(name=str(index), value='0')
+
+        comparison = compare_rows(generate(), expected, max_mismatches=2)
+        assert comparison.is_stopped
+        assert len(comparison.mismatches) == 2
+        assert len(consumed) == 2
+        assert 'stopped after 2' in comparison.report()
@@ -1,3 +1,4 @@
+import json
 import pytest
 from textwrap import dedent
 from datetime import datetime
@@ -5,6 +6,8 @@ from pathlib import Path, PurePath
 
 from templateapp import ParsedLine
 from templateapp import TemplateBuilder
+from templateapp.core import line_pattern_cache
+from templateapp.exceptions import TemplateBuilderError
 
 
 @pytest.fixture
@@ -297,3 +300,180 @@ class TestTemplateBuilder:
         )
         snippet_script = factory.create_python_test()
         assert snippet_script == tc_info.expected_snippet_script
+
+    def test_verify_report_is_bounded(self):
+        factory = TemplateBuilder(
+            user_data='x digits(var_num) -> record',
+            test_data='\n'.join('x {}'.format(i) for i in range(100))
+        )
+        expected_result = [dict(num='0') for _ in range(100)]
+        assert not factory.verify(expected_result=expected_result,
+                                  max_mismatches=5)
+        assert factory.comparison.is_stopped
+        assert len(factory.comparison.mismatches) == 5
+        assert 'Comparison stopped after 5 mismatch(es)' in (
+            factory.verified_message
+        )
+        assert not factory.verify(expected_result=expected_result)
+        assert len(factory.comparison.mismatches) == 20
+        assert not factory.verify(expected_result=expected_result,
+                                  max_mismatches=None)
+        assert len(factory.comparison.mismatches) == 99
+
+
+class TestLinePatternCache:
+    def test_shared_statement(self):
+        line_pattern_cache.clear()
+        data = 'Today temperature is digits(var_degree) celsius.'
+        first = ParsedLine(data)
+        second = ParsedLine(data)
+        assert first.get_statement() == second.get_statement()
+        assert [v.name for v in first.variables] == ['degree']
+        assert [v.name for v in second.variables] == ['degree']
+        assert line_pattern_cache.stats['hits'] == 1
+        assert line_pattern_cache.stats['misses'] == 1
+
+    def test_ignore_case_in_key(self):
+        line_pattern_cache.clear()
+        ParsedLine('abc digits(var_x)').get_statement()
+        ParsedLine('ignore_case__ abc digits(var_x)').get_statement()
+        assert line_pattern_cache.stats['size'] == 2
+
+
+class TestVerifyStream:
+    def test_iter_parse(self, tc_info):
+        factory = TemplateBuilder(user_data=tc_info.user_data,
+                                  test_data=tc_info.test_data)
+        assert list(factory.iter_parse()) == tc_info.expected_result
+
+    def test_verify_stream_from_file(self, tc_info, tmp_path):
+        node = tmp_path / 'test_data.txt'
+        node.write_text(tc_info.test_data)
+        factory = TemplateBuilder(user_data=tc_info.user_data)
+        is_verified = factory.verify_stream(
+            node,
+            expected_rows_count=tc_info.expected_rows_count,
+            expected_result=tc_info.expected_result
+        )
+        assert is_verified
+
+    def test_verify_stream_with_different_result(self, tc_info):
+        factory = TemplateBuilder(user_data=tc_info.user_data,
+                                  test_data=tc_info.test_data)
+        is_verified = factory.verify_stream(
+            expected_result=tc_info.expected_result[:-1]
+        )
+        assert not is_verified
+        assert factory.verified_message.endswith('are different.')
+        assert factory.comparison.to_index() == {
+            tc_info.expected_rows_count - 1: []
+        }
+
+    def test_verify_stream_with_jsonl_expected_result(self, tc_info, tmp_path):
+        node = tmp_path / 'expected.jsonl'
+        lines = [json.dumps(record) for record in tc_info.expected_result]
+        node.write_text('\n'.join(lines))
+        factory = TemplateBuilder(user_data=tc_info.user_data,
+                                  test_data=tc_info.test_data)
+        assert factory.verify_stream(expected_result=node)
+
+        expected_result = [dict(record, price='0')
+                           for record in tc_info.expected_result]
+        is_verified = factory.verify_stream(expected_result=expected_result,
+                                            max_mismatches=1)
+        assert not is_verified
+        assert factory.comparison.is_stopped
+        assert factory.comparison.to_index() == {0: ['price']}
+
+
+class TestColumnarResult:
+    def test_parse_columnar(self, tc_info):
+        factory = TemplateBuilder(user_data=tc_info.user_data,
+                                  test_data=tc_info.test_data)
+        columns = factory.parse(columnar=True)
+        assert len(columns) == tc_info.expected_rows_count
+        assert columns == tc_info.expected_result
+        assert columns.to_records() == factory.parse()
+        assert columns['title'][0] == tc_info.expected_result[0]['title']
+
+    def test_verify_columnar(self, tc_info):
+        factory = TemplateBuilder(user_data=tc_info.user_data,
+                                  test_data=tc_info.test_data)
+        is_verified = factory.verify(
+            expected_rows_count=tc_info.expected_rows_count,
+            expected_result=tc_info.expected_result,
+            columnar=True
+        )
+        assert is_verified
+
+        is_verified = factory.verify(
+            expected_result=tc_info.expected_result[:-1], columnar=True
+        )
+        assert not is_verified
+
+    def test_verify_columnar_with_tabular_debug(self, tc_info, capsys):
+        factory = TemplateBuilder(user_data=tc_info.user_data,
+                                  test_data=tc_info.test_data)
+        factory.verify(tabular=True, debug=True, columnar=True)
+        assert 'XML Developer' in capsys.readouterr().out
+
+
+class TestVariableRegistry:
+    def test_deduplicated_variables(self):
+        user_data = 'digits(var_x) letters(var_y)\ndigits(var_x) -> Record'
+        factory = TemplateBuilder(user_data=user_data)
+        assert [v.name for v in factory.variables] == ['x', 'y']
+        assert not factory.registry.conflicts
+
+    def test_conflicting_variables(self):
+        user_data = 'digits(var_x) -> Record\nletters(var_x) -> Record'
+        with pytest.raises(TemplateBuilderError) as ex:
+            TemplateBuilder(user_data=user_data)
+        assert "variable 'x' has conflicting patterns" in str(ex.value)
+
+    def test_conflicting_variables_in_debug(self):
+        user_data = 'digits(var_x) -> Record\nletters(var_x) -> Record'
+        factory = TemplateBuilder(user_data=user_data, debug=True)
+        assert factory.template == ''
+        assert 'conflicting patterns' in factory.bad_template
+
+
+class TestIncrementalRebuild:
+    def test_apply_edit(self, tc_info):
+        factory = TemplateBuilder(user_data=tc_info.user_data)
+        factory.apply_edit(1, 'Title      Cost      Genre')
+        lines = tc_info.user_data.splitlines()
+        user_data = '\n'.join(['Title      Cost      Genre'] + lines[1:])
+        expected = TemplateBuilder(user_data=user_data)
+        assert factory.user_data == user_data
+        assert factory.template == expected.template
+        assert factory.template_parser is not None
+
+    def test_rebuild_parses_changed_lines_only(self, tc_info, monkeypatch):
+        factory = TemplateBuilder(user_data=tc_info.other_user_data)
+        parsed = []
+        original = factory.parse_line
+
+        def parse_line(line):
+            parsed.append(line)
+            return original(line)
+
+        monkeypatch.setattr(factory, 'parse_line', parse_line)
+        user_data = tc_info.other_user_data.replace(
+            'words(var_genre)', 'word(var_genre)'
+        )
+        factory.rebuild(user_data)
+        assert len(parsed) == 1
+        expected = TemplateBuilder(user_data=user_data).template
+        assert factory.template == expected
+
+    def test_rebuild_without_change_keeps_parser(self, tc_info):
+        factory = TemplateBuilder(user_data=tc_info.user_data)
+        parser = factory.template_parser
+        factory.rebuild(tc_info.user_data)
+        assert factory.template_parser is parser
+
+    def test_apply_edit_out_of_range(self, tc_info):
+        factory = TemplateBuilder(user_data=tc_info.user_data)
+        with pytest.raises(TemplateBuilderError):
+            factory.apply_edit(10, 'abc')
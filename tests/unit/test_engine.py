@@ -0,0 +1,143 @@
+import io
+import random
+import pytest
+from textfsm import TextFSM
+from textfsm import TextFSMError
+
+from templateapp import TemplateBuilder
+from templateapp.engine import AlternationTextFSM
+from templateapp.engine import PrefilterAlternationTextFSM
+from templateapp.engine import get_parser_class
+from templateapp.engine import rename_groups
+from templateapp.engine import build_state_matchers
+
+
+values = [
+    'Value {}name (\\S+)',
+    'Value {}num (\\d+)',
+    'Value {}word ([a-z]+)',
+    'Value {}addr (\\d+\\.\\d+)',
+]
+value_options = ['', 'Filldown ', 'Required ', 'List ', 'Key ', 'Fillup ']
+
+rule_matches = [
+    '^name ${name}',
+    '^num ${num}',
+    '^${word} ${num}',
+    '^${name} +${addr}',
+    '^.*${num}$$',
+    '^word ${word}',
+    '^(n|w)\\w+ ${word}',
+    '^  ${name}',
+    '^end',
+    '^x',
+    '^$$',
+]
+rule_actions = ['', ' -> Record', ' -> Continue', ' -> Next.Record',
+                ' -> Continue.Record', ' -> Clear', ' -> Clearall',
+                ' -> Next.Clear', ' -> Next.NoRecord', ' -> {state}',
+                ' -> Record {state}', ' -> End', ' -> Error']
+
+words = ['name', 'num', 'word', 'abc', '12', '1.5', 'end', 'x', 'xy', 'w1',
+         'nn', '  ', ' ', '']
+
+
+def create_template(rand):
+    lines = []
+    for value in values:
+        option = rand.choice(value_options)
+        lines.append(value.format(option))
+    lines.append('')
+
+    states = ['Start', 'Other']
+    for state in states:
+        lines.append(state)
+        for _ in range(rand.randint(1, 7)):
+            action = rand.choice(rule_actions)
+            if '{state}' in action:
+                action = action.format(state=rand.choice(states))
+            lines.append('  {}{}'.format(rand.choice(rule_matches), action))
+        lines.append('')
+    if rand.random() < 0.3:
+        lines.append('EOF')
+    return '\n'.join(lines).strip()
+
+
+def create_text(rand):
+    lines = []
+    for _ in range(rand.randint(0, 25)):
+        count = rand.randint(1, 3)
+        lines.append(' '.join(rand.choice(words) for _ in range(count)))
+    return '\n'.join(lines)
+
+
+def parse(cls, template, text):
+    try:
+        parser = cls(io.StringIO(template))
+    except Exception as ex:
+        return 'template-error', type(ex).__name__
+    try:
+        return parser.ParseText(text)
+    except TextFSMError as ex:
+        return 'parse-error', str(ex)
+
+
+class TestRenameGroups:
+    @pytest.mark.parametrize(
+        ('pattern', 'expected'),
+        [
+            ('^(?P<a>\\S+) (?P<b>x)', '^(?P<_0_a>\\S+) (?P<_0_b>x)'),
+            ('^\\(?P<a>x)', '^\\(?P<a>x)'),
+            ('^[(?P<a>]+(?P<a>x)', '^[(?P<a>]+(?P<_0_a>x)'),
+            ('^[]x](?P<a>x)', '^[]x](?P<_0_a>x)'),
+        ]
+    )
+    def test_rename_groups(self, pattern, expected):
+        assert rename_groups(pattern, '_0_') == expected
+
+
+class TestAlternationTextFSM:
+    def test_differential_against_textfsm(self):
+        rand = random.Random(16)
+        compared_count, combined_count = 0, 0
+        for _ in range(300):
+            template = create_template(rand)
+            for _ in range(5):
+                text = create_text(rand)
+                expected = parse(TextFSM, template, text)
+                assert parse(AlternationTextFSM, template, text) == expected
+                assert parse(PrefilterAlternationTextFSM,
+                             template, text) == expected
+                if isinstance(expected, list) and expected:
+                    compared_count += 1
+            parser = AlternationTextFSM(io.StringIO(template))
+            matchers = parser.matchers.values()
+            combined_count += sum(1 for item in matchers if item)
+        assert compared_count > 200
+        assert combined_count > 500
+
+    def test_fallback_state(self):
+        template = ('Value a (\\S+)\n\nStart\n'
+                    '  ^(?P<x>a)(?P=x) ${a} -> Record\n'
+                    '  ^b ${a} -> Record')
+        parser = AlternationTextFSM(io.StringIO(template))
+        assert build_state_matchers(parser)['Start'] is None
+        assert parser.ParseText('aa 1\nb 2') == [['1'], ['2']]
+
+    def test_get_parser_class(self):
+        assert get_parser_class() is TextFSM
+        assert get_parser_class('alternation') is AlternationTextFSM
+        cls = get_parser_class('alternation', True)
+        assert cls is PrefilterAlternationTextFSM
+        with pytest.raises(ValueError):
+            get_parser_class('unknown')
+
+    def test_template_builder(self):
+        user_data = 'name word(var_name) digits(var_count) -> Record'
+        test_data = 'name abc 1\nname xyz 2'
+        factory = TemplateBuilder(user_data=user_data, test_data=test_data,
+                                  engine='alternation')
+        assert isinstance(factory.template_parser, AlternationTextFSM)
+        assert factory.template_parser.matchers['Start']
+        assert factory.verify(expected_rows_count=2)
+        assert factory.parser.engine == 'alternation'
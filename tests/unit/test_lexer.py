@@ -0,0 +1,115 @@
+import re
+import random
+import pytest
+
+from templateapp import ParsedLine
+from templateapp.lexer import tokenize
+from templateapp.lexer import tokenize_by_regex
+from templateapp.lexer import is_a_word
+from templateapp.lexer import is_not_containing_letter
+
+
+samples = [
+    '',
+    '  ',
+    'abc xyz',
+    'ignore_case__ abc xyz',
+    'ignore_case__ abc xyz -> Record',
+    'IGNORE_CASE___ abc -> next.record',
+    'comment__ Title column',
+    'Comment___ Title column',
+    'comment__',
+    'comment__  two spaces',
+    'comment_ one underscore',
+    'keep__ =+ +=+ +=+',
+    'KEEP__ ^abc',
+    'keeper__ abc',
+    'abc -> ',
+    'abc ->',
+    'abc -> continue.clearall',
+    'abc -> Continue.NoRecord State2',
+    'abc -> error "bad line"',
+    'abc -> next.bogus',
+    'abc -> clearall',
+    'abc -> clear',
+    'abc -> norecord Next',
+    'abc -> Record\n x',
+    'abc -> record\n x',
+    'a -> b -> record',
+    'digits(var_x) -> Record  End',
+    'multi\nline -> Record',
+    'ignore_case__ multi\nline',
+    'ſomething -> ſomething',
+    'ignore_ſase__ abc',
+    'Keep__ abc -> RECORD',
+    'abc -> Keep',
+    'abc -> neℯt.record',
+    'İgnore_case__ abc',
+    'Start',
+    'abc_xyz',
+    'abc.xyz',
+    'a',
+    'a²',
+    'Kbc',
+    '.*',
+    '==== ======= ===',
+    'ééé',
+    'KK',
+]
+
+
+def is_a_word_by_regex(text):
+    return bool(re.match(r'[a-z]\w+$', text.rstrip(), re.I))
+
+
+def is_not_containing_letter_by_regex(line):
+    return bool(re.match(r'[^a-z0-9]+$', line, re.I))
+
+
+def random_text(rnd):
+    pieces = [
+        'ignore_case', 'comment', 'keep', 'IGNORE_CASE', 'Keep', '_', '__',
+        '___', ' ', '  ', ' -> ', '->', 'record', 'Next', 'continue', '.',
+        'clearall', 'NoRecord', 'error', 'State', 'abc', 'x9', '\n', '\t',
+        'ſ', 'K', 'İ', '²', '=', '(', ')', '$', '^',
+        'digits(var_x)', 'é'
+    ]
+    return ''.join(rnd.choice(pieces) for _ in range(rnd.randint(0, 8)))
+
+
+class TestTokenize:
+    @pytest.mark.parametrize('text', samples)
+    def test_same_as_regex(self, text):
+        assert tokenize(text) == tokenize_by_regex(text)
+
+    @pytest.mark.parametrize('text', samples)
+    def test_predicates_same_as_regex(self, text):
+        assert is_a_word(text) == is_a_word_by_regex(text)
+        line = tokenize(text).line
+        assert (is_not_containing_letter(line)
+                == is_not_containing_letter_by_regex(line))
+
+    def test_randomized_equivalence(self):
+        rnd = random.Random(2021)
+        for _ in range(20000):
+            text = random_text(rnd)
+            assert tokenize(text) == tokenize_by_regex(text), repr(text)
+            assert is_a_word(text) == is_a_word_by_regex(text), repr(text)
+            line = tokenize(text).line
+            expected = is_not_containing_letter_by_regex(line)
+            assert is_not_containing_letter(line) == expected, repr(text)
+
+
+class TestParsedLineEquivalence:
+    @pytest.mark.parametrize('text', samples)
+    def test_parsed_line(self, text):
+        token = tokenize_by_regex(text)
+        obj = ParsedLine(text)
+        assert obj.line == token.line
+        assert obj.template_op == token.template_op
+        assert obj.ignore_case == (token.flag == 'ignore_case')
+        assert obj.is_comment == (token.flag == 'comment')
+        assert obj.is_kept == (token.flag == 'keep')
+        if obj.is_comment:
+            prefix = '  ' if token.flag_text.count('_') == 2 else ''
+            assert obj.comment_text == '{}# {}'.format(prefix, token.line)
@@ -0,0 +1,97 @@
+import io
+import pytest
+from textfsm import TextFSM
+
+from templateapp import TemplateBuilder
+from templateapp.optimizer import is_disjoint
+from templateapp.optimizer import reorder
+from templateapp.optimizer import optimize_template
+
+
+template = '''Value name (\\S+)
+Value num (\\d+)
+
+Start
+  ^Name: ${name}
+  ^Num: ${num} -> Record
+  ^${num} ${name} -> Record
+  ^Total: ${num}
+'''
+
+text = 'Name: a\nNum: 1\n' + 'Total: 5\n' * 20 + '5 x\n' * 40
+
+
+def parse(tmpl, data):
+    return TextFSM(io.StringIO(tmpl)).ParseText(data)
+
+
+class TestIsDisjoint:
+    @pytest.mark.parametrize(
+        ('pattern', 'other', 'expected'),
+        [
+            ('^Title', '^Price', True),
+            ('^Ti', '^Title', False),
+            ('^(?P<num>\\d+) x', '^Name', True),
+            ('^(?P<name>\\S+)', '^Name', False),
+            ('^ +x', '^Name', True),
+            ('^\\s*x', '^ y', False),
+            ('^$', '^a', False),
+            ('^a|b', '^b', False),
+            ('^(?i)name', '^Total', False),
+        ]
+    )
+    def test_is_disjoint(self, pattern, other, expected):
+        assert is_disjoint(pattern, other) is expected
+        assert is_disjoint(other, pattern) is expected
+
+
+class TestReorder:
+    def test_unswappable_rules_keep_order(self):
+        order = reorder('abcd', [1, 5, 3, 9], lambda x, y: {x, y} != {0, 3})
+        assert order == [1, 2, 0, 3]
+
+    def test_stable_for_equal_hits(self):
+        assert reorder('abc', [2, 2, 2], lambda x, y: True) == [0, 1, 2]
+
+
+class TestOptimizeTemplate:
+    def test_reorder_disjoint_rules(self):
+        result = optimize_template(template, [text], repeat=1)
+        assert result.is_changed
+        assert result.orders == {'Start': [2, 3, 0, 1]}
+        assert not result.is_corpus_checked
+        assert result.attempts[1] < result.attempts[0]
+        assert parse(result.template, text) == parse(template, text)
+        assert 'Speedup' in result.report()
+
+    def test_corpus_check(self):
+        tmpl = ('Value name (\\S+)\n\nStart\n'
+                '  ^\\s*a ${name} -> Record\n'
+                '  ^\\s*b ${name} -> Record\n')
+        data = 'a 1\n' + ' b 2\n' * 5
+        result = optimize_template(tmpl, [data], check_corpus=False, repeat=1)
+        assert not result.is_changed
+
+        result = optimize_template(tmpl, [data], repeat=1)
+        assert result.orders == {'Start': [1, 0]}
+        assert result.is_corpus_checked
+        assert parse(result.template, data) == parse(tmpl, data)
+
+    def test_overlapping_rules_are_kept(self):
+        tmpl = ('Value name (\\S+)\n\nStart\n'
+                '  ^Name ${name} -> Record\n'
+                '  ^${name} -> Record\n')
+        result = optimize_template(tmpl, ['x\n' * 5 + 'Name y\n'], repeat=1)
+        assert not result.is_changed
+        assert result.template == tmpl
+
+
+class TestTemplateBuilderOptimize:
+    def test_optimize_corpus_files(self, tmp_path):
+        user_data = ('Name: word(var_name) -> record\n'
+                     'Total: digits(var_num) -> record')
+        factory = TemplateBuilder(user_data=user_data)
+        (tmp_path / 'a.txt').write_text('Name: a\n' + 'Total: 1\n' * 10)
+        result = factory.optimize(str(tmp_path), repeat=1)
+        assert result.orders == {'Start': [1, 0]}
+        assert result.original == factory.template
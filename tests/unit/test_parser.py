@@ -0,0 +1,183 @@
+import io
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from textwrap import dedent
+from textfsm import TextFSM
+
+from templateapp.parser import iter_lines
+from templateapp.parser import iter_rows
+from templateapp.parser import iter_records
+from templateapp.parser import TemplateParser
+from templateapp.parser import Columns
+from templateapp.parser import iter_columns
+from templateapp.parser import get_parser
+from templateapp.parser import parser_cache
+from templateapp import TemplateBuilder
+
+
+template = """
+    Value Filldown iface (\\S+)
+    Value addr (\\S+)
+
+    Start
+      ^interface ${iface}
+      ^  address ${addr} -> Record
+      ^end -> End
+"""
+
+fillup_template = """
+    Value Fillup vlan (\\d+)
+    Value port (\\S+)
+
+    Start
+      ^port ${port} -> Record
+      ^vlan ${vlan}
+"""
+
+test_data = """
+    interface eth0
+      address 10.0.0.1
+      address 10.0.0.2
+
+    interface eth1
+      address 10.0.1.1
+    end
+    interface eth2
+      address 10.0.2.1
+"""
+
+fillup_data = """
+    port p1
+    port p2
+    vlan 10
+    port p3
+"""
+
+
+def create_parser(content):
+    return TextFSM(io.StringIO(dedent(content).strip()))
+
+
+class TestIterLines:
+    @pytest.mark.parametrize(
+        'data',
+        ['', 'a', 'a\nb\n', 'a\r\nb\rc', 'a\n\n\nb', 'a\x0cb\n\n', '\n']
+    )
+    def test_same_as_splitlines(self, data, tmp_path):
+        assert list(iter_lines(data)) == data.splitlines()
+
+        node = tmp_path / 'data.txt'
+        node.write_bytes(data.encode())
+        assert list(iter_lines(node)) == data.splitlines()
+
+        with open(node) as stream:
+            assert list(iter_lines(stream)) == data.splitlines()
+
+
+class TestIterRows:
+    @pytest.mark.parametrize(
+        ('content', 'data'),
+        [
+            (template, test_data),
+            (fillup_template, fillup_data),
+        ]
+    )
+    def test_same_as_parse_text(self, content, data):
+        data = dedent(data).strip()
+        expected = create_parser(content).ParseText(data)
+        result = list(iter_rows(create_parser(content), data))
+        assert result == expected
+        assert len(result) > 0
+
+    def test_records_are_streamed(self):
+        parser = create_parser(template)
+        lines = iter(dedent(test_data).strip().splitlines(True))
+        records = iter_records(parser, lines)
+        first = next(records)
+        assert first == dict(iface='eth0', addr='10.0.0.1')
+        assert len(list(lines)) > 0
+
+    def test_reusing_parser(self):
+        parser = create_parser(template)
+        data = dedent(test_data).strip()
+        assert list(iter_rows(parser, data)) == list(iter_rows(parser, data))
+
+
+class TestColumns:
+    def test_iter_columns(self):
+        data = dedent(test_data).strip()
+        expected = create_parser(template).ParseTextToDicts(data)
+        columns = iter_columns(create_parser(template), data)
+        assert columns == expected
+        assert columns.to_records() == expected
+        assert columns.header == ['iface', 'addr']
+        assert columns.column('iface') == [row['iface'] for row in expected]
+        assert [dict(row) for row in columns] == expected
+        assert columns[-1] == expected[-1]
+        assert columns[1:3] == expected[1:3]
+
+    def test_comparison(self):
+        records = [dict(a='1', b='x'), dict(a='2', b='y')]
+        columns = Columns.from_records(records)
+        assert columns == Columns.from_records(records)
+        assert columns != records[:1]
+        assert columns != [dict(a='1', b='x'), dict(a='2', b='z')]
+        assert columns != [dict(a='1', b='x'), dict(a='2', b='y', c='')]
+        assert records == columns
+
+    def test_empty(self):
+        columns = Columns(['a'])
+        assert len(columns) == 0
+        assert not columns
+        assert columns == []
+
+
+class TestTemplateParser:
+    def test_parse_is_repeatable(self):
+        content = dedent(template).strip()
+        data = dedent(test_data).strip()
+        parser = TemplateParser(content)
+        expected = create_parser(template).ParseTextToDicts(data)
+        assert parser.parse(data) == expected
+        assert parser.parse(data) == expected
+        assert list(parser.iter_records(data)) == expected
+        expected_rows = create_parser(template).ParseText(data)
+        assert parser.parse_rows(data) == expected_rows
+
+    def test_thread_local_copy(self):
+        content = dedent(template).strip()
+        data = dedent(test_data).strip()
+        parser = TemplateParser(content)
+        expected = parser.parse(data)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(parser.parse, [data] * 40))
+            others = set(executor.map(lambda _: id(parser.parser), range(8)))
+        assert all(result == expected for result in results)
+        assert id(parser.parser) not in others
+
+    def test_get_parser_is_shared(self):
+        content = dedent(template).strip()
+        assert get_parser(content) is get_parser(content)
+
+    def test_get_parser_factory(self):
+        content = dedent(template).strip() + '\n'
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return TextFSM(io.StringIO(content))
+
+        misses = parser_cache.misses
+        obj = get_parser(content, parser_factory=factory)
+        assert get_parser(content, parser_factory=factory) is obj
+        assert calls == [1]
+        assert parser_cache.misses == misses + 1
+
+    def test_template_builder_parser(self):
+        user_data = 'name word(var_name) -> Record'
+        factory = TemplateBuilder(user_data=user_data)
+        other = TemplateBuilder(user_data=user_data)
+        assert factory.parser is other.parser
+        assert factory.parser.parse('name abc') == [dict(name='abc')]
+        assert factory.parser.parser is not factory.template_parser
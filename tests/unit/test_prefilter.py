@@ -0,0 +1,122 @@
+import io
+import random
+import pytest
+from textwrap import dedent
+from textfsm import TextFSM
+
+from templateapp import TemplateBuilder
+from templateapp.prefilter import get_required_literal
+from templateapp.prefilter import build_state_filters
+from templateapp.prefilter import PrefilterTextFSM
+from templateapp.parser import iter_rows
+
+
+templates = [
+    """
+    Value Required iface (\\S+)
+    Value addr (\\S+)
+    Value List vlans (\\d+)
+
+    Start
+      ^interface ${iface}
+      ^ ip address ${addr}
+      ^ vlan ${vlans} -> Continue
+      ^ vlan \\d+ ${vlans}
+      ^! -> Record
+    """,
+    """
+    Value Filldown chassis (\\S+)
+    Value slot (\\d+)
+    Value state (\\w+)
+
+    Start
+      ^Chassis: ${chassis}
+      ^Slot Table -> Slots
+
+    Slots
+      ^ +${slot} +${state} -> Record
+      ^End of table -> Start
+    """,
+    """
+    Value name (\\S+)
+
+    Start
+      ^\\s*(?i:name:)\\s*${name} -> Record
+    """,
+    """
+    Value name (\\S+)
+
+    Start
+      ^Name: ${name} -> Record
+      ^DONE -> End
+    """,
+]
+
+words = ['interface', ' ip address', ' vlan', '!', 'Chassis:', 'Slot Table',
+         'End of table', 'NAME:', 'Name:', 'DONE', 'noise', 'eth0', '10',
+         '1.1.1.1', 'up', ' ', '  ', '\r', '\x0c', 'x']
+
+
+def create_parser(cls, content):
+    return cls(io.StringIO(dedent(content).strip()))
+
+
+def create_text(rand):
+    lines = []
+    for _ in range(rand.randint(0, 30)):
+        count = rand.randint(1, 4)
+        lines.append(' '.join(rand.choice(words) for _ in range(count)))
+    return '\n'.join(lines)
+
+
+class TestRequiredLiteral:
+    @pytest.mark.parametrize(
+        ('pattern', 'expected'),
+        [
+            (r'^Title +Price +Genre', 'Title'),
+            (r'^interface (?P<x>\S+)', 'interface '),
+            (r'^(?:ab|cd)xyz', 'xyz'),
+            (r'^a(bcd)?', 'a'),
+            (r'^.*foo(?i:bar)', 'foo'),
+            (r'(?i)^abc', ''),
+            (r'^\s*$', ''),
+            (r'^(', ''),
+        ]
+    )
+    def test_get_required_literal(self, pattern, expected):
+        assert get_required_literal(pattern) == expected
+
+    def test_unfiltered_state(self):
+        parser = create_parser(TextFSM, templates[2])
+        assert build_state_filters(parser)['Start'] is None
+
+
+class TestPrefilterTextFSM:
+    @pytest.mark.parametrize('content', templates)
+    def test_same_as_textfsm(self, content):
+        rand = random.Random(15)
+        expected_parser = create_parser(TextFSM, content)
+        parser = create_parser(PrefilterTextFSM, content)
+        for _ in range(300):
+            text = create_text(rand)
+            expected_parser.Reset()
+            expected = expected_parser.ParseText(text)
+            parser.Reset()
+            assert parser.ParseText(text) == expected
+            assert list(iter_rows(parser, text)) == expected
+
+    def test_template_builder(self):
+        user_data = dedent("""
+            Title   Price   Genre
+            mixed_words(var_title)  number(var_price)  words(var_genre)
+        """).strip() + ' -> Record'
+        test_data = dedent("""
+            ! irrelevant line
+            Title                   Price       Genre
+            Midnight Rain           5.95        Fantasy
+        """).strip()
+        factory = TemplateBuilder(user_data=user_data, test_data=test_data,
+                                  prefilter=True)
+        assert isinstance(factory.template_parser, PrefilterTextFSM)
+        assert factory.verify(expected_rows_count=1)
+        assert factory.parser.prefilter
@@ -0,0 +1,77 @@
+import io
+import json
+import pytest
+
+from templateapp import TemplateBuilder
+from templateapp.profiler import ProfilingTextFSM
+
+
+template = '''Value name (\\S+)
+Value num (\\d+)
+
+Start
+  ^name ${name} -> Continue
+  ^name \\w+ ${num} -> Record
+  ^never ${num}
+'''
+
+text = 'name a 1\nname b 2\nfoo\n'
+
+
+class TestProfilingTextFSM:
+    def test_counters(self):
+        parser = ProfilingTextFSM(io.StringIO(template))
+        rows = parser.ParseText(text)
+        assert rows == [['a', '1'], ['b', '2']]
+
+        profile = parser.profile
+        stats = list(profile.rules.values())
+        assert profile.lines_count == 3
+        assert [(item.attempts, item.hits) for item in stats] == [
+            (3, 2), (3, 2), (1, 0)
+        ]
+        assert stats[1].values == ['num']
+        assert [item.name for item in profile.dead_rules] == ['Start[2]']
+        assert all(item.worst <= item.total for item in stats)
+        assert stats[2].miss == stats[2].total
+
+    def test_report_and_json(self, tmp_path):
+        parser = ProfilingTextFSM(io.StringIO(template))
+        parser.ParseText(text)
+        profile = parser.profile
+        order = [item.name for item in profile.sorted_rules('attempts')]
+        assert order[-1] == 'Start[2]'
+        assert 'Dead rules: Start[2]' in profile.report()
+        with pytest.raises(ValueError):
+            profile.sorted_rules('unknown')
+
+        filename = str(tmp_path / 'profile.json')
+        profile.dump(filename)
+        with open(filename) as stream:
+            data = json.load(stream)
+        assert data['lines_count'] == 3
+        assert data['dead_rules'] == ['Start[2]']
+        assert set(data['value_costs']) == {'name', 'num'}
+
+        profile.reset()
+        assert profile.lines_count == 0
+        assert profile.dead_rules == []
+
+
+class TestTemplateBuilderProfile:
+    def test_verify_with_profile_rules(self):
+        user_data = 'name word(var_name) digits(var_num) -> record'
+        factory = TemplateBuilder(user_data=user_data,
+                                  test_data='name a 1\nname b 2\nfoo')
+        assert factory.rule_profile is None
+        assert factory.verify(expected_rows_count=2, profile_rules=True)
+        stats = list(factory.rule_profile.rules.values())
+        assert stats[0].hits == 2
+        assert stats[0].attempts == 3
+
+    def test_profile_rules_of_source(self):
+        user_data = 'name word(var_name) digits(var_num) -> record'
+        factory = TemplateBuilder(user_data=user_data)
+        profile = factory.profile_rules(io.StringIO('name a 1\n' * 50))
+        assert profile is factory.rule_profile
+        assert profile.lines_count == 50
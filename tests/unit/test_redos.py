@@ -0,0 +1,127 @@
+import re
+import pytest
+
+from templateapp import TemplateBuilder
+from templateapp.redos import analyze_pattern
+from templateapp.redos import analyze_template
+from templateapp.redos import get_first_chars
+from templateapp.redos import sre_parse
+from templateapp.redos import get_group_prefix
+from templateapp.redos import fuzz
+from templateapp.redos import compile_failing
+from templateapp.redos import report
+from templateapp.redos import EXPONENTIAL
+from templateapp.redos import POLYNOMIAL
+from templateapp.redos import LINEAR
+
+
+class TestAnalyzePattern:
+    @pytest.mark.parametrize(
+        ('pattern', 'severity'),
+        [
+            ('(a+)+', EXPONENTIAL),
+            ('(\\w+,?)+', EXPONENTIAL),
+            ('(x\\w|\\wy)+', EXPONENTIAL),
+            ('(\\S*[a-zA-Z0-9]\\S*( \\S*[a-zA-Z0-9]\\S*)*)', POLYNOMIAL),
+            ('\\w+\\s*\\w+', POLYNOMIAL),
+            ('.*\\S+', POLYNOMIAL),
+        ]
+    )
+    def test_flagged_pattern(self, pattern, severity):
+        issues = analyze_pattern(pattern)
+        assert issues
+        assert severity in [issue.severity for issue in issues]
+
+    @pytest.mark.parametrize(
+        'pattern',
+        [
+            '\\S+',
+            '\\d+\\.\\d+',
+            '[a-z]+( [a-z]+)*',
+            '\\w+ +\\d+',
+            '(\\d+)?',
+            '(?:a++)+',
+        ]
+    )
+    def test_linear_pattern(self, pattern):
+        assert analyze_pattern(pattern) == []
+
+    @pytest.mark.parametrize(
+        ('pattern', 'expected'),
+        [
+            ('(a?)b\\S*', {'a', 'b'}),
+            ('(?:a|)b', {'a', 'b'}),
+            ('(a?)+b', {'a', 'b'}),
+            ('(a)b', {'a'}),
+        ]
+    )
+    def test_get_first_chars(self, pattern, expected):
+        assert get_first_chars(sre_parse.parse(pattern)) == expected
+
+    def test_get_group_prefix(self):
+        pattern = '^Name: +(?P<name>\\S+) (?P<num>\\d+)'
+        assert get_group_prefix(pattern, 'num') == 'Name: a '
+
+
+class TestFuzz:
+    def test_exponential_growth(self):
+        regex = re.compile('(?:(a+)+)(?!)')
+        curve = fuzz(regex, '', 'a', EXPONENTIAL, budget=0.1)
+        assert curve.complexity == EXPONENTIAL
+
+    def test_linear_growth(self):
+        regex = re.compile('(?:\\w+)(?!)')
+        curve = fuzz(regex, '', 'a', POLYNOMIAL, budget=0.1)
+        assert curve.complexity == LINEAR
+
+
+class TestAnalyzeTemplate:
+    def test_static_findings(self):
+        template = ('Value name ((\\w+,?)+)\n'
+                    'Value num (\\d+)\n\n'
+                    'Start\n'
+                    '  ^x ${name}$$ -> Record\n'
+                    '  ^${num} -> Record\n')
+        findings = analyze_template(template)
+        names = [finding.name for finding in findings]
+        assert names == ['name', 'Start[0] ^x ${name}$$']
+        assert findings[0].severity == EXPONENTIAL
+        assert findings[0].curve is None
+        assert 'name - exponential risk' in report(findings)
+
+    def test_fuzzing_confirms_value(self):
+        template = 'Value name ((\\w+,?)+)\n\nStart\n  ^${name}$$ -> Record\n'
+        findings = analyze_template(template, fuzzing=True, budget=0.1)
+        assert findings[0].is_confirmed
+        assert findings[0].to_dict()['complexity'] == EXPONENTIAL
+
+    def test_fuzzing_confirms_rule_which_matches_suffix(self):
+        template = ('Value name ((\\S+\\s?)+)\n\n'
+                    'Start\n  ^name ${name}$$ -> Record\n')
+        findings = analyze_template(template, fuzzing=True, budget=0.1)
+        assert [finding.is_confirmed for finding in findings] == [True, True]
+        assert findings[1].curve.complexity == EXPONENTIAL
+
+    def test_compile_failing_keeps_inline_flag(self):
+        regex = compile_failing('^(?i)name (?P<name>\\S+)')
+        assert regex.flags & re.IGNORECASE
+        assert regex.search('NAME a') is None
+
+    def test_no_finding(self):
+        template = 'Value num (\\d+)\n\nStart\n  ^${num} -> Record\n'
+        assert analyze_template(template) == []
+        assert report([]) == 'No catastrophic-backtracking risk is found.'
+
+
+class TestTemplateBuilderRedos:
+    def test_check_redos_at_build(self):
+        user_data = 'mixed_words(var_title)   digits(var_count)'
+        factory = TemplateBuilder(user_data=user_data, check_redos=True)
+        names = [finding.name for finding in factory.redos_findings]
+        assert 'title' in names
+        assert 'count' not in names
+
+    def test_analyze_redos_is_off_by_default(self):
+        factory = TemplateBuilder(user_data='digits(var_count)')
+        assert factory.redos_findings == []
+        assert factory.analyze_redos() == []
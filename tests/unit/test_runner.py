@@ -0,0 +1,121 @@
+import io
+import json
+import pytest
+
+from templateapp import TemplateBuilder
+from templateapp.main import Cli
+from templateapp.parser import TemplateParser
+from templateapp.runner import parse_files
+from templateapp.sink import get_sink
+
+
+template = TemplateBuilder(user_data='x digits(var_num) -> record').template
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    folder = tmp_path / 'inputs'
+    (folder / 'sub').mkdir(parents=True)
+    (folder / 'a.txt').write_text('x 1\nfoo\nx 2\n')
+    (folder / 'sub' / 'b.txt').write_text('x 3\n')
+    return folder
+
+
+class TestParseFiles:
+    @pytest.mark.parametrize('workers', [None, 2])
+    def test_parse_files(self, inputs, workers):
+        stream = io.StringIO()
+        parser = TemplateParser(template)
+        sink = get_sink('jsonl', stream, parser.header + ['file'])
+        paths = [str(inputs), str(inputs / 'missing.txt')]
+        summary = parse_files(parser, paths, sink, workers=workers,
+                              source_field='file')
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        files = [record['file'] for record in records]
+        assert [record['num'] for record in records if 'a.txt' in
+                record['file']] == ['1', '2']
+        assert files.count(str(inputs / 'sub' / 'b.txt')) == 1
+        assert summary.rows_count == 3
+        assert list(summary.errors) == [str(inputs / 'missing.txt')]
+        assert 'rows/s' in summary.report()
+
+    def test_pool_sends_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('templateapp.runner.CHUNK_SIZE', 2)
+        filename = tmp_path / 'many.txt'
+        filename.write_text(''.join('x {}\n'.format(i) for i in range(25)))
+        stream = io.StringIO()
+        parser = TemplateParser(template, prefilter=True)
+        sink = get_sink('jsonl', stream, parser.header)
+        summary = parse_files(parser, str(filename), sink, workers=2)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        expected = [str(i) for i in range(25)]
+        assert [record['num'] for record in records] == expected
+        assert summary.is_success
+
+    def test_pool_stops_on_sink_error(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('templateapp.runner.CHUNK_SIZE', 1)
+        for index in range(4):
+            filename = tmp_path / 'many{}.txt'.format(index)
+            filename.write_text('x 1\n' * 50)
+        parser = TemplateParser(template)
+        sink = get_sink('jsonl', io.StringIO(), parser.header)
+        monkeypatch.setattr(sink, 'write_record', None)
+        with pytest.raises(TypeError):
+            parse_files(parser, str(tmp_path), sink, workers=2)
+
+
+class TestCliParse:
+    def test_template_file_to_csv(self, inputs, tmp_path, capsys):
+        filename = tmp_path / 'numbers.textfsm'
+        filename.write_text(template)
+        with pytest.raises(SystemExit) as ex:
+            Cli(['parse', '--template', str(filename), '--format', 'csv',
+                 str(inputs / '**' / '*.txt')]).run()
+        assert ex.value.code == 0
+        captured = capsys.readouterr()
+        assert captured.out == 'num\n1\n2\n3\n'
+        assert 'Files: 2, failed: 0, rows: 3' in captured.err
+
+    @pytest.mark.parametrize(
+        'args',
+        [
+            ['--format', 'csv', 'parse'],
+            ['parse', '--format', 'csv'],
+        ]
+    )
+    def test_format_before_or_after_subcommand(self, inputs, tmp_path,
+                                               capsys, args):
+        filename = tmp_path / 'numbers.textfsm'
+        filename.write_text(template)
+        with pytest.raises(SystemExit) as ex:
+            Cli(args + ['-q', '--template', str(filename), str(inputs)]).run()
+        assert ex.value.code == 0
+        assert capsys.readouterr().out == 'num\n1\n2\n3\n'
+
+    @pytest.mark.parametrize(
+        'args',
+        [
+            ['-j', '2', '--engine', 'alternation', 'parse'],
+            ['parse', '-j', '2', '--engine', 'alternation'],
+        ]
+    )
+    def test_shared_options_before_or_after_subcommand(self, args):
+        options = Cli(args + ['--template', 'x.textfsm', 'a.txt']).options
+        assert options.jobs == 2
+        assert options.engine == 'alternation'
+
+    def test_subcommand_defaults(self):
+        options = Cli(['parse', '--template', 'x.textfsm', 'a.txt']).options
+        assert options.jobs is None
+        assert options.engine == 'textfsm'
+        assert Cli(['serve']).options.jobs == 8
+        assert Cli(['-j', '2', 'serve']).options.jobs == 2
+        options = Cli(['--config', 'author: user1', 'build', '--input-dir',
+                       'in', '--output-dir', 'out']).options
+        assert options.config == 'author: user1'
+
+    def test_sqlite_requires_output(self, inputs, capsys):
+        with pytest.raises(SystemExit) as ex:
+            Cli(['parse', '--name', 'numbers', '--format', 'sqlite',
+                 str(inputs)]).run()
+        assert ex.value.code == 1
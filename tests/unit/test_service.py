@@ -0,0 +1,192 @@
+import io
+import json
+import time
+import socket
+import pytest
+
+from templateapp import TemplateBuilder
+from templateapp.main import Cli
+from templateapp.registry import TemplateRegistry
+from templateapp.registry import load_user_templates
+from templateapp.service import ParseClient
+from templateapp.service import ServiceError
+from templateapp.service import create_server
+from templateapp.service import start_server
+
+
+template = TemplateBuilder(user_data='x digits(var_num) -> record').template
+text = 'x 1\nfoo\nx 2\n'
+
+
+@pytest.fixture
+def registry():
+    obj = TemplateRegistry()
+    obj.add('numbers', template)
+    return obj
+
+
+@pytest.fixture(params=['unix', 'tcp'])
+def client(request, registry, tmp_path):
+    if request.param == 'unix':
+        socket_path = str(tmp_path / 'parse.sock')
+        server = create_server(registry, socket_path=socket_path)
+        obj = ParseClient(socket_path=server.server_address, timeout=5)
+    else:
+        server = create_server(registry, port=0)
+        obj = ParseClient(port=server.server_address[1], timeout=5)
+    start_server(server)
+    yield obj
+    server.shutdown()
+    server.server_close()
+
+
+class TestTemplateRegistry:
+    def test_load_files(self, tmp_path):
+        (tmp_path / 'numbers.textfsm').write_text(template)
+        (tmp_path / 'broken.textfsm').write_text('Value x (\n')
+        registry = TemplateRegistry()
+        assert registry.load_files(str(tmp_path)) == ['numbers']
+        assert 'broken' in registry.errors
+        assert registry.get('numbers').parse(text) == [{'num': '1'},
+                                                       {'num': '2'}]
+
+    def test_load_user_templates(self, tmp_path):
+        filename = tmp_path / 'user_templates.yaml'
+        filename.write_text('numbers: |\n{}'.format(
+            ''.join('  {}\n'.format(line) for line in template.splitlines()))
+        )
+        registry = TemplateRegistry()
+        assert registry.load_user_templates(str(filename)) == ['numbers']
+        assert load_user_templates(str(tmp_path / 'missing.yaml')) == {}
+
+    def test_unknown_name(self, registry):
+        with pytest.raises(KeyError):
+            registry.get('unknown')
+
+
+class TestParseService:
+    def test_parse(self, client):
+        assert client.parse('numbers', text) == [{'num': '1'}, {'num': '2'}]
+        lines = client.parse('numbers', text, fmt='jsonl').splitlines()
+        assert [json.loads(line) for line in lines] == [{'num': '1'},
+                                                        {'num': '2'}]
+        assert client.parse('numbers', text, fmt='csv') == 'num\n1\n2\n'
+
+    def test_verify(self, client):
+        result = client.verify('numbers', text, expected_rows_count=2)
+        assert result['is_verified'] is True
+        result = client.verify('numbers', text,
+                               expected_result=[{'num': '1'}, {'num': '3'}])
+        assert result['is_verified'] is False
+        assert result['message']
+
+    def test_register_and_errors(self, client):
+        client.register('words', template.replace('\\d+', '\\w+'))
+        assert client.templates() == ['numbers', 'words']
+        with pytest.raises(ServiceError) as ex:
+            client.parse('unknown', text)
+        assert ex.value.status == 404
+        with pytest.raises(ServiceError) as ex:
+            client.register('broken', 'Value x (\n')
+        assert ex.value.status == 400
+
+    def test_error_after_first_record(self, client, registry,
+                                      tmp_path, monkeypatch, capsysbinary):
+        lst = template.splitlines()
+        lst.insert(lst.index('Start') + 1, '  ^boom -> Error')
+        registry.add('boom', '\n'.join(lst) + '\n')
+        data = 'x 1\n' * 2000 + 'boom\n'
+        with pytest.raises(ServiceError) as ex:
+            client.parse('boom', data, fmt='jsonl')
+        assert ex.value.status == 500
+
+        stdin = io.TextIOWrapper(io.BytesIO(data.encode()))
+        monkeypatch.setattr('sys.stdin', stdin)
+        args = ['client', '--name', 'boom']
+        if client.socket_path:
+            args.extend(['--socket', client.socket_path])
+        else:
+            args.extend(['--port', str(client.port)])
+        with pytest.raises(SystemExit) as ex:
+            Cli(args).run()
+        assert ex.value.code == 1
+
+    def test_cli_client(self, registry, tmp_path, monkeypatch, capsysbinary):
+        socket_path = str(tmp_path / 'parse.sock')
+        server = create_server(registry, socket_path=socket_path)
+        start_server(server)
+        try:
+            stdin = io.TextIOWrapper(io.BytesIO(text.encode()))
+            monkeypatch.setattr('sys.stdin', stdin)
+            with pytest.raises(SystemExit) as ex:
+                args = ['client', '--name', 'numbers', '--socket', socket_path]
+                Cli(args).run()
+            assert ex.value.code == 0
+            lines = capsysbinary.readouterr().out.splitlines()
+            assert [json.loads(line) for line in lines] == [{'num': '1'},
+                                                            {'num': '2'}]
+
+            stdin = io.TextIOWrapper(io.BytesIO(text.encode()))
+            monkeypatch.setattr('sys.stdin', stdin)
+            with pytest.raises(SystemExit) as ex:
+                Cli(['client', '--name', 'numbers', '--socket', socket_path,
+                     '--verify', '--expected-rows-count', '3']).run()
+            assert ex.value.code == 1
+            result = json.loads(capsysbinary.readouterr().out)
+            assert result['rows_count'] == 2
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestServiceLimits:
+    def test_refuse_non_loopback_host(self, registry):
+        with pytest.raises(ValueError):
+            create_server(registry, host='0.0.0.0', port=0)
+
+    def test_body_size_and_chunked_body(self, registry):
+        server = create_server(registry, port=0, max_body_size=64)
+        start_server(server)
+        try:
+            client = ParseClient(port=server.server_address[1], timeout=5)
+            chunks = iter([b'x 1\n', b'x 2\n'])
+            assert client.parse('numbers', chunks) == [{'num': '1'},
+                                                       {'num': '2'}]
+            with pytest.raises(ServiceError) as ex:
+                client.parse('numbers', 'x 1\n' * 100)
+            assert ex.value.status == 413
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_idle_connection_is_timed_out(self, registry):
+        server = create_server(registry, port=0, workers=1,
+                               request_timeout=0.2)
+        start_server(server)
+        try:
+            idle = socket.create_connection(server.server_address)
+            client = ParseClient(port=server.server_address[1], timeout=5)
+            assert client.templates() == ['numbers']
+            idle.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_pending_connections_are_capped(self, registry):
+        server = create_server(registry, port=0, workers=1, max_pending=1,
+                               request_timeout=1)
+        start_server(server)
+        try:
+            busy = [socket.create_connection(server.server_address)
+                    for _ in range(2)]
+            client = ParseClient(port=server.server_address[1], timeout=5)
+            with pytest.raises(ServiceError) as ex:
+                client.templates()
+            assert ex.value.status == 503
+            for sock in busy:
+                sock.close()
+            time.sleep(1.5)
+            assert client.templates() == ['numbers']
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,81 @@
+import io
+import json
+import pytest
+
+from templateapp.main import Cli
+from templateapp.sink import RecordSink
+from templateapp.sink import get_sink
+
+
+records = [dict(name='a', num='1'), dict(name='b,c', num=['2', '3'])]
+
+
+class TestSink:
+    def test_jsonl(self):
+        stream = io.StringIO()
+        with get_sink('jsonl', stream, ['name', 'num']) as sink:
+            assert sink.write_many(records) == 2
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == records
+
+    @pytest.mark.parametrize(
+        ('fmt', 'expected'),
+        [
+            ('csv', 'name,num\na,1\n"b,c","[""2"", ""3""]"\n'),
+            ('tsv', 'name\tnum\na\t1\nb,c\t"[""2"", ""3""]"\n'),
+        ]
+    )
+    def test_delimited(self, fmt, expected):
+        stream = io.StringIO()
+        sink = get_sink(fmt, stream, ['name', 'num'])
+        sink.write_many(records)
+        assert stream.getvalue() == expected
+        assert sink.count == 2
+
+    def test_sqlite(self, tmp_path):
+        import sqlite3
+        filename = tmp_path / 'records.db'
+        columns = ['name', 'num']
+        with get_sink('sqlite', filename, columns, table='rows') as sink:
+            sink.write_many(records)
+        connection = sqlite3.connect(str(filename))
+        rows = connection.execute('SELECT name, num FROM rows').fetchall()
+        connection.close()
+        assert rows == [('a', '1'), ('b,c', '["2", "3"]')]
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            get_sink('xml', io.StringIO(), [])
+
+    def test_record_sink_is_abstract(self):
+        with pytest.raises(TypeError):
+            RecordSink(io.StringIO(), ['name'])
+
+
+class TestCliStreaming:
+    def test_stdin_to_jsonl(self, monkeypatch, capsys):
+        monkeypatch.setattr('sys.stdin', io.StringIO('x 1\nfoo\nx 2\n'))
+        app = Cli(['-u', 'x digits(var_num) -> record', '-t', '-',
+                   '--format', 'jsonl'])
+        with pytest.raises(SystemExit) as ex:
+            app.run()
+        assert ex.value.code == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line) for line in lines] == [{'num': '1'},
+                                                        {'num': '2'}]
+
+    def test_file_to_csv(self, tmp_path, capsys):
+        filename = tmp_path / 'data.txt'
+        filename.write_text('x 1 a\nx 2 b\n')
+        app = Cli(['-u', 'x digits(var_num) letter(var_name) -> record',
+                   '-t', 'file::{}'.format(filename), '--format', 'csv'])
+        with pytest.raises(SystemExit):
+            app.run()
+        assert capsys.readouterr().out == 'num,name\n1,a\n2,b\n'
+
+    def test_stdin_without_format_is_read(self, monkeypatch):
+        monkeypatch.setattr('sys.stdin', io.StringIO('x 1\n'))
+        app = Cli(['-u', 'x digits(var_num)', '-t', '-'])
+        app.validate_cli_flags()
+        assert app.options.test_data == 'x 1\n'
+        assert app.test_source is None
@@ -0,0 +1,64 @@
+import sys
+import subprocess
+import pytest
+
+import templateapp
+from templateapp.config import Data
+from templateapp.config import get_package_version
+
+# cumulative import time of templateapp and templateapp.main in microseconds
+IMPORT_TIME_BUDGET = 150000
+
+HEAVY_MODULES = ['tkinter', 'regexapp', 'dlapp', 'textfsm', 'yaml',
+                 'templateapp.core', 'templateapp.application',
+                 'multiprocessing']
+
+
+def run_python(code, *options):
+    cmdline = [sys.executable] + list(options) + ['-c', code]
+    return subprocess.run(cmdline, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, universal_newlines=True,
+                          check=True)
+
+
+class TestHeadlessStartup:
+    def test_cli_import_skips_heavy_modules(self):
+        code = ('import sys, templateapp.main; '
+                'templateapp.main.Cli(["-u", "digits(var_x)"]); '
+                'print(",".join(sorted(sys.modules)))')
+        modules = run_python(code).stdout.strip().split(',')
+        assert [name for name in HEAVY_MODULES if name in modules] == []
+
+    @pytest.mark.skipif(sys.version_info < (3, 7),
+                        reason='-X importtime requires Python 3.7+')
+    def test_import_time_budget(self):
+        result = run_python('import templateapp.main', '-X', 'importtime')
+        total = 0
+        for line in result.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].strip() in ('templateapp',
+                                                        'templateapp.main'):
+                total += int(parts[1])
+        assert 0 < total < IMPORT_TIME_BUDGET
+
+    def test_package_import_skips_heavy_modules(self):
+        code = ('import sys, templateapp; '
+                'print(",".join(sorted(sys.modules)))')
+        modules = run_python(code).stdout.strip().split(',')
+        assert [name for name in HEAVY_MODULES if name in modules] == []
+
+    def test_lazy_attribute(self):
+        from templateapp.core import TemplateBuilder
+        assert templateapp.TemplateBuilder is TemplateBuilder
+        assert 'TemplateBuilder' in dir(templateapp)
+
+
+class TestPackageVersion:
+    def test_version_from_metadata(self):
+        import textfsm
+        assert get_package_version('textfsm') == textfsm.__version__
+        assert Data.pyyaml_text.startswith('pyyaml v')
+        assert Data.get_dependency()['textfsm']['package'] == Data.textfsm_text
+
+    def test_unknown_package(self):
+        assert get_package_version('no-such-package-xyz') == ''
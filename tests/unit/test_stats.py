@@ -0,0 +1,40 @@
+from templateapp import TemplateBuilder
+from templateapp.stats import PhaseStats
+from templateapp.stats import null_timer
+
+
+user_data = 'Title   Price\nword(var_title)   number(var_price) -> Record'
+test_data = 'Title   Price\nabc   1.5\nxyz   2'
+
+
+class TestPhaseStats:
+    def test_disabled_by_default(self):
+        factory = TemplateBuilder(user_data=user_data, test_data=test_data)
+        factory.verify()
+        assert not factory.stats
+        assert factory.stats.timer('prepare') is null_timer
+        assert not factory.stats.phases
+
+    def test_build_and_verify_phases(self):
+        factory = TemplateBuilder(user_data=user_data, test_data=test_data,
+                                  profile=True)
+        factory.verify()
+        phases = factory.stats.to_dict()
+        assert list(phases) == ['parse_line', 'prepare',
+                                'build_template_comment', 'reformat',
+                                'textfsm_compile', 'verify_parse']
+        assert phases['parse_line']['count'] == 2
+        assert phases['prepare']['count'] == 1
+        assert 'textfsm_compile' in factory.stats.report()
+
+    def test_shared_stats_with_callback(self):
+        calls = []
+        stats = PhaseStats(callback=lambda phase, elapsed: calls.append(phase))
+        TemplateBuilder(user_data=user_data, profile=stats)
+        TemplateBuilder(user_data=user_data, profile=stats, lazy=True)
+        assert stats.phases['prepare'][0] == 2
+        assert 'validate_template' in stats.phases
+        assert calls.count('prepare') == 2
+
+        stats.reset()
+        assert not stats.phases
@@ -0,0 +1,136 @@
+import os
+import pytest
+
+from templateapp import TemplateBuilder
+from templateapp.exceptions import TemplateBuilderError
+from templateapp.exceptions import TemplateParseBudgetError
+from templateapp.supervisor import ParseBudget
+from templateapp.supervisor import ParseSupervisor
+
+
+template = 'Value name ((\\w+,?)+)\n\nStart\n  ^x ${name}$$ -> Record\n'
+slow_text = 'x ' + 'a' * 40 + '!'
+
+
+@pytest.fixture(scope='module')
+def supervisor():
+    with ParseSupervisor(size=2) as obj:
+        yield obj
+
+
+class TestParseSupervisor:
+    def test_parse(self, supervisor):
+        result = supervisor.parse(template, 'x abc\nx d\n')
+        assert result.is_success
+        assert result.records == [{'name': 'abc'}, {'name': 'd'}]
+
+    def test_workers_are_reused(self, supervisor):
+        pids = set()
+        for _ in range(5):
+            worker = supervisor.acquire()
+            pids.add(worker.process.pid)
+            supervisor.release(worker)
+        assert len(pids) == 1
+
+    def test_seconds_budget(self, supervisor):
+        kills = supervisor.kills
+        result = supervisor.parse(template, slow_text,
+                                  budget=ParseBudget(seconds=0.2))
+        assert result.reason == 'seconds'
+        assert supervisor.kills == kills + 1
+        with pytest.raises(TemplateParseBudgetError):
+            result.raise_for_error()
+        assert supervisor.parse(template, 'x a\n').records == [{'name': 'a'}]
+
+    def test_rows_budget(self, supervisor):
+        result = supervisor.parse(template, 'x a\n' * 20,
+                                  budget=ParseBudget(rows=10))
+        assert result.reason == 'rows'
+
+    @pytest.mark.skipif(not os.path.exists('/proc/self/statm'),
+                        reason='resident memory is read from /proc')
+    def test_rss_budget(self, supervisor):
+        result = supervisor.parse(template, slow_text,
+                                  budget=ParseBudget(seconds=5, rss=1024))
+        assert result.reason == 'rss'
+
+    def test_parse_error(self, supervisor):
+        error_template = 'Value name (\\S+)\n\nStart\n  ^x -> Error\n'
+        result = supervisor.parse(error_template, 'x\n')
+        assert not result.is_success
+        assert result.reason == ''
+        with pytest.raises(TemplateBuilderError):
+            result.raise_for_error()
+
+    def test_unexpected_error_releases_worker(self):
+        with ParseSupervisor(size=1) as supervisor:
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    supervisor.parse(template, lambda: None)
+            assert supervisor.parse(template, 'x abc\n').is_success
+
+    def test_parse_many(self, supervisor):
+        texts = ['x a\n', slow_text, 'x b\n']
+        results = supervisor.parse_many(template, texts,
+                                        budget=ParseBudget(seconds=0.2))
+        assert [item.is_success for item in results] == [True, False, True]
+        assert results[2].records == [{'name': 'b'}]
+
+    def test_count_only(self, supervisor):
+        result = supervisor.parse(template, 'x a\nx b\n', count_only=True)
+        assert result.is_success
+        assert result.records == []
+        assert result.rows_count == 2
+        results = supervisor.parse_many(template, ['x a\n', 'x a\n' * 20],
+                                        budget=ParseBudget(rows=10),
+                                        count_only=True)
+        assert [item.rows_count for item in results] == [1, 0]
+        assert results[1].reason == 'rows'
+
+
+class TestTemplateBuilderBudget:
+    def test_verify_within_budget(self):
+        factory = TemplateBuilder(user_data='x digits(var_num) -> record',
+                                  test_data='x 1\nx 2')
+        budget = ParseBudget(seconds=10, rows=5)
+        assert factory.verify(expected_rows_count=2, budget=budget)
+        assert factory.parse(budget=budget) == [{'num': '1'}, {'num': '2'}]
+        columns = factory.parse(columnar=True, budget=budget)
+        assert columns['num'] == ['1', '2']
+
+    def test_budget_keeps_prefilter(self, supervisor, monkeypatch):
+        calls = []
+
+        def parse_within_budget(template, source, budget, engine='textfsm',
+                                prefilter=False):
+            calls.append(prefilter)
+            result = supervisor.parse(template, source, budget=budget,
+                                      engine=engine, prefilter=prefilter)
+            result.raise_for_error()
+            return result.records
+
+        monkeypatch.setattr('templateapp.supervisor.parse_within_budget',
+                            parse_within_budget)
+        factory = TemplateBuilder(user_data='x digits(var_num) -> record',
+                                  test_data='x 1\nfoo\nx 2', prefilter=True)
+        budget = ParseBudget(seconds=10)
+        assert factory.verify(expected_rows_count=2, budget=budget)
+        assert factory.parse(budget=budget) == [{'num': '1'}, {'num': '2'}]
+        assert calls == [True, True]
+
+    def test_verify_over_budget(self):
+        factory = TemplateBuilder(user_data='x digits(var_num) -> record',
+                                  test_data='x 1\nx 2\nx 3')
+        with pytest.raises(TemplateParseBudgetError) as ex:
+            factory.verify(budget=ParseBudget(rows=2))
+        assert ex.value.reason == 'rows'
+
+    def test_verify_corpus_within_budget(self, tmp_path):
+        (tmp_path / 'good.txt').write_text('x a\n')
+        (tmp_path / 'bad.txt').write_text(slow_text)
+        factory = TemplateBuilder(user_data='x data(var_name) -> record')
+        factory.template = template
+        report = factory.verify_corpus(str(tmp_path), workers=2,
+                                       budget=ParseBudget(seconds=0.2))
+        assert [item.is_passed for item in report.results] == [False, True]
+        assert 'second(s) budget' in report.results[0].error
@@ -0,0 +1,89 @@
+import pytest
+from io import StringIO
+from textwrap import dedent
+from textfsm import TextFSM
+
+from templateapp import TemplateBuilder
+from templateapp.validator import validate_template
+from templateapp.exceptions import TemplateBuilderError
+
+
+good_template = """
+    # comment
+    Value Filldown name (\\S+)
+    Value Required,List addr (\\S+)
+
+    Start
+      ^name ${name} -> Continue
+      ^addr $addr -> Next.Record Other
+      # comment
+      ^end -> End
+
+    Other
+      ^.* -> Error "bad"
+      ^back -> Start
+"""
+
+
+@pytest.mark.parametrize(
+    'template',
+    [
+        good_template,
+        'Value x (\\S+)\n\nStart\n  ^${x}$$ -> Record',
+        'Value x (\\S+)\n\nBegin\n  ^${x} -> Record',
+        'Value x \\S+\n\nStart\n  ^${x} -> Record',
+        'Value Bogus x (\\S+)\n\nStart\n  ^${x} -> Record',
+        'Value x (\\S+)\nValue x (\\d+)\n\nStart\n  ^${x} -> Record',
+        'Value x (\\S+)\n\nStart\n  ^${y} -> Record',
+        'Value x (\\S+)\n\nStart\n  ^${x} -> Record Missing',
+        'Value x (\\S+)\n\nStart\n  ^${x} -> Continue Start',
+        'Value x (\\S+)\n\nStart\n^${x} -> Record',
+        'Value x (\\S+)\n\nStart\n  ^${x} -> Record\n\nStart\n  ^a',
+        'Value x (\\S+)\n\nStart\n  ^${x} -> Next.ClearAll',
+        'Value x (\\S+)\n\nStart\n  ^${x}\n\nEOF\n  ^a',
+        'Value x (\\S+)\nStart\n  ^${x}',
+        'Start\n  ^abc',
+    ]
+)
+def test_same_validity_as_textfsm(template):
+    template = dedent(template).strip()
+    try:
+        TextFSM(StringIO(template))
+        is_valid = True
+    except Exception:   # noqa
+        is_valid = False
+    assert (not validate_template(template)) == is_valid
+
+
+class TestLazyTemplateBuilder:
+    def test_lazy_parser(self):
+        factory = TemplateBuilder(user_data='digits(var_x) -> Record',
+                                  lazy=True)
+        assert factory.template
+        assert factory._template_parser is None
+        assert factory.template_parser is not None
+        assert factory.template_parser.header == ['x']
+
+    def test_lazy_invalid_template(self):
+        user_data = 'digits(var_x) -> Record MissingState'
+        with pytest.raises(TemplateBuilderError) as ex:
+            TemplateBuilder(user_data=user_data, lazy=True)
+        assert "State 'MissingState' not found" in str(ex.value)
+
+
+class TestCliBuildTemplate:
+    user_data = 'abc digits(var_x)\nkeep__ foo (bar'
+
+    def test_invalid_regex_fails_by_default(self, capsys):
+        from templateapp.main import Cli
+        with pytest.raises(SystemExit) as ex:
+            Cli(['-u', self.user_data]).run()
+        assert ex.value.code == 1
+        assert 'Invalid regular expression' in capsys.readouterr().out
+
+    def test_lazy_is_opt_in(self, capsys):
+        from templateapp.main import Cli
+        with pytest.raises(SystemExit) as ex:
+            Cli(['-u', self.user_data, '--lazy']).run()
+        assert ex.value.code == 0
+        assert '^foo (bar' in capsys.readouterr().out